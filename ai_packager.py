@@ -19,6 +19,8 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+import codegnosis_config
+
 # Bundle size threshold: 500KB (Modern LLM friendly)
 BUNDLE_SIZE_LIMIT = 500 * 1024 
 
@@ -68,27 +70,6 @@ CHUNK_PATTERNS = {
     ],
 }
 
-# Files to exclude from bundles
-EXCLUDE_PATTERNS = [
-    "ai_bundle_",      # Previous AI bundles
-    "ai-bundle",       # JSON bundles
-    ".exe",            # Executables
-    ".dll",            # Libraries
-    ".pdb",            # Debug symbols
-    ".log",            # Log files
-    "node_modules/",   # NPM dependencies
-    "dist/",           # Build output
-    "build/",          # Build output
-    "target/",         # Rust build artifacts
-    ".git/",           # Git internals
-    "__pycache__/",    # Python bytecode
-    "package-lock.json",
-    ".map",            # Source maps
-    ".min.js",         # Minified JS
-    ".min.css",        # Minified CSS
-    "_archive/",       # Archives
-]
-
 
 def chunk_large_file(content, category, rel_path):
     """
@@ -181,13 +162,17 @@ def create_cross_reference(all_bundles, current_index):
     return '\n'.join(xref)
 
 
-def package_for_ai(report_data, output_path, project_root):
+def package_for_ai(report_data, output_path, project_root, config=None):
     """
     Aggregates code content based on the analysis report.
     Creates multiple bundles if project exceeds 40KB per bundle.
+    Files matching the config's `packaging` exclusions are left out.
     """
     print(f"[packager] Packaging project for AI: {report_data.get('projectName', 'Unknown')}", file=sys.stderr)
 
+    if config is None:
+        config = codegnosis_config.load_config(project_root)
+    excluded = config.packaging
     project_root = Path(project_root)
     project_name = report_data.get('projectName', 'Unknown')
     timestamp = report_data.get('generatedAt', datetime.now().isoformat())
@@ -200,22 +185,30 @@ def package_for_ai(report_data, output_path, project_root):
         # Skip binaries
         if info.get('category') in ["Image", "Video", "Audio", "Font", "Archive", "Executable"]:
             continue
+        # The analyzer sniffed content; binary and oversized files are never loaded
+        if info.get('contentKind') in ("binary", "oversized"):
+            continue
 
-        # Skip excluded patterns
-        if any(pattern in rel_path for pattern in EXCLUDE_PATTERNS):
+        # Skip excluded directories, names and suffixes
+        if excluded.matches(rel_path):
             continue
 
         full_path = project_root / rel_path
 
         try:
-            if full_path.exists():
+            # The analyzer records sizeBytes at discovery; only stat for older reports
+            file_size = info.get('sizeBytes')
+            if file_size is None and full_path.exists():
                 file_size = full_path.stat().st_size
+            if file_size is not None:
                 category = info.get('category', 'Unknown')
 
                 with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
 
                 role = categorize_file(rel_path, info)
+                # Analyzer community id: tightly coupled files share one
+                community = info.get('community', 0)
 
                 # Chunk large files
                 if file_size > FILE_CHUNK_THRESHOLD:
@@ -225,6 +218,7 @@ def package_for_ai(report_data, output_path, project_root):
                             'path': rel_path,
                             'category': category,
                             'role': role,
+                            'community': community,
                             'content': chunk_content,
                             'chunk': f"{chunk_idx}/{chunk_total}",
                             'context': context,
@@ -235,6 +229,7 @@ def package_for_ai(report_data, output_path, project_root):
                         'path': rel_path,
                         'category': category,
                         'role': role,
+                        'community': community,
                         'content': content,
                         'chunk': None,
                         'context': None,
@@ -243,9 +238,13 @@ def package_for_ai(report_data, output_path, project_root):
         except Exception as e:
             print(f"[packager] Error reading {rel_path}: {e}", file=sys.stderr)
 
-    # Sort files: core first, then src, then config, then tests, then docs
+    # Sort files: core first, then src, then config, then tests, then docs;
+    # within a role, each community stays together so it shares a bundle, and
+    # files in none (community -1) come last
     role_order = {'core': 0, 'src': 1, 'config': 2, 'tests': 3, 'docs': 4}
-    all_files.sort(key=lambda x: (role_order.get(x['role'], 5), x['path']))
+    all_files.sort(
+        key=lambda x: (role_order.get(x['role'], 5), x['community'] < 0, x['community'], x['path'])
+    )
 
     # Calculate total size
     total_size = sum(f['size'] for f in all_files)
@@ -9,18 +9,32 @@ Designed for execution via a Node.js/Electron bridge.
 """
 
 import os
-import ast
 import re
 import json
 import sys
 import graphviz
 import tempfile
+import mmap
+import heapq
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
 import platform
 import time
 import logging  # Added import
 
+import codegnosis_config
+import file_discovery
+import file_records
+import graph_algorithms
+import graph_layout
+import import_resolution
+import profiling
+import regex_guard
+import spill_store
+import subgraphs
+from import_resolution import PythonImport
+
 try:
     import ai_packager
 except Exception:
@@ -31,6 +45,11 @@ try:
 except Exception:
     ghost_protocol = None
 
+try:
+    from exporters import sqlite_store
+except Exception:
+    sqlite_store = None
+
 
 def get_folder_size(path):
     """Calculate total size of a folder in bytes."""
@@ -48,6 +67,56 @@ def get_folder_size(path):
     return total
 
 
+# Files above this size are memory-mapped rather than read into memory
+MMAP_THRESHOLD = 1024 * 1024
+
+
+@contextmanager
+def open_file_bytes(file_path):
+    """
+    Yield a file's content as a bytes-like object: bytes for small files,
+    a read-only mmap for large ones. Regex scans work on either; use
+    findall/search so no match objects outlive the mapping.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def decode_bytes(data):
+    """Decode a bytes span (or mmap) the way text reads do: UTF-8, errors ignored."""
+    if isinstance(data, mmap.mmap):
+        data = data[:]
+    return data.decode("utf-8", errors="ignore")
+
+
+def count_lines_streaming(file_path, chunk_size=1024 * 1024):
+    """Count lines in chunks so oversized text files are never held in memory."""
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    # A final line without a trailing newline still counts
+    return lines if last == b"\n" else lines + 1
+
+
+def file_suffix(name):
+    """Path(name).suffix.lower() without building a Path."""
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[dot:].lower()
+    return ""
+
+
 def format_size(bytes_val):
     """Format bytes as human-readable string."""
     if bytes_val >= 1024 * 1024 * 1024:
@@ -246,77 +315,10 @@ def analyze_build_profile(project_path):
 
 def load_codegnosis_config(project_path):
     """
-    Load configuration from codegnosis.config.json.
-    Returns merged config with defaults for any missing keys.
+    Load codegnosis.config.json as a validated, immutable CompiledConfig
+    (defaults for any missing keys); see codegnosis_config.
     """
-    config_path = Path(project_path) / "codegnosis.config.json"
-    default_config = {
-        "language_extensions": {},
-        "compliance_checks": {
-            "required_header_text": "",
-            "mandatory_files": [],
-            "forbidden_licenses": ["AGPL", "GPL", "LGPL"],
-        },
-        "custom_regex_parsers": {},
-        "exclusions": {
-            "directories": [
-                ".git",
-                "node_modules",
-                "__pycache__",
-                "dist",
-                "build",
-                "target",
-            ],
-            "files": ["package-lock.json", ".DS_Store"],
-            "extensions": [
-                ".exe", ".dll", ".pyc", ".png", ".jpg", ".jpeg", ".gif", ".webp",
-                ".zip", ".tar", ".gz", ".7z", ".rar",
-                ".xcf", ".psd", ".ai", ".sketch", ".fig", ".blend", ".fbx"
-            ],
-        },
-        "analysisSettings": {
-            "fileSizeLimitMB": 5,
-            "checkCircularDependencies": True,
-            "checkOrphans": True,
-            "checkMissingAssets": True,
-            "scanDepth": 10,
-        },
-        "tauri": {"enabled": False, "v2Checks": True},
-        "visualization": {"maxNodes": 400, "maxEdges": 900, "categoryColors": {}},
-    }
-
-    if not config_path.exists():
-        return default_config
-
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            user_config = json.load(f)
-        # Merge user config with defaults (user overrides defaults)
-        merged = {
-            "language_extensions": user_config.get("language_extensions", {}),
-            "compliance_checks": {
-                **default_config["compliance_checks"],
-                **user_config.get("compliance_checks", {}),
-            },
-            "custom_regex_parsers": user_config.get("custom_regex_parsers", {}),
-            "exclusions": {
-                **default_config["exclusions"],
-                **user_config.get("exclusions", {}),
-            },
-            "analysisSettings": {
-                **default_config["analysisSettings"],
-                **user_config.get("analysisSettings", {}),
-            },
-            "tauri": {**default_config["tauri"], **user_config.get("tauri", {})},
-            "visualization": {
-                **default_config["visualization"],
-                **user_config.get("visualization", {}),
-            },
-        }
-        return merged
-    except Exception as e:
-        logging.warning(f"Could not load codegnosis.config.json: {e}")
-        return default_config
+    return codegnosis_config.load_config(project_path)
 
 
 # Configure logging to a file
@@ -369,115 +371,9 @@ GRAPH_EDGE_CAP = 900
 class AnalyzerCore:
     """Core logic for project analysis, independent of any UI framework."""
 
-    MASTER_CATEGORIES = {
-        ".py": "Python",
-        ".js": "JavaScript",
-        ".cjs": "JavaScript",
-        ".mjs": "JavaScript Module",
-        ".jsx": "React",
-        ".ts": "TypeScript",
-        ".tsx": "TypeScript React",
-        ".cts": "TypeScript",
-        ".mts": "TypeScript Module",
-        ".html": "HTML",
-        ".htm": "HTML",
-        ".css": "CSS",
-        ".scss": "SCSS",
-        ".less": "Less",
-        ".java": "Java",
-        ".cs": "C#",
-        ".cpp": "C++",
-        ".c": "C",
-        ".h": "Header",
-        ".go": "Go",
-        ".rs": "Rust",
-        ".php": "PHP",
-        ".rb": "Ruby",
-        ".swift": "Swift",
-        ".kt": "Kotlin",
-        ".pl": "Perl",
-        ".sh": "Shell",
-        ".ps1": "PowerShell",
-        ".cmd": "Batch",
-        ".bat": "Batch",
-        ".json": "JSON",
-        ".xml": "XML",
-        ".yaml": "YAML",
-        ".yml": "YAML",
-        ".toml": "TOML",
-        ".ini": "INI",
-        ".env": "ENV",
-        ".sql": "SQL",
-        ".db": "Database",
-        ".sqlite3": "SQLite",
-        ".md": "Markdown",
-        ".markdown": "Markdown",
-        ".txt": "Text",
-        ".csv": "CSV",
-        ".png": "Image",
-        ".jpg": "Image",
-        ".jpeg": "Image",
-        ".gif": "Image",
-        ".webp": "Image",
-        ".svg": "SVG",
-        ".ico": "Icon",
-        ".mp4": "Video",
-        ".mp3": "Audio",
-        ".ttf": "Font",
-        ".woff": "Font",
-        ".woff2": "Font",
-        ".docx": "Document",
-        ".pdf": "Document",
-        ".xlsx": "Spreadsheet",
-        ".dot": "Graphviz",
-        ".code-workspace": "Config",
-        ".webmanifest": "Config",
-        ".map": "Source Map",
-        ".coffee": "CoffeeScript",
-        ".applescript": "AppleScript",
-        ".bnf": "Grammar",
-        ".flow": "Flow",
-        ".exe": "Executable",
-        ".zip": "Archive",
-        ".tar": "Archive",
-        ".gz": "Archive",
-        ".1": "Man Page",
-    }
-
-    CATEGORY_COLORS = {
-        "Python": "lightblue",
-        "JavaScript": "lightyellow",
-        "JavaScript Module": "khaki",
-        "React": "lightcyan",
-        "TypeScript": "deepskyblue",
-        "TypeScript Module": "cornflowerblue",
-        "TypeScript React": "dodgerblue",
-        "HTML": "lightcoral",
-        "CSS": "lightgreen",
-        "SCSS": "mediumseagreen",
-        "Less": "palegreen",
-        "JSON": "wheat",
-        "YAML": "khaki",
-        "SQL": "plum",
-        "Image": "lavender",
-        "Icon": "violet",
-        "SVG": "lavenderblush",
-        "Document": "mistyrose",
-        "Spreadsheet": "palegreen",
-        "Graphviz": "lightsteelblue",
-        "Config": "lightgoldenrodyellow",
-        "Source Map": "gainsboro",
-        "CoffeeScript": "rosybrown",
-        "AppleScript": "lightpink",
-        "Grammar": "thistle",
-        "Flow": "powderblue",
-        "Executable": "silver",
-        "Archive": "darkgray",
-        "Batch": "tan",
-        "Man Page": "peachpuff",
-        "Default": "lightgray",
-        "Unfamiliar": "red",
-    }
+    # Built-in tables; the compiled config layers the project's additions on top
+    MASTER_CATEGORIES = codegnosis_config.MASTER_CATEGORIES
+    CATEGORY_COLORS = codegnosis_config.CATEGORY_COLORS
 
     def __init__(
         self,
@@ -489,6 +385,8 @@ class AnalyzerCore:
         progress_file_path=None,
     ):
         self.project_dir = Path(directory)
+        # Absolute paths under the project start with this
+        self._root_prefix = os.path.join(str(self.project_dir), "")
         self.extensions_to_find = (
             set(ext.lower() for ext in extensions_to_find)
             if extensions_to_find
@@ -497,28 +395,27 @@ class AnalyzerCore:
         self.include_all = len(self.extensions_to_find) == 0
         self.excluded_folders = set(excluded_folders)
         self.custom_categories = custom_categories
-        self.config = config or {}
+        # Compiled once per process and shared (dicts are compiled here)
+        self.config = codegnosis_config.compile_config(config)
         self.progress_file = Path(progress_file_path) if progress_file_path else None
 
         # ---------------------------------------------------------
         # EXCLUSIONS (from config)
         # ---------------------------------------------------------
-        excl_conf = self.config.get("exclusions", {})
-        self.excluded_dirs = set(
-            excl_conf.get(
-                "directories", [".git", "node_modules", "__pycache__", "dist", "build"]
-            )
-        )
-        self.excluded_files = set(
-            excl_conf.get("files", ["package-lock.json", ".DS_Store"])
+        self.excluded_dirs = self.config.excluded_dirs
+        self.excluded_files = self.config.excluded_files
+        # Lowercased extensions
+        self.excluded_extensions = self.config.excluded_extensions
+        # .gitignore-style files honoured during discovery
+        self.ignore_files = self.config.ignore_files
+        # Config entries come precompiled; ignore-file rules are compiled as
+        # the walk finds them, and both prune whole subtrees
+        self.exclusion_layer = self.config.exclusions.with_directories(sorted(self.excluded_folders))
+        self.exclusion_matcher = file_discovery.ExclusionMatcher(
+            self.project_dir,
+            ignore_files=self.ignore_files,
+            config_layer=self.exclusion_layer,
         )
-        # Normalize extensions to lowercase
-        self.excluded_extensions = {
-            ext.lower()
-            for ext in excl_conf.get(
-                "extensions", [".exe", ".dll", ".pyc", ".png", ".jpg", ".zip"]
-            )
-        }
 
         # ---------------------------------------------------------
         # ANALYSIS SETTINGS (from config)
@@ -530,6 +427,30 @@ class AnalyzerCore:
         self.check_orphans = analysis_conf.get("checkOrphans", True)
         self.check_missing_assets = analysis_conf.get("checkMissingAssets", True)
         self.scan_depth = analysis_conf.get("scanDepth", 10)
+        # "walk" scans the filesystem; "git" enumerates the git index instead
+        self.discovery_mode = analysis_conf.get("discoveryMode", "walk")
+        self.include_untracked = analysis_conf.get("includeUntracked", True)
+        # Directory listing threads for the walk (1 = sequential)
+        self.walker_threads = analysis_conf.get(
+            "walkerThreads", file_discovery.default_walker_threads()
+        )
+        # Monorepos: analyse each workspace member as a cached, parallel shard
+        self.workspace_sharding = analysis_conf.get("workspaceSharding", True)
+        self.shard_workers = analysis_conf.get("shardWorkers")
+        self.cache_dir = analysis_conf.get("cacheDir")
+        # Bounded-memory mode: "auto" spills per-file state to disk when an
+        # in-memory run is estimated to exceed memoryLimitMB (0 = no ceiling)
+        self.spill_mode = analysis_conf.get("spillToDisk", "auto")
+        self.memory_limit_bytes = int(analysis_conf.get("memoryLimitMB", 0) * 1024 * 1024)
+        self.spill_dir = analysis_conf.get("spillDir")
+        # Budgets for each file's custom_regex_parsers run (0 = unlimited)
+        self.parser_timeout_ms = analysis_conf.get("customParserTimeoutMs", 2000)
+        self.parser_max_file_kb = analysis_conf.get("customParserMaxFileKB", 1024)
+        self.parser_max_bytes = int(self.parser_max_file_kb * 1024)
+        # [{file, language, reason}] for files the custom parsers skipped
+        self.parser_skips = []
+        # analyze_project_cli reuses the stored result of an unchanged project
+        self.result_cache = analysis_conf.get("resultCache", True)
 
         # ---------------------------------------------------------
         # TAURI SETTINGS (from config)
@@ -544,30 +465,49 @@ class AnalyzerCore:
         viz_conf = self.config.get("visualization", {})
         self.max_graph_nodes = viz_conf.get("maxNodes", 400)
         self.max_graph_edges = viz_conf.get("maxEdges", 900)
-        # Merge config colors with defaults
-        self.dynamic_category_colors = {
-            **self.CATEGORY_COLORS,
-            **viz_conf.get("categoryColors", {}),
+        self.precompute_layout = viz_conf.get("precomputeLayout", False)
+        # CATEGORY_COLORS < config categoryColors
+        self.dynamic_category_colors = self.config.category_colors
+
+        # MASTER_CATEGORIES < config language_extensions < custom_categories
+        self.all_categories = self.config.categories
+        if self.custom_categories:
+            self.all_categories = {**self.all_categories, **self.custom_categories}
+
+        # One FileEntry record per file and ext: node; file_types and
+        # file_graph are path-keyed views over it
+        self.file_table = file_records.FileTable()
+        self.file_types = file_records.CategoryView(self.file_table)
+        self.file_graph = file_records.GraphView(self.file_table)
+        # Basename/extension -> category code; records store codes
+        self._category_codes = {
+            key: self.file_table.category_code(category)
+            for key, category in self.all_categories.items()
         }
-
-        # Merge categories: MASTER_CATEGORIES < config language_extensions < custom_categories
-        config_extensions = self.config.get("language_extensions", {})
-        self.all_categories = {
-            **self.MASTER_CATEGORIES,
-            **config_extensions,
-            **self.custom_categories,
-        }
-
-        self.file_graph = {}
-        self.file_types = {}
-        self.file_data = {}
+        self._unfamiliar_code = self.file_table.category_code("Unfamiliar")
+        self.python_index = import_resolution.PythonModuleIndex([])
+        self.path_aliases = import_resolution.PathAliasTrie()
+        self.workspaces = import_resolution.WorkspaceIndex()
+        # (source directory, specifier) -> resolved rel_path / ext: node / None
+        self.resolve_cache = {}
+        # Built on the first graph query, after analyze() has filled file_graph
+        self.reachability = None
+        # SpillStore while running in bounded-memory mode
+        self.spill = None
+        # profiling.StageProfiler when the run is being profiled
+        self.profiler = None
+        # Community id per file id, set when the report is generated
+        self.communities = None
+        # Per-file pageRank/betweenness/chainDepth lists, set with communities
+        self.node_metrics = None
+        # subgraphs.SubgraphIndex, built on the first subgraph query
+        self.subgraph_index = None
         self.unfamiliar_extensions = set()
         self.found_extensions = set()
 
         # Connectivity analysis
         self.missing_assets = {}
         self.orphaned_files = set()
-        self.asset_references = {}
         self.start_time = time.time()
         self.logger = logger  # Use the global logger instance
 
@@ -585,10 +525,59 @@ class AnalyzerCore:
         except Exception as exc:
             self.logger.debug(f"Failed to write progress file: {exc}")
 
+    def _choose_memory_mode(self, file_count):
+        """Switch to the bounded-memory (spill-to-disk) mode when configured or needed."""
+        if self.spill is not None or self.spill_mode is False:
+            return
+        if self.spill_mode is not True:
+            estimate = file_count * spill_store.IN_MEMORY_BYTES_PER_FILE
+            if not self.memory_limit_bytes or estimate <= self.memory_limit_bytes:
+                return
+        limit = self.memory_limit_bytes or spill_store.DEFAULT_MEMORY_LIMIT_MB * 1024 * 1024
+        self.spill = spill_store.SpillStore(limit, self.file_table, self.spill_dir)
+        self.logger.info(
+            f"Bounded-memory mode: {file_count} files, ceiling {limit // (1024 * 1024)}MB, "
+            f"spilling to {self.spill.dir}"
+        )
+
+    def write_report(self, report, path):
+        """Write report as JSON, streaming its `files` and `dependencyGraph` views."""
+        file_records.write_report(report, path)
+
+    def write_layout(self, path):
+        """
+        Write precomputed 3D positions for the report's files to path (see
+        graph_layout), reusing the cached buffer when the graph is unchanged.
+        Returns the report's `layout` section.
+        """
+        import workspace_shards
+
+        offsets, targets = self.spill.csr() if self.spill is not None else self.file_table.csr()
+        names = [record.rel_path for record in self.file_table.records]
+        cache_dir = self.cache_dir or workspace_shards.default_cache_dir(self.project_dir)
+        started = time.perf_counter()
+        layout = graph_layout.write_layout(path, cache_dir, names, offsets, targets, self.communities)
+        self.logger.info(
+            f"Layout for {len(names)} nodes written to {path} "
+            f"({'cached' if layout['cached'] else layout['method']}, {time.perf_counter() - started:.2f}s)"
+        )
+        return layout
+
+    def close(self):
+        """Release the spill store (its report views are unusable afterwards)."""
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
     # --- Core Logic Methods (Retained) ---
 
     def analyze(self):
         """Main analysis entry point."""
+        if self.workspace_sharding:
+            report = self._analyze_workspaces()
+            if report is not None:
+                return report
+
         files = self._find_files()
         self.emit_progress(
             "scanning",
@@ -597,209 +586,430 @@ class AnalyzerCore:
         )
         self.logger.info(f"Scan complete: {len(files)} files after excludes")
 
-        # PASS 1: Collect all files first (so we know what exists)
-        for file_path in files:
-            rel_path = self._get_relpath(file_path)
-            category = self._categorize(file_path)
-            self.file_types[rel_path] = category
-            self.file_graph[rel_path] = []
+        self.register_files(files)
+        detected = (
+            (entry.rel_path, self._detect_dependencies(entry.path))
+            for entry in files
+            if entry.kind == file_discovery.KIND_TEXT
+        )
+        self.link_dependencies(detected)
+        return self.finish_analysis(files)
+
+    def _analyze_workspaces(self):
+        """
+        Monorepo path: discover and parse each workspace as a cached shard,
+        then link and report on the merged tree. Returns None when the
+        project has no workspaces (or sharding fails) so analyze() carries on.
+        """
+        workspaces = import_resolution.load_workspaces(self.project_dir)
+        if not workspaces:
+            return None
+        try:
+            import workspace_shards
+
+            shards = workspace_shards.collect_shards(
+                self, workspaces, self.shard_workers, self.cache_dir
+            )
+        except Exception as e:
+            self.logger.warning(f"Workspace sharding failed, analyzing as one tree: {e}")
+            return None
+
+        files, detected = workspace_shards.merge_shards(shards)
+        for shard in shards:
+            self.parser_skips.extend(shard.parser_skips)
+        self.emit_progress(
+            "scanning",
+            15,
+            f"Scan complete: {len(files)} files in {len(shards)} workspace shards",
+        )
+        self.register_files(files)
+        self.link_dependencies(detected)
+        report = self.finish_analysis(files)
+        report["workspaces"] = [shard.to_dict() for shard in shards]
+        return report
+
+    def register_files(self, files):
+        """
+        PASS 1: register every discovered file (so we know what exists),
+        sniff content kinds and build the per-run resolution indexes.
+        """
+        self._choose_memory_mode(len(files))
+        for entry in files:
+            entry.category = self._category_code(entry.name)
+            node_id = self.file_table.add(entry)
+            if self.spill is not None:
+                self.spill.add_file(node_id)
+
+        # Classify content from a short prefix; only KIND_TEXT files are read whole
+        file_discovery.sniff_entries(files, self.max_file_size_bytes, self.walker_threads)
+        skipped = [e for e in files if e.kind != file_discovery.KIND_TEXT]
+        if skipped:
+            oversized = sum(1 for e in skipped if e.kind == file_discovery.KIND_OVERSIZED)
+            self.logger.info(
+                f"Content sniffing: {len(skipped) - oversized} binary, "
+                f"{oversized} oversized (> {self.max_file_size_mb}MB) files will not be parsed"
+            )
 
         self.emit_progress("registering", 30, "File registration complete")
         self.logger.info(f"Pass 1 complete: {len(self.file_types)} files registered")
 
-        # PASS 2: Now resolve dependencies (all files are known)
-        for file_path in files:
-            rel_path = self._get_relpath(file_path)
-            deps = self._detect_dependencies(file_path)
+        # Module-name index so Python imports resolve without filesystem probing
+        self.python_index = import_resolution.PythonModuleIndex(self.file_types.keys())
+        self.path_aliases = import_resolution.load_path_aliases(self.project_dir)
+        self.workspaces = import_resolution.load_workspaces(self.project_dir)
+        if self.path_aliases.size or self.path_aliases.base_url:
+            self.logger.info(
+                f"Loaded {self.path_aliases.size} path aliases "
+                f"(baseUrl: {self.path_aliases.base_url or 'none'})"
+            )
+
+    def detect_batch(self, paths):
+        """Run the dependency detectors over absolute paths; returns [(path, deps)]."""
+        return [(path, self._detect_dependencies(path)) for path in paths]
+
+    def link_dependencies(self, detected):
+        """
+        PASS 2: resolve (rel_path, raw deps) pairs into graph edges. All
+        files are registered first, so every local target is known.
+        """
+        spill = self.spill
+        table = self.file_table
+        for rel_path, deps in detected:
+            source_id = table.ids[rel_path]
+            from_file = table.records[source_id].path
+            linked = set()
+            targets = []
+            started = time.perf_counter() if self.profiler is not None else 0
             for dep in deps:
-                resolved = self._resolve_path(file_path, dep)
-                if resolved:
+                resolved = self._resolve_path(from_file, dep, rel_path)
+                # Several references to one target are a single edge
+                if resolved and resolved not in linked:
+                    linked.add(resolved)
                     # Logic: Add local files OR external virtual nodes
-                    if resolved in self.file_types or resolved.startswith("ext:"):
-                        if resolved not in self.file_types:
-                            # Register the external node with safe defaults
-                            self.file_types[resolved] = "External"
-                            self.file_graph[resolved] = []
-                            # Add safe metadata for the frontend
-                            if not hasattr(self, 'file_data'): self.file_data = {}
-                            self.file_data[resolved] = {
-                                "category": "External",
-                                "size": "0KB",
-                                "mtime": 0,
-                                "ctime": 0,
-                                "inboundCount": 0,
-                                "outboundCount": 0,
-                                "chainDepth": 1,
-                                "isUnused": False,
-                                "cycleParticipation": 0
-                            }
-                        
-                        self.file_graph[rel_path].append(resolved)
+                    target_id = table.ids.get(resolved)
+                    if target_id is None and resolved.startswith("ext:"):
+                        target_id = table.add_external(resolved)
+                        if spill is not None:
+                            spill.add_file(target_id)
+                    if target_id is not None:
+                        targets.append(target_id)
+            if self.profiler is not None:
+                self.profiler.record(
+                    "_resolve_path", rel_path, 0, time.perf_counter() - started, len(deps)
+                )
+            if not targets:
+                continue
+            # Bounded-memory runs write edges out instead of keeping them
+            if spill is not None:
+                spill.add_edges(source_id, targets)
+            else:
+                table.set_deps(source_id, targets)
 
         self.emit_progress(
             "dependencies", 55, "Dependency graph built and connections resolved"
         )
+
+    def finish_analysis(self, files):
+        """Connectivity analysis and report generation once the graph is linked."""
+        if self.spill is not None:
+            # Linking is over: from here on the graph is read back from disk
+            self.spill.seal()
+            self.file_graph = self.spill.graph_view()
         self.logger.info("Dependency graph built; analyzing connectivity")
         self._analyze_connectivity(files)
 
         # Calculate health score, stats, etc., and return a complete JSON-ready dictionary
         self.logger.info("Generating analysis report")
-        return self.generate_analysis_report()
+        report = self.generate_analysis_report()
+        if self.parser_skips:
+            report["customParserSkips"] = sorted(self.parser_skips, key=lambda skip: skip["file"])
+        return report
+
+    def _find_files(self, start_dir="", prune=()):
+        """
+        Find all relevant files in the project, or in the start_dir subtree
+        minus the pruned directories (one workspace shard).
+        Returns FileEntry records sorted by relative path.
+        """
+        found = None
+        if self.discovery_mode == "git":
+            found = self._find_files_git(start_dir, prune)
+            if found is None:
+                self.logger.info("Git index discovery unavailable; falling back to walk")
+        if found is None:
+            found = self._find_files_walk(start_dir, prune)
+        # The parallel walk yields in completion order; keep reports stable
+        found.sort(key=lambda entry: entry.rel_path)
+        return found
 
-    def _find_files(self):
-        """Find all relevant files in the project."""
+    def _find_files_walk(self, start_dir="", prune=()):
+        """Find files with the scandir walker, pruning excluded subtrees."""
         found = []
-        # Use config-driven exclusions merged with any passed excluded_folders
-        all_excludes = self.excluded_dirs | set(self.excluded_folders)
-        # Use config-driven extension exclusions for large file skipping
-        skip_large_exts = self.excluded_extensions
-        # Use config-driven file size limit
-        max_size_bytes = self.max_file_size_bytes
         log_every = 500
-        seen = 0
-        for root, dirs, files in os.walk(self.project_dir):
-            dirs[:] = [d for d in dirs if d not in all_excludes]
-
-            for filename in files:
-                ext = Path(filename).suffix.lower()
-                self.found_extensions.add(ext if ext else "(no extension)")
-
-                if (
-                    self.include_all
-                    or ext in self.extensions_to_find
-                    or filename.lower() in self.extensions_to_find
-                ):
-                    fp = Path(root) / filename
-                    try:
-                        if (
-                            ext in skip_large_exts
-                            and fp.stat().st_size > max_size_bytes
-                        ):
-                            continue
-                    except Exception:
-                        pass
-                    found.append(fp)
-                    seen += 1
-                    if seen % log_every == 0:
-                        self.logger.info(
-                            f"Scanning... {seen} files queued (dir={root})"
-                        )
+        for entry in file_discovery.walk_files(
+            self.project_dir, self.exclusion_matcher, self.walker_threads, start_dir, prune
+        ):
+            if self._accept_file(entry):
+                found.append(entry)
+                if len(found) % log_every == 0:
+                    self.logger.info(
+                        f"Scanning... {len(found)} files queued (last={entry.rel_path})"
+                    )
+
+        return found
+
+    def _find_files_git(self, start_dir="", prune=()):
+        """
+        Find files from the local git index (tracked, plus untracked-but-not-ignored
+        when includeUntracked is set). Returns None if the project is not a git
+        checkout or the index cannot be read.
+        """
+        rel_paths = file_discovery.git_discover(
+            self.project_dir, include_untracked=self.include_untracked
+        )
+        if rel_paths is None:
+            return None
+        if start_dir or prune:
+            rel_paths = [
+                rel for rel in rel_paths
+                if (not start_dir or rel.startswith(start_dir + "/"))
+                and not any(rel.startswith(d + "/") for d in prune)
+            ]
+
+        # Git has already applied .gitignore (tracked files are never ignored),
+        # so only config exclusions and the remaining ignore files apply here
+        matcher = file_discovery.ExclusionMatcher(
+            self.project_dir,
+            ignore_files=[f for f in self.ignore_files if f != ".gitignore"],
+            config_layer=self.exclusion_layer,
+        )
+        kept = [rel for rel in rel_paths if not matcher.is_path_excluded(rel)]
+        found = [
+            entry
+            for entry in file_discovery.stat_entries(self.project_dir, kept)
+            if self._accept_file(entry)
+        ]
 
+        self.logger.info(f"Git index discovery: {len(found)} files")
         return found
 
+    def _accept_file(self, entry):
+        """Apply extension filters and the size limit to a FileEntry."""
+        ext = os.path.splitext(entry.name)[1].lower()
+        if ext == ".":
+            ext = ""
+        self.found_extensions.add(ext if ext else "(no extension)")
+
+        if not (
+            self.include_all
+            or ext in self.extensions_to_find
+            or entry.name.lower() in self.extensions_to_find
+        ):
+            return False
+
+        # Use config-driven extension exclusions for large file skipping
+        if ext in self.excluded_extensions and entry.size > self.max_file_size_bytes:
+            return False
+        return True
+
     def _get_relpath(self, file_path):
         """Get normalized relative path."""
-        return str(Path(file_path).relative_to(self.project_dir)).replace("\\", "/")
+        path = os.fspath(file_path)
+        if path.startswith(self._root_prefix):
+            rel = path[len(self._root_prefix):]
+        else:
+            rel = str(Path(path).relative_to(self.project_dir))
+        return rel.replace("\\", "/")
 
     def _categorize(self, file_path):
         """Categorize a file by extension."""
         if str(file_path).startswith("ext:"):
             return "External"
-            
-        filename = Path(file_path).name
-        ext = Path(file_path).suffix.lower()
+        return self.file_table.categories[self._category_code(os.path.basename(file_path))]
+
+    def _category_code(self, filename):
+        """Category code for a basename: exact filename first, then extension."""
+        code = self._category_codes.get(filename)
+        if code is None:
+            ext = file_suffix(filename)
+            code = self._category_codes.get(ext)
+            if code is None:
+                self.unfamiliar_extensions.add(ext)
+                code = self._unfamiliar_code
+        return code
+
+    # Extension -> custom_regex_parsers key in codegnosis.config.json
+    EXT_TO_PARSER_KEY = {
+        ".java": "java",
+        ".jav": "java",
+        ".j": "java",
+        ".cs": "csharp",
+        ".cshtml": "csharp",
+        ".csx": "csharp",
+        ".c": "c",
+        ".cpp": "cpp",
+        ".cc": "cpp",
+        ".cxx": "cpp",
+        ".c++": "cpp",
+        ".cp": "cpp",
+        ".h": "cpp",
+        ".hpp": "cpp",
+        ".hxx": "cpp",
+        ".hh": "cpp",
+        ".h++": "cpp",
+        ".inl": "cpp",
+        ".tpp": "cpp",
+        ".tcc": "cpp",
+        ".inc": "cpp",
+        ".go": "go",
+        ".rs": "rust",
+        ".php": "php",
+        ".phtml": "php",
+        ".php3": "php",
+        ".php4": "php",
+        ".php5": "php",
+    }
 
-        if filename in self.all_categories:
-            return self.all_categories[filename]
-        elif ext in self.all_categories:
-            return self.all_categories[ext]
-        else:
-            self.unfamiliar_extensions.add(ext)
-            return "Unfamiliar"
+    # Extension -> built-in detector method
+    EXT_TO_DETECTOR = {
+        ".py": "_detect_python_imports",
+        ".js": "_detect_js_imports",
+        ".jsx": "_detect_js_imports",
+        ".ts": "_detect_js_imports",
+        ".tsx": "_detect_js_imports",
+        ".cjs": "_detect_js_imports",
+        ".mjs": "_detect_js_imports",
+        ".cts": "_detect_js_imports",
+        ".mts": "_detect_js_imports",
+        ".java": "_detect_java_imports",
+        ".jav": "_detect_java_imports",
+        ".cs": "_detect_csharp_imports",
+        ".c": "_detect_cpp_includes",
+        ".cpp": "_detect_cpp_includes",
+        ".cc": "_detect_cpp_includes",
+        ".cxx": "_detect_cpp_includes",
+        ".h": "_detect_cpp_includes",
+        ".hpp": "_detect_cpp_includes",
+        ".hxx": "_detect_cpp_includes",
+        ".hh": "_detect_cpp_includes",
+        ".inl": "_detect_cpp_includes",
+        ".tpp": "_detect_cpp_includes",
+        ".tcc": "_detect_cpp_includes",
+        ".go": "_detect_go_imports",
+        ".rs": "_detect_rust_imports",
+        ".php": "_detect_php_dependencies",
+        ".phtml": "_detect_php_dependencies",
+        ".php3": "_detect_php_dependencies",
+        ".php4": "_detect_php_dependencies",
+        ".php5": "_detect_php_dependencies",
+        ".html": "_detect_html_refs",
+        ".htm": "_detect_html_refs",
+        ".css": "_detect_css_refs",
+        ".scss": "_detect_css_refs",
+        ".json": "_detect_json_refs",
+    }
+
+    # Keyword prefilter: a file containing none of its detector's tokens
+    # cannot yield a dependency, so regex/AST work is skipped entirely
+    DETECTOR_PREFILTERS = {
+        "_detect_python_imports": re.compile(rb"import"),
+        "_detect_js_imports": re.compile(rb"import|export|require"),
+        "_detect_java_imports": re.compile(rb"import"),
+        "_detect_csharp_imports": re.compile(rb"using"),
+        "_detect_cpp_includes": re.compile(rb"include"),
+        "_detect_go_imports": re.compile(rb"import"),
+        "_detect_rust_imports": re.compile(rb"use|mod"),
+        "_detect_php_dependencies": re.compile(rb"use|require|include"),
+        "_detect_html_refs": re.compile(rb"(?i)<(?:script|link|img)"),
+        "_detect_css_refs": re.compile(rb"@import|url\("),
+        "_detect_json_refs": re.compile(rb'(?i)"(?:main|file|path|src|entry)"'),
+    }
+
+    # Probe order for extensionless specifiers and directory index files
+    RESOLVE_EXTENSIONS = [".ts", ".tsx", ".js", ".jsx", ".json", ".py", ".cjs", ".mjs"]
 
     def _detect_dependencies(self, file_path):
-        """Detect dependencies based on file type."""
+        """
+        Detect dependencies based on file type.
+        Content is handled as bytes (memory-mapped above MMAP_THRESHOLD) and only
+        decoded for matched spans; files failing the keyword prefilter are skipped.
+        """
         ext = Path(file_path).suffix.lower()
+        detector = self.EXT_TO_DETECTOR.get(ext)
 
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        except:
+        # Check if we have custom regex parsers for this extension
+        parser_key = self.EXT_TO_PARSER_KEY.get(ext)
+        parsers = self.config.parsers.get(parser_key) if parser_key else None
+
+        if not detector and not parsers:
+            # Nothing could match, so don't read the file at all
             return []
+        if self.profiler is None:
+            return self._run_detectors(file_path, detector, parsers, parser_key)
 
-        # Map extensions to config parser keys
-        ext_to_parser_key = {
-            ".java": "java",
-            ".jav": "java",
-            ".j": "java",
-            ".cs": "csharp",
-            ".cshtml": "csharp",
-            ".csx": "csharp",
-            ".c": "c",
-            ".cpp": "cpp",
-            ".cc": "cpp",
-            ".cxx": "cpp",
-            ".c++": "cpp",
-            ".cp": "cpp",
-            ".h": "cpp",
-            ".hpp": "cpp",
-            ".hxx": "cpp",
-            ".hh": "cpp",
-            ".h++": "cpp",
-            ".inl": "cpp",
-            ".tpp": "cpp",
-            ".tcc": "cpp",
-            ".inc": "cpp",
-            ".go": "go",
-            ".rs": "rust",
-            ".php": "php",
-            ".phtml": "php",
-            ".php3": "php",
-            ".php4": "php",
-            ".php5": "php",
-        }
+        started = time.perf_counter()
+        try:
+            return self._run_detectors(file_path, detector, parsers, parser_key)
+        finally:
+            try:
+                nbytes = os.path.getsize(file_path)
+            except OSError:
+                nbytes = 0
+            stage = f"custom_regex_parsers.{parser_key}" if parsers else detector
+            self.profiler.record(
+                stage, self._get_relpath(file_path), nbytes, time.perf_counter() - started
+            )
 
-        # Check if we have custom regex parsers for this extension
-        parser_key = ext_to_parser_key.get(ext)
-        custom_parsers = self.config.get("custom_regex_parsers", {})
+    def _run_detectors(self, file_path, detector, parsers, parser_key):
+        """Custom parsers first, then the built-in detector, over the file's bytes."""
+        try:
+            with open_file_bytes(file_path) as data:
+                if parsers and self._custom_prefilter_passes(data, parser_key):
+                    # Use config-driven parsing
+                    imports = self._run_custom_parsers(file_path, data, parsers, parser_key)
+                    if imports:
+                        return imports
+                    # Fall through to hardcoded if config parsing returned nothing
+
+                # Hardcoded fallbacks (original behavior)
+                if not detector:
+                    return []
+                if not self.DETECTOR_PREFILTERS[detector].search(data):
+                    return []
+                return getattr(self, detector)(data)
+        except (OSError, ValueError):
+            return []
 
-        if parser_key and parser_key in custom_parsers:
-            # Use config-driven parsing
-            imports = self._apply_custom_parsers(
-                content, custom_parsers[parser_key], parser_key
-            )
-            if imports:
-                return imports
-            # Fall through to hardcoded if config parsing returned nothing
-
-        # Hardcoded fallbacks (original behavior)
-        if ext == ".py":
-            return self._detect_python_imports(content)
-        elif ext in [".js", ".jsx", ".ts", ".tsx", ".cjs"]:
-            return self._detect_js_imports(content)
-        elif ext in [".java", ".jav"]:
-            return self._detect_java_imports(content)
-        elif ext == ".cs":
-            return self._detect_csharp_imports(content)
-        elif ext in [
-            ".c",
-            ".cpp",
-            ".cc",
-            ".cxx",
-            ".h",
-            ".hpp",
-            ".hxx",
-            ".hh",
-            ".inl",
-            ".tpp",
-            ".tcc",
-        ]:
-            return self._detect_cpp_includes(content)
-        elif ext == ".go":
-            return self._detect_go_imports(content)
-        elif ext == ".rs":
-            return self._detect_rust_imports(content)
-        elif ext in [".php", ".phtml", ".php3", ".php4", ".php5"]:
-            return self._detect_php_dependencies(content)
-        elif ext in [".html", ".htm"]:
-            return self._detect_html_refs(content)
-        elif ext in [".css", ".scss"]:
-            return self._detect_css_refs(content)
-        elif ext == ".json":
-            return self._detect_json_refs(content)
-        else:
+    def _run_custom_parsers(self, file_path, data, parsers, lang_key):
+        """
+        Custom parsers under the per-file size and time budgets. A file over
+        either is recorded in parser_skips and left to the built-in detector.
+        """
+        if self.parser_max_bytes and len(data) > self.parser_max_bytes:
+            self._skip_custom_parsers(file_path, lang_key, f"larger than {self.parser_max_file_kb}KB")
+            return []
+        try:
+            with regex_guard.time_budget(self.parser_timeout_ms / 1000):
+                return self._apply_custom_parsers(decode_bytes(data), parsers, lang_key)
+        except regex_guard.BudgetExceeded:
+            self._skip_custom_parsers(file_path, lang_key, f"exceeded {self.parser_timeout_ms}ms")
             return []
 
+    def _skip_custom_parsers(self, file_path, lang_key, reason):
+        rel_path = self._get_relpath(file_path)
+        self.logger.warning(f"Custom {lang_key} parsers skipped {rel_path}: {reason}")
+        self.parser_skips.append({"file": rel_path, "language": lang_key, "reason": reason})
+
+    def _custom_prefilter_passes(self, data, lang_key):
+        """
+        Custom parsers may declare "keywords"; when every parser for a language
+        does, a file containing none of them skips the custom regexes.
+        """
+        keywords = self.config.parser_keywords.get(lang_key)
+        if keywords is None:
+            return True
+        return any(data.find(kw) != -1 for kw in keywords)
+
     def _apply_custom_parsers(self, content, parsers, lang_key):
         """
         Apply custom regex parsers from config to extract imports.
@@ -807,46 +1017,30 @@ class AnalyzerCore:
         """
         imports = []
 
-        for parser in parsers:
-            pattern = parser.get("regex_pattern")
-            if not pattern:
-                continue
-
-            is_multiline = parser.get("is_multiline", False)
-            capture_group = parser.get("capture_group", 1)
-            pattern_name = parser.get("pattern_name", "unknown")
-
-            flags = re.MULTILINE if is_multiline else 0
-
-            try:
-                matches = re.findall(pattern, content, flags)
-
-                for match in matches:
-                    # Handle tuple results from multiple capture groups
-                    if isinstance(match, tuple):
-                        if capture_group <= len(match):
-                            raw_import = match[capture_group - 1]
-                        else:
-                            raw_import = match[0] if match else ""
+        # Compiled and validated with the config (see codegnosis_config)
+        for pattern_name, regex, capture_group in parsers:
+            for match in regex.findall(content):
+                # Handle tuple results from multiple capture groups
+                if isinstance(match, tuple):
+                    if capture_group <= len(match):
+                        raw_import = match[capture_group - 1]
                     else:
-                        raw_import = match
+                        raw_import = match[0] if match else ""
+                else:
+                    raw_import = match
 
-                    if not raw_import or not raw_import.strip():
-                        continue
+                if not raw_import or not raw_import.strip():
+                    continue
 
-                    # Convert raw import to file path based on language
-                    resolved = self._convert_import_to_path(
-                        raw_import.strip(), lang_key, pattern_name
-                    )
-                    if resolved:
-                        if isinstance(resolved, list):
-                            imports.extend(resolved)
-                        else:
-                            imports.append(resolved)
-
-            except re.error as e:
-                self.logger.warning(f"Invalid regex pattern '{pattern_name}': {e}")
-                continue
+                # Convert raw import to file path based on language
+                resolved = self._convert_import_to_path(
+                    raw_import.strip(), lang_key, pattern_name
+                )
+                if resolved:
+                    if isinstance(resolved, list):
+                        imports.extend(resolved)
+                    else:
+                        imports.append(resolved)
 
         return imports
 
@@ -893,30 +1087,15 @@ class AnalyzerCore:
 
         return raw_import
 
-    def _detect_python_imports(self, content):
-        """Detect Python imports."""
-        imports = []
-        try:
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.append(alias.name.replace(".", "/") + ".py")
-                elif isinstance(node, ast.ImportFrom) and node.module:
-                    imports.append(node.module.replace(".", "/") + ".py")
-        except:
-            pass
-        return imports
+    def _detect_python_imports(self, data):
+        """Detect Python imports as PythonImport records (resolved via the module index)."""
+        return import_resolution.scan_python_imports(data)
 
-    def _detect_js_imports(self, content):
-        """Detect JavaScript/TypeScript imports."""
-        imports = []
-        imports.extend(re.findall(r"import\s+.*?\s+from\s+['\"](.+?)['\"]", content))
-        imports.extend(re.findall(r"require\(['\"](.+?)['\"]\)", content))
-        imports.extend(re.findall(r"import\(['\"](.+?)['\"]\)", content))
-        return imports
+    def _detect_js_imports(self, data):
+        """Detect JavaScript/TypeScript imports, re-exports, import() and require()."""
+        return import_resolution.scan_js_imports(data)
 
-    def _detect_java_imports(self, content):
+    def _detect_java_imports(self, data):
         """
         Detect Java imports including standard, wildcard, and static imports.
         Converts FQN to file path format.
@@ -924,11 +1103,11 @@ class AnalyzerCore:
         imports = []
         # Standard and wildcard imports: import com.example.ClassName;
         standard_imports = re.findall(
-            r"^\s*import\s+([\w\.\*]+);", content, re.MULTILINE
+            rb"^\s*import\s+([\w\.\*]+);", data, re.MULTILINE
         )
         for imp in standard_imports:
             # Convert package.Class to package/Class.java (strip wildcard for resolution)
-            path = imp.replace(".", "/")
+            path = decode_bytes(imp).replace(".", "/")
             if path.endswith("/*"):
                 # Wildcard import - point to package directory
                 imports.append(path[:-2])
@@ -937,18 +1116,18 @@ class AnalyzerCore:
 
         # Static imports: import static com.example.ClassName.methodName;
         static_imports = re.findall(
-            r"^\s*import\s+static\s+([\w\.\*]+);", content, re.MULTILINE
+            rb"^\s*import\s+static\s+([\w\.\*]+);", data, re.MULTILINE
         )
         for imp in static_imports:
             # Static imports reference a class, extract class path (everything before last dot)
-            parts = imp.rsplit(".", 1)
+            parts = decode_bytes(imp).rsplit(".", 1)
             if len(parts) > 1:
                 class_path = parts[0].replace(".", "/") + ".java"
                 imports.append(class_path)
 
         return imports
 
-    def _detect_csharp_imports(self, content):
+    def _detect_csharp_imports(self, data):
         """
         Detect C# using directives including global, static, and aliased.
         Converts namespace to potential file path.
@@ -958,24 +1137,24 @@ class AnalyzerCore:
         # Standard namespace imports: using System.Collections.Generic;
         # Also handles: global using, using static
         namespace_imports = re.findall(
-            r"^\s*(?:global\s+)?using\s+(?:static\s+)?([\w\.]+);", content, re.MULTILINE
+            rb"^\s*(?:global\s+)?using\s+(?:static\s+)?([\w\.]+);", data, re.MULTILINE
         )
         for ns in namespace_imports:
             # Convert Namespace.Class to Namespace/Class.cs
-            path = ns.replace(".", "/") + ".cs"
+            path = decode_bytes(ns).replace(".", "/") + ".cs"
             imports.append(path)
 
         # Alias directives: using Alias = Namespace.Class;
         alias_imports = re.findall(
-            r"^\s*(?:global\s+)?using\s+\w+\s*=\s*([\w\.]+);", content, re.MULTILINE
+            rb"^\s*(?:global\s+)?using\s+\w+\s*=\s*([\w\.]+);", data, re.MULTILINE
         )
         for ns in alias_imports:
-            path = ns.replace(".", "/") + ".cs"
+            path = decode_bytes(ns).replace(".", "/") + ".cs"
             imports.append(path)
 
         return imports
 
-    def _detect_cpp_includes(self, content):
+    def _detect_cpp_includes(self, data):
         """
         Detect C/C++ #include directives for both angled and quoted forms.
         Handles system headers (<...>) and local headers ("...").
@@ -985,24 +1164,24 @@ class AnalyzerCore:
         # Angled brackets: #include <iostream> - system/library headers
         # These typically won't resolve to local files but we track them for completeness
         angled_includes = re.findall(
-            r"^\s*#\s*include\s*<([^>]+)>", content, re.MULTILINE
+            rb"^\s*#\s*include\s*<([^>]+)>", data, re.MULTILINE
         )
         for inc in angled_includes:
             # System headers - keep as-is, may or may not resolve locally
-            includes.append(inc)
+            includes.append(decode_bytes(inc))
 
         # Quoted includes: #include "myheader.h" - local/project headers
         # These are more likely to resolve to actual project files
         quoted_includes = re.findall(
-            r'^\s*#\s*include\s*"([^"]+)"', content, re.MULTILINE
+            rb'^\s*#\s*include\s*"([^"]+)"', data, re.MULTILINE
         )
         for inc in quoted_includes:
             # Local headers - keep path as specified
-            includes.append(inc)
+            includes.append(decode_bytes(inc))
 
         return includes
 
-    def _detect_go_imports(self, content):
+    def _detect_go_imports(self, data):
         """
         Detect Go import statements including single-line and block formats.
         Handles: import "fmt", import ( "fmt" "os" ), and aliased imports.
@@ -1011,25 +1190,25 @@ class AnalyzerCore:
 
         # Single-line imports: import "fmt" or import alias "path/to/pkg"
         single_imports = re.findall(
-            r'^\s*import\s+(?:\w+\s+)?"([^"]+)"', content, re.MULTILINE
+            rb'^\s*import\s+(?:\w+\s+)?"([^"]+)"', data, re.MULTILINE
         )
         imports.extend(single_imports)
 
         # Block imports: import ( "fmt" \n "os" )
         # First, find all import blocks
-        block_matches = re.findall(r"import\s*\(\s*([\s\S]*?)\s*\)", content)
+        block_matches = re.findall(rb"import\s*\(\s*([\s\S]*?)\s*\)", data)
         for block in block_matches:
             # Extract individual imports from within the block
             # Handles: "fmt", alias "path/pkg", . "pkg", _ "pkg"
-            block_imports = re.findall(r'(?:[\w._]\s+)?"([^"]+)"', block)
+            block_imports = re.findall(rb'(?:[\w._]\s+)?"([^"]+)"', block)
             imports.extend(block_imports)
 
         # Convert import paths to potential file paths
         # Go imports like "github.com/user/repo/pkg" -> keep as-is for now
         # Local imports like "./utils" -> resolve relatively
-        return imports
+        return [decode_bytes(imp) for imp in imports]
 
-    def _detect_rust_imports(self, content):
+    def _detect_rust_imports(self, data):
         """
         Detect Rust use statements including simple and grouped imports.
         Handles: use std::io, use std::{io, fs}, use crate::module.
@@ -1038,21 +1217,22 @@ class AnalyzerCore:
 
         # Simple use statements: use std::collections::HashMap;
         simple_uses = re.findall(
-            r"^\s*use\s+([\w:]+)(?:\s+as\s+\w+)?;", content, re.MULTILINE
+            rb"^\s*use\s+([\w:]+)(?:\s+as\s+\w+)?;", data, re.MULTILINE
         )
         for use_path in simple_uses:
             # Convert std::collections::HashMap to std/collections/HashMap.rs
             # But also handle crate:: and super:: prefixes
-            file_path = use_path.replace("::", "/") + ".rs"
+            file_path = decode_bytes(use_path).replace("::", "/") + ".rs"
             imports.append(file_path)
 
         # Grouped use statements: use std::{io, fs, collections::HashMap};
         grouped_uses = re.findall(
-            r"^\s*use\s+([\w:]+)::\{([^\}]+)\};", content, re.MULTILINE
+            rb"^\s*use\s+([\w:]+)::\{([^\}]+)\};", data, re.MULTILINE
         )
         for base_path, group in grouped_uses:
+            base_path = decode_bytes(base_path)
             # Split the group by comma and process each item
-            items = [item.strip() for item in group.split(",")]
+            items = [item.strip() for item in decode_bytes(group).split(",")]
             for item in items:
                 # Handle nested paths like collections::HashMap
                 item = item.split(" as ")[0].strip()  # Remove 'as alias' if present
@@ -1063,16 +1243,17 @@ class AnalyzerCore:
 
         # Also detect mod declarations which indicate submodule files
         mod_declarations = re.findall(
-            r"^\s*(?:pub\s+)?mod\s+(\w+);", content, re.MULTILINE
+            rb"^\s*(?:pub\s+)?mod\s+(\w+);", data, re.MULTILINE
         )
         for mod_name in mod_declarations:
+            mod_name = decode_bytes(mod_name)
             # mod foo; means either foo.rs or foo/mod.rs exists
             imports.append(mod_name + ".rs")
             imports.append(mod_name + "/mod.rs")
 
         return imports
 
-    def _detect_php_dependencies(self, content):
+    def _detect_php_dependencies(self, data):
         """
         Detect PHP dependencies including modern namespace 'use' statements
         and traditional include/require statements.
@@ -1083,19 +1264,20 @@ class AnalyzerCore:
         # Modern namespace use statements: use App\Utils\Logger;
         # Also handles: use App\Utils\Logger as Log;
         namespace_uses = re.findall(
-            r"^\s*use\s+([\w\\]+)(?:\s+as\s+\w+)?;", content, re.MULTILINE
+            rb"^\s*use\s+([\w\\]+)(?:\s+as\s+\w+)?;", data, re.MULTILINE
         )
         for ns in namespace_uses:
             # Convert namespace to PSR-4 style path: App\Utils\Logger -> App/Utils/Logger.php
-            path = ns.replace("\\", "/") + ".php"
+            path = decode_bytes(ns).replace("\\", "/") + ".php"
             imports.append(path)
 
         # Grouped use statements: use App\Models\{User, Post, Comment};
         grouped_uses = re.findall(
-            r"^\s*use\s+([\w\\]+)\\\{([^\}]+)\};", content, re.MULTILINE
+            rb"^\s*use\s+([\w\\]+)\\\{([^\}]+)\};", data, re.MULTILINE
         )
         for base_ns, group in grouped_uses:
-            items = [item.strip() for item in group.split(",")]
+            base_ns = decode_bytes(base_ns)
+            items = [item.strip() for item in decode_bytes(group).split(",")]
             for item in items:
                 # Remove 'as Alias' if present
                 item = item.split(" as ")[0].strip()
@@ -1108,43 +1290,46 @@ class AnalyzerCore:
         # Handles: require 'file.php', include "path/to/file.php"
         # require_once, include_once variants
         include_patterns = [
-            r"^\s*(?:require|include)(?:_once)?\s*\(\s*['\"]([^'\"]+)['\"]\s*\)",
-            r"^\s*(?:require|include)(?:_once)?\s+['\"]([^'\"]+)['\"]",
+            rb"^\s*(?:require|include)(?:_once)?\s*\(\s*['\"]([^'\"]+)['\"]\s*\)",
+            rb"^\s*(?:require|include)(?:_once)?\s+['\"]([^'\"]+)['\"]",
         ]
 
         for pattern in include_patterns:
-            matches = re.findall(pattern, content, re.MULTILINE)
+            matches = re.findall(pattern, data, re.MULTILINE)
             for match in matches:
+                match = decode_bytes(match)
                 # Filter out dynamic paths (containing variables like $var)
                 if not match.startswith("$") and "$" not in match:
                     imports.append(match)
 
         return imports
 
-    def _detect_html_refs(self, content):
+    def _detect_html_refs(self, data):
         """Detect HTML script/link/img references."""
         refs = []
         refs.extend(
-            re.findall(r'<script[^>]+src=["\'](.+?)["\']', content, re.IGNORECASE)
+            re.findall(rb'<script[^>]+src=["\'](.+?)["\']', data, re.IGNORECASE)
         )
         refs.extend(
-            re.findall(r'<link[^>]+href=["\'](.+?)["\']', content, re.IGNORECASE)
+            re.findall(rb'<link[^>]+href=["\'](.+?)["\']', data, re.IGNORECASE)
         )
-        refs.extend(re.findall(r'<img[^>]+src=["\'](.+?)["\']', content, re.IGNORECASE))
+        refs.extend(re.findall(rb'<img[^>]+src=["\'](.+?)["\']', data, re.IGNORECASE))
+        refs = [decode_bytes(r) for r in refs]
         return [r for r in refs if not r.startswith(("http://", "https://", "//"))]
 
-    def _detect_css_refs(self, content):
+    def _detect_css_refs(self, data):
         """Detect CSS @import and url() references."""
         refs = []
-        refs.extend(re.findall(r'@import\s+["\'](.+?)["\']', content))
-        refs.extend(re.findall(r'url\(["\']?(.+?)["\']?\)', content))
+        refs.extend(re.findall(rb'@import\s+["\'](.+?)["\']', data))
+        refs.extend(re.findall(rb'url\(["\']?(.+?)["\']?\)', data))
+        refs = [decode_bytes(r) for r in refs]
         return [r for r in refs if not r.startswith(("http://", "https://", "data:"))]
 
-    def _detect_json_refs(self, content):
+    def _detect_json_refs(self, data):
         """Detect JSON file references."""
         refs = []
         try:
-            data = json.loads(content)
+            data = json.loads(bytes(data))
 
             def extract_refs(obj):
                 if isinstance(obj, dict):
@@ -1162,11 +1347,45 @@ class AnalyzerCore:
             pass
         return refs
 
-    def _resolve_path(self, from_file, ref_str):
+    def _resolve_path(self, from_file, ref_str, from_rel=None):
         """Resolve a reference string to an actual file path."""
         if not ref_str:
             return None
 
+        if isinstance(ref_str, PythonImport):
+            return self.python_index.resolve(from_rel or self._get_relpath(from_file), ref_str)
+
+        # Every file in one directory gets the same answer for a specifier
+        key = (os.path.dirname(from_file), ref_str)
+        try:
+            return self.resolve_cache[key]
+        except KeyError:
+            pass
+        if self.spill is not None and len(self.resolve_cache) >= self.spill.resolve_cache_limit:
+            self.resolve_cache.clear()
+        resolved = self._resolve_uncached(Path(from_file).parent, ref_str)
+        if resolved is not None:
+            # Cached answers share the table's key strings
+            resolved = sys.intern(resolved)
+        self.resolve_cache[key] = resolved
+        return resolved
+
+    def _resolve_uncached(self, current_dir, ref_str):
+        """Resolve ref_str from current_dir without consulting the cache."""
+        # tsconfig/jsconfig aliases (@/components, ~utils) before the
+        # bare-package check, which would otherwise claim them
+        if not ref_str.startswith("."):
+            for base in self.path_aliases.candidates(ref_str):
+                resolved = self._probe_module_path(Path(base))
+                if resolved:
+                    return resolved
+            # Sibling packages of a monorepo (@org/ui, my_crate::x) point at
+            # their workspace, not an ext: node; unregistered hits (dist/) don't count
+            for base in self.workspaces.candidates(ref_str):
+                resolved = self._probe_module_path(Path(base))
+                if resolved in self.file_types:
+                    return resolved
+
         # Capture external packages (no ./ or ../ prefix and no extension)
         if (
             not ref_str.startswith(".")
@@ -1175,7 +1394,6 @@ class AnalyzerCore:
         ):
             return f"ext:{ref_str}"  # Virtual external node
 
-        current_dir = Path(from_file).parent
         candidates = []
 
         # Handle relative paths first
@@ -1190,7 +1408,7 @@ class AnalyzerCore:
         candidates.extend([current_dir / ref_str, self.project_dir / ref_str])
 
         # Try with extensions if no suffix
-        extensions = [".ts", ".tsx", ".js", ".jsx", ".json", ".py", ".cjs", ".mjs"]
+        extensions = self.RESOLVE_EXTENSIONS
         if not Path(ref_str).suffix:
             for ext in extensions:
                 candidates.append(current_dir / (ref_str + ext))
@@ -1210,6 +1428,20 @@ class AnalyzerCore:
 
         return None
 
+    def _probe_module_path(self, base):
+        """Resolve an alias target as a file, file + extension, or directory index."""
+        candidates = [base]
+        if not base.suffix:
+            candidates.extend(base.with_name(base.name + ext) for ext in self.RESOLVE_EXTENSIONS)
+        candidates.extend(base / f"index{ext}" for ext in self.RESOLVE_EXTENSIONS)
+        for candidate in candidates:
+            try:
+                if candidate.is_file() and candidate.is_relative_to(self.project_dir):
+                    return self._get_relpath(candidate)
+            except Exception:
+                pass
+        return None
+
     def _analyze_connectivity(self, files):
         """Analyze asset connectivity - find missing assets and orphaned files."""
         asset_patterns = [
@@ -1233,22 +1465,25 @@ class AnalyzerCore:
         all_existing_files = set(self.file_types.keys())
         referenced_files = set()
 
-        for file_path in files:
-            rel_path = self._get_relpath(file_path)
-            category = self.file_types.get(rel_path)
+        for entry in files:
+            rel_path = entry.rel_path
+            category = self.file_table.categories[entry.category]
 
             if category in ["Image", "Video", "Audio", "Font", "Archive"]:
                 continue
+            if entry.kind != file_discovery.KIND_TEXT:
+                continue
 
+            started = time.perf_counter() if self.profiler is not None else 0
             try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                with open(entry.path, "r", encoding="utf-8", errors="ignore") as f:
                     content = f.read()
 
                 file_refs = []
 
                 for pattern, applicable_types in asset_patterns:
                     if not any(
-                        ext in str(file_path).lower() for ext in applicable_types
+                        ext in entry.path.lower() for ext in applicable_types
                     ):
                         continue
 
@@ -1258,7 +1493,7 @@ class AnalyzerCore:
                         if not asset_ref or asset_ref.startswith("http"):
                             continue
 
-                        resolved = self._resolve_asset_path(file_path, asset_ref)
+                        resolved = self._resolve_asset_path(entry.path, asset_ref)
 
                         if resolved:
                             referenced_files.add(resolved)
@@ -1270,10 +1505,14 @@ class AnalyzerCore:
                                 self.missing_assets[rel_path].append(asset_ref)
 
                 if file_refs:
-                    self.asset_references[rel_path] = file_refs
+                    entry.assets = file_refs
 
             except Exception:
                 pass
+            if self.profiler is not None:
+                self.profiler.record(
+                    "_analyze_connectivity", rel_path, entry.size, time.perf_counter() - started
+                )
 
         for deps in self.file_graph.values():
             referenced_files.update(deps)
@@ -1287,6 +1526,8 @@ class AnalyzerCore:
         entry_points = all_existing_files - imported_files
 
         self.orphaned_files = self.orphaned_files - entry_points
+        for rel_path in self.orphaned_files:
+            self.file_table.get(rel_path).flags |= file_records.FLAG_UNUSED
 
     def _resolve_asset_path(self, from_file, asset_ref):
         """Resolve an asset reference to a file path."""
@@ -1367,37 +1608,6 @@ class AnalyzerCore:
 
     # --- Metrics and Report Methods (Retained for JSON/MD/HTML Exports) ---
 
-    def _detect_circular_dependencies(self, graph):
-        """Detect circular dependencies in the graph."""
-        cycles = []
-        visited = set()
-        rec_stack = []
-
-        def dfs(node, path):
-            if node in rec_stack:
-                cycle_start = rec_stack.index(node)
-                cycle = rec_stack[cycle_start:] + [node]
-                if len(cycle) <= 5 and cycle not in cycles:
-                    cycles.append(cycle)
-                return
-
-            if node in visited:
-                return
-
-            visited.add(node)
-            rec_stack.append(node)
-
-            for neighbor in graph.get(node, []):
-                dfs(neighbor, path + [neighbor])
-
-            rec_stack.pop()
-
-        for node in graph:
-            if node not in visited:
-                dfs(node, [node])
-
-        return cycles[:10]
-
     def _calculate_max_chain_depth(self, graph):
         """Calculate the maximum dependency chain depth."""
 
@@ -1425,30 +1635,6 @@ class AnalyzerCore:
 
         return max_depth
 
-    def _calculate_chain_depths(self, graph):
-        """Calculate per-node dependency chain depth (longest path from node)."""
-        memo = {}
-        visiting = set()
-
-        def dfs(node):
-            if node in memo:
-                return memo[node]
-            if node in visiting:
-                return 0
-            visiting.add(node)
-            deps = graph.get(node, [])
-            if not deps:
-                depth = 1
-            else:
-                depth = 1 + max((dfs(dep) for dep in deps), default=0)
-            visiting.remove(node)
-            memo[node] = depth
-            return depth
-
-        for node in graph:
-            dfs(node)
-        return memo
-
     def _calculate_connectivity_score(self, analyzer):
         """Calculate connectivity health score (0-100)."""
         total_files = len(analyzer.file_types)
@@ -1732,37 +1918,228 @@ class AnalyzerCore:
     def generate_analysis_report(self):
         """Compiles all analysis data into a single JSON-ready report."""
         self.emit_progress("report", 70, "Analysis report generated")
-        total_files = len(self.file_types)
-        total_connections = sum(len(deps) for deps in self.file_graph.values())
-
-        # Calculate derived stats
-        import_counts = {file: 0 for file in self.file_types.keys()}
-        for deps in self.file_graph.values():
-            for dep in deps:
-                import_counts[dep] = import_counts.get(dep, 0) + 1
+        self._measure_records()
+        if self.spill is not None:
+            return self._generate_spilled_report()
+        table = self.file_table
+        records = table.records
+        total_connections = table.edge_count()
+        importer_offsets, importer_sources = table.importers()
+        inbound = [importer_offsets[i + 1] - importer_offsets[i] for i in range(len(records))]
+
+        # import_counts has always had every registered file as a key, so
+        # no file qualifies as an entry point
+        entry_points = []
+        self._flag_entry_points(entry_points)
+
+        offsets, targets = table.csr()
+        circular_deps = [
+            [records[i].rel_path for i in cycle]
+            for cycle in graph_algorithms.csr_short_cycles(offsets, targets)
+        ]
+        chain_depths = graph_algorithms.csr_chain_depths(offsets, targets)
+        page_ranks = graph_algorithms.csr_pagerank(offsets, targets)
+        betweenness = graph_algorithms.csr_betweenness(offsets, targets)
+        communities = self.communities = graph_algorithms.csr_communities(offsets, targets)
+        self.node_metrics = {
+            "pageRank": page_ranks, "betweenness": betweenness, "chainDepth": chain_depths,
+        }
+        community_summary = self._community_summary(communities, offsets, targets, page_ranks)
+        del offsets, targets
+        hub_files = self._hub_files(inbound, page_ranks, betweenness)
+        cycle_participation, cycles_payload = self._cycle_payload(circular_deps)
+        health_warnings = self._health_warnings(circular_deps)
+
+        max_depth = self._calculate_max_chain_depth(
+            {i: record.deps for i, record in enumerate(records)}
+        )
+        isolated_nodes = sum(
+            1 for i, record in enumerate(records) if not record.deps and inbound[i] == 0
+        )
+        detailed_files = file_records.FilesView(
+            table, (importer_offsets, importer_sources), chain_depths, cycle_participation,
+            page_ranks, betweenness, communities,
+        )
+        return self._assemble_report(
+            total_connections, entry_points, hub_files, health_warnings, cycles_payload,
+            circular_deps, max_depth, isolated_nodes, detailed_files, self.file_graph,
+            community_summary,
+        )
 
-        imported_files = set(import_counts.keys())
-        entry_points = [
-            {"file": file, "category": self.file_types[file]}
-            for file in self.file_types.keys()
-            if file not in imported_files
+    def _generate_spilled_report(self):
+        """
+        generate_analysis_report for bounded-memory runs. The graph is read
+        back from the spill store as flat arrays, per-file records are
+        written to the store as they are built, and the report's `files`
+        and `dependencyGraph` are views over the store.
+        """
+        store = self.spill
+        records = self.file_table.records
+        categories = self.file_table.categories
+        total_connections = store.edge_count
+        inbound = store.inbound_counts()
+
+        entry_points = []
+        self._flag_entry_points(entry_points)
+
+        offsets, targets = store.csr()
+        circular_deps = [
+            [records[i].rel_path for i in cycle]
+            for cycle in graph_algorithms.csr_short_cycles(offsets, targets)
         ]
+        chain_depths = graph_algorithms.csr_chain_depths(offsets, targets)
+        page_ranks = graph_algorithms.csr_pagerank(offsets, targets)
+        betweenness = graph_algorithms.csr_betweenness(offsets, targets)
+        communities = self.communities = graph_algorithms.csr_communities(offsets, targets)
+        self.node_metrics = {
+            "pageRank": page_ranks, "betweenness": betweenness, "chainDepth": chain_depths,
+        }
+        community_summary = self._community_summary(communities, offsets, targets, page_ranks)
+        isolated_nodes = sum(
+            1 for i in range(len(inbound)) if inbound[i] == 0 and offsets[i] == offsets[i + 1]
+        )
+        del offsets, targets
+        hub_files = self._hub_files(inbound, page_ranks, betweenness)
+        cycle_participation, cycles_payload = self._cycle_payload(circular_deps)
+        health_warnings = self._health_warnings(circular_deps)
+
+        for file_id, file, imports, imported_by in store.neighbour_lists():
+            store.add_record(
+                file_id,
+                file_records.file_info(
+                    records[file_id],
+                    categories[records[file_id].category],
+                    imports,
+                    imported_by,
+                    chain_depths[file_id],
+                    cycle_participation.get(file, 0),
+                    page_ranks[file_id],
+                    betweenness[file_id],
+                    communities[file_id],
+                ),
+            )
+        store.finish_records()
+
+        # The longest simple path is exponential to search on a large graph;
+        # the longest memoised chain equals it whenever the graph is acyclic
+        max_depth = max(chain_depths, default=0)
+        return self._assemble_report(
+            total_connections, entry_points, hub_files, health_warnings, cycles_payload,
+            circular_deps, max_depth, isolated_nodes, store.files_view(), self.file_graph,
+            community_summary,
+        )
 
-        hub_files = sorted(import_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        hub_files = [
+    def _hub_files(self, inbound, page_ranks, betweenness):
+        """
+        The ten most central imported files: highest PageRank, then most
+        importers, ties in registration order.
+        """
+        records = self.file_table.records
+        categories = self.file_table.categories
+        ranked = heapq.nsmallest(
+            10,
+            (i for i in range(len(inbound)) if inbound[i] > 0),
+            key=lambda i: (-page_ranks[i], -inbound[i], i),
+        )
+        return [
             {
-                "file": file,
-                "importedBy": count,
-                "category": self.file_types.get(file, "Unknown"),
+                "file": records[i].rel_path,
+                "importedBy": inbound[i],
+                "category": categories[records[i].category],
+                "pageRank": file_records.centrality(page_ranks[i]),
+                "betweenness": file_records.centrality(betweenness[i]),
             }
-            for file, count in hub_files
-            if count > 0
+            for i in ranked
         ]
 
-        circular_deps = self._detect_circular_dependencies(self.file_graph)
-        chain_depths = self._calculate_chain_depths(self.file_graph)
+    def _community_summary(self, communities, offsets, targets, page_ranks):
+        """
+        The report's `communities`: per community its size, most common
+        directory, most central file and import counts, plus the
+        community-level import graph (edges weighted by imports). Files
+        without imports belong to none and are only counted.
+        """
+        records = self.file_table.records
+        count = max(communities, default=-1) + 1
+        sizes = [0] * count
+        internal = [0] * count
+        outgoing = [0] * count
+        hubs = [-1] * count
+        directories = [{} for _ in range(count)]
+        links = {}
+        unclustered = 0
+        for node, own in enumerate(communities):
+            if own < 0:
+                unclustered += 1
+                continue
+            sizes[own] += 1
+            if hubs[own] < 0 or page_ranks[node] > page_ranks[hubs[own]]:
+                hubs[own] = node
+            record = records[node]
+            directory = "external" if record.path is None else record.rel_path.rpartition("/")[0] or "."
+            counts = directories[own]
+            counts[directory] = counts.get(directory, 0) + 1
+            for pos in range(offsets[node], offsets[node + 1]):
+                other = communities[targets[pos]]
+                if other == own:
+                    internal[own] += 1
+                else:
+                    outgoing[own] += 1
+                    links[own, other] = links.get((own, other), 0) + 1
+        return {
+            "count": count,
+            "unclustered": unclustered,
+            "modularity": round(graph_algorithms.csr_modularity(offsets, targets, communities), 4),
+            "groups": [
+                {
+                    "id": c,
+                    "size": sizes[c],
+                    "directory": max(directories[c], key=directories[c].get),
+                    "hub": records[hubs[c]].rel_path,
+                    "internalImports": internal[c],
+                    "externalImports": outgoing[c],
+                }
+                for c in range(count)
+            ],
+            "edges": [
+                {"source": source, "target": target, "imports": imports}
+                for (source, target), imports in sorted(links.items())
+            ],
+        }
+
+    def _flag_entry_points(self, entry_points):
+        for entry_point in entry_points:
+            self.file_table.get(entry_point["file"]).flags |= file_records.FLAG_ENTRY_POINT
+
+    def _measure_records(self):
+        """Fill in line counts and signatures on the file records."""
+        media = {
+            self.file_table.category_codes.get(category)
+            for category in ["Image", "Video", "Audio", "Font"]
+        }
+        for record in self.file_table.records:
+            if record.path is None:
+                continue
+            try:
+                if record.kind == file_discovery.KIND_OVERSIZED:
+                    record.lines = count_lines_streaming(record.path)
+                elif record.kind == file_discovery.KIND_TEXT and record.category not in media:
+                    with open(
+                        record.path, "r", encoding="utf-8", errors="ignore"
+                    ) as f:
+                        content = f.read()
+                        record.lines = len(content.splitlines())
 
-        cycle_participation = {file: 0 for file in self.file_types.keys()}
+                        # HUMAN TRACE: Scan for signatures
+                        sig_match = re.search(r'(?i)(?:by|author|created\s+by|todo):\s*([A-Za-z\s]{3,20})', content)
+                        if sig_match:
+                            record.signature = sig_match.group(1).strip()
+            except:
+                pass
+
+    def _cycle_payload(self, circular_deps):
+        """Per-file cycle counts and the report's `cycles` entries."""
+        cycle_participation = {}
         cycles_payload = []
         for cycle in circular_deps:
             for file in cycle:
@@ -1775,8 +2152,9 @@ class AnalyzerCore:
                     "severity": "high",
                 }
             )
+        return cycle_participation, cycles_payload
 
-        # Health warnings compilation
+    def _health_warnings(self, circular_deps):
         health_warnings = []
         for cycle in circular_deps:
             health_warnings.append(
@@ -1805,62 +2183,23 @@ class AnalyzerCore:
         # Tauri 2 permission checks
         tauri_warnings = self._check_tauri_permissions()
         health_warnings.extend(tauri_warnings)
+        return health_warnings
 
-        # Build detailed file info
-        detailed_files = {}
-        for file, file_type in self.file_types.items():
-            file_path = Path(self.project_dir) / file
-            inbound_count = import_counts.get(file, 0)
-            outbound_count = len(self.file_graph.get(file, []))
-            depth_from_root = len(file.split("/")) - 1
-            
-            # Default metadata for all files (including external)
-            file_info = {
-                "category": file_type,
-                "imports": self.file_graph.get(file, []),
-                "importedBy": [
-                    f for f, deps in self.file_graph.items() if file in deps
-                ],
-                "isEntryPoint": file in [ep["file"] for ep in entry_points],
-                "dependencyCount": len(self.file_graph.get(file, [])),
-                "isUnused": file in self.orphaned_files,
-                "inboundCount": inbound_count,
-                "outboundCount": outbound_count,
-                "depthFromRoot": depth_from_root,
-                "chainDepth": chain_depths.get(file, 1),
-                "cycleParticipation": cycle_participation.get(file, 0),
-                "mtime": 0,
-                "size": "0KB",
-                "signature": None
-            }
-            
-            try:
-                if not file.startswith("ext:") and file_path.exists():
-                    stat = file_path.stat()
-                    file_info["size"] = f"{stat.st_size / 1024:.1f}KB"
-                    file_info["mtime"] = stat.st_mtime
-                    file_info["ctime"] = stat.st_ctime
-                    file_info["lastModified"] = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
-                    
-                    if file_type not in ["Image", "Video", "Audio", "Font"]:
-                        with open(
-                            file_path, "r", encoding="utf-8", errors="ignore"
-                        ) as f:
-                            content = f.read()
-                            file_info["lines"] = len(content.splitlines())
-                            
-                            # HUMAN TRACE: Scan for signatures
-                            sig_match = re.search(r'(?i)(?:by|author|created\s+by|todo):\s*([A-Za-z\s]{3,20})', content)
-                            if sig_match:
-                                file_info["signature"] = sig_match.group(1).strip()
-            except:
-                pass
-            detailed_files[file] = file_info
+    def _assemble_report(
+        self, total_connections, entry_points, hub_files, health_warnings, cycles_payload,
+        circular_deps, max_depth, isolated_nodes, detailed_files, dependency_graph,
+        community_summary,
+    ):
+        total_files = len(self.file_types)
 
         # Build profile (dev footprint, shipping weight, dependencies)
         self.emit_progress("buildProfile", 80, "Analyzing build profile and dependencies")
         build_profile = analyze_build_profile(self.project_dir)
 
+        languages = {}
+        for file_type in self.file_types.values():
+            languages[file_type] = languages.get(file_type, 0) + 1
+
         # Final Report Data
         report = {
             "projectName": self.project_dir.name,
@@ -1869,15 +2208,13 @@ class AnalyzerCore:
             "summary": {
                 "totalFiles": total_files,
                 "totalConnections": total_connections,
-                "languages": {
-                    t: list(self.file_types.values()).count(t)
-                    for t in set(self.file_types.values())
-                },
+                "languages": languages,
                 "detectedFrameworks": self._detect_frameworks(self.file_types),
                 "projectType": self._detect_project_type(self.file_types, entry_points),
             },
             "entryPoints": entry_points,
             "hubFiles": hub_files,
+            "communities": community_summary,
             "healthWarnings": health_warnings,
             "cycles": cycles_payload,
             "brokenReferences": [
@@ -1887,27 +2224,93 @@ class AnalyzerCore:
             "graphStats": {
                 "totalNodes": total_files,
                 "totalEdges": total_connections,
-                "maxDepth": self._calculate_max_chain_depth(self.file_graph),
+                "maxDepth": max_depth,
                 "cycleCount": len(circular_deps),
-                "isolatedNodes": len([f for f, deps in self.file_graph.items() if not deps and import_counts.get(f, 0) == 0]),
+                "isolatedNodes": isolated_nodes,
             },
             "statistics": {
                 "avgDependenciesPerFile": (
                     round(total_connections / total_files, 2) if total_files > 0 else 0
                 ),
-                "maxDependencyChainDepth": self._calculate_max_chain_depth(
-                    self.file_graph
-                ),
+                "maxDependencyChainDepth": max_depth,
                 "circularDependencies": len(circular_deps),
                 "unusedFiles": len(self.orphaned_files),
                 "filesWithMissingAssets": len(self.missing_assets),
                 "connectivityHealthScore": self._calculate_connectivity_score(self),
             },
             "files": detailed_files,
-            "dependencyGraph": self.file_graph,
+            "dependencyGraph": dependency_graph,
         }
         return report
 
+    # --- Graph Queries ---
+
+    def affected_by(self, changed_files):
+        """
+        Blast radius of a change: every file that transitively imports any of
+        changed_files (themselves included), and the subset whose
+        ai_packager role is `tests`, so CI can run only those.
+        """
+        if self.reachability is None:
+            self.reachability = graph_algorithms.ReachabilityIndex(self.file_graph)
+
+        changed = []
+        unknown = []
+        for path in changed_files:
+            rel_path = str(path).replace("\\", "/")
+            if os.path.isabs(rel_path):
+                try:
+                    rel_path = self._get_relpath(rel_path)
+                except ValueError:
+                    pass
+            if rel_path in self.file_types:
+                changed.append(rel_path)
+            else:
+                unknown.append(rel_path)
+
+        affected = sorted(
+            f for f in self.reachability.dependents(changed) if not f.startswith("ext:")
+        )
+        affected_tests = []
+        if ai_packager:
+            affected_tests = [
+                f for f in affected
+                if ai_packager.categorize_file(f, {"category": self.file_types.get(f)}) == "tests"
+            ]
+        return {
+            "changedFiles": changed,
+            "unknownFiles": unknown,
+            "affectedFiles": affected,
+            "affectedTests": affected_tests,
+        }
+
+    def subgraph(self, query, max_nodes=subgraphs.DEFAULT_MAX_NODES):
+        """
+        A bounded slice of the analysed graph (see subgraphs): the top files
+        by a metric, one file's k-hop neighbourhood, or one directory.
+        """
+        if self.subgraph_index is None:
+            store = self.spill
+            offsets, targets = store.csr() if store is not None else self.file_table.csr()
+            records = self.file_table.records
+            categories = self.file_table.categories
+            self.subgraph_index = subgraphs.SubgraphIndex(
+                [record.rel_path for record in records],
+                [categories[record.category] for record in records],
+                offsets,
+                targets,
+                self.node_metrics or {},
+                self.communities,
+            )
+        if isinstance(query, str):
+            query = subgraphs.parse_query(query)
+        if query["kind"] == "hops" and os.path.isabs(query["file"]):
+            try:
+                query = dict(query, file=self._get_relpath(query["file"]))
+            except ValueError:
+                pass
+        return self.subgraph_index.query(query, max_nodes)
+
     def _log(self, msg: str):
         pass
 
@@ -1920,15 +2323,26 @@ def analyze_project_cli(
     theme_name,
     format_name,
     progress_file_path=None,
+    sqlite_path=None,
+    affected_by=None,
+    profile_path=None,
+    layout=False,
+    subgraph=None,
+    use_cache=True,
 ):
     """
     Main entry point for the Electron/Node.js bridge.
     Receives JSON arguments, performs analysis, and prints result to stdout.
+    An unchanged project gets its stored result back (see result_cache).
     """
     orig_stdout = sys.stdout
     # Force all non-JSON output to stderr to protect stdout for JSON only.
     sys.stdout = sys.stderr
+    analyzer = None
+    cprofile = None
     try:
+        if profile_path:
+            cprofile = profiling.start_cprofile()
         extensions = (
             [e.strip() for e in extensions_str.split(",") if e.strip()]
             if extensions_str
@@ -1949,16 +2363,74 @@ def analyze_project_cli(
             config=config,
             progress_file_path=progress_file_path,
         )
+        if cprofile is not None:
+            analyzer.profiler = profiling.StageProfiler()
+            # Shards run in worker processes the profiler can't see
+            analyzer.workspace_sharding = False
+
+        ai_bundle_path = Path(project_path) / f"ai_bundle_{analyzer.project_dir.name}.txt"
+        ai_bundles = []
+        cache = None
+        # A profiled run is always a real one
+        if use_cache and analyzer.result_cache and cprofile is None:
+            import result_cache
+
+            options = {
+                "extensions": extensions_str,
+                "excluded": excluded_str,
+                "theme": theme_name,
+                "format": format_name,
+                "sqlite": sqlite_path,
+                "affectedBy": affected_by,
+                "layout": bool(layout),
+                "subgraph": subgraph,
+            }
+            try:
+                # Bundles are written into the project, possibly split into parts
+                cache = result_cache.ResultCache(analyzer, options, skip=[ai_bundle_path.stem])
+                cached_payload = cache.lookup()
+            except Exception as e:
+                analyzer.logger.warning(f"Result cache unavailable: {e}")
+                cache = cached_payload = None
+            if cached_payload is not None:
+                analyzer.emit_progress("done", 100, "Project unchanged; reusing the stored analysis")
+                orig_stdout.write(json.dumps(cached_payload))
+                orig_stdout.flush()
+                return
+            if cache is not None:
+                cache.prepare()
         analyzer.logger.info("Starting analysis")
         report = analyzer.analyze()
 
         # Include config info in report for transparency
         report["configLoaded"] = bool(config.get("language_extensions"))
 
+        if affected_by:
+            report["impact"] = analyzer.affected_by(
+                [f.strip() for f in affected_by.split(",") if f.strip()]
+            )
+            analyzer.logger.info(
+                f"Impact: {len(report['impact']['affectedFiles'])} affected files, "
+                f"{len(report['impact']['affectedTests'])} affected tests"
+            )
+
+        if subgraph:
+            try:
+                report["subgraph"] = analyzer.subgraph(subgraph)
+                analyzer.logger.info(
+                    f"Subgraph {subgraph}: {len(report['subgraph']['nodes'])} nodes, "
+                    f"{len(report['subgraph']['edges'])} edges"
+                )
+            except ValueError as e:
+                report["subgraph"] = {"query": subgraph, "error": str(e)}
+                analyzer.logger.warning(f"Subgraph query failed: {e}")
+
         # --- MULTIPLIER: Ghost Protocol (Compliance Scan) ---
         if ghost_protocol:
-            # Ghost Protocol reads its own config internally from project_path
-            compliance_report = ghost_protocol.perform_compliance_scan(report, project_path)
+            # Ghost Protocol checks the same compiled config the analyzer ran with
+            compliance_report = ghost_protocol.perform_compliance_scan(
+                report, project_path, analyzer.config
+            )
             analyzer.emit_progress("compliance", 85, "Compliance scan complete")
             report["complianceReport"] = compliance_report
         else:
@@ -1977,7 +2449,10 @@ def analyze_project_cli(
         )
         graph_format = "svg" if is_large else "png"
 
-        safe_graph_dir = Path(tempfile.gettempdir()) / "codegnosis_graphs"
+        if cache is not None:
+            safe_graph_dir = cache.graph_dir
+        else:
+            safe_graph_dir = Path(tempfile.gettempdir()) / "codegnosis_graphs"
         try:
             safe_graph_dir.mkdir(parents=True, exist_ok=True)
         except Exception:
@@ -2030,24 +2505,64 @@ def analyze_project_cli(
                 "Graph skipped due to size cap; view JSON-only for this project."
             )
 
+        if cprofile is not None:
+            report["profile"] = analyzer.profiler.to_dict()
+            report["profile"]["pstatsFile"] = profiling.stop_cprofile(cprofile, profile_path)
+            cprofile = None
+            analyzer.logger.info(f"Profile written to {report['profile']['pstatsFile']}")
+
         # Write report to temp file to avoid IPC payload size limits
-        result_file = Path(tempfile.gettempdir()) / "codegnosis_result.json"
-        with open(result_file, "w", encoding="utf-8") as f:
-            json.dump(report, f)
+        if cache is not None:
+            result_file = cache.result_path
+        else:
+            result_file = Path(tempfile.gettempdir()) / "codegnosis_result.json"
+        if layout or analyzer.precompute_layout:
+            try:
+                report["layout"] = analyzer.write_layout(result_file.with_suffix(".layout.bin"))
+            except Exception as e:
+                analyzer.logger.warning(f"Layout precomputation failed: {e}")
+        analyzer.write_report(report, result_file)
+
+        result_payload = {"resultFile": str(result_file)}
+        if "profile" in report:
+            result_payload["profileFile"] = report["profile"]["pstatsFile"]
+        if "layout" in report:
+            result_payload["layoutFile"] = report["layout"]["file"]
+
+        # Optional indexed store for paging/querying without loading the JSON
+        if sqlite_path and sqlite_store:
+            try:
+                result_payload["graphStore"] = sqlite_store.export_sqlite(report, sqlite_path)
+                analyzer.logger.info(f"Graph store written to {result_payload['graphStore']}")
+            except Exception as e:
+                analyzer.logger.warning(f"Graph store export failed: {e}")
 
         analyzer.emit_progress("finalizing", 98, "Writing final report")
         # Return just the file path - frontend will read the file directly
         # Ensure we write ONLY JSON to stdout
-        orig_stdout.write(json.dumps({"resultFile": str(result_file)}))
+        orig_stdout.write(json.dumps(result_payload))
         orig_stdout.flush()
 
         # --- MULTIPLIER: AI Context Packaging ---
-        if ai_packager:
+        if ai_packager and analyzer.spill is not None:
+            # Bundles hold every file's content in memory; not under a ceiling
+            analyzer.logger.info("Skipping AI bundle in bounded-memory mode")
+        elif ai_packager:
             # Use consistent filename to overwrite instead of creating new files
-            ai_bundle_name = f"ai_bundle_{report['projectName']}.txt"
-            ai_bundle_path = Path(project_path) / ai_bundle_name
-            ai_packager.package_for_ai(report, ai_bundle_path, project_path)
+            ai_bundles = ai_packager.package_for_ai(
+                report, ai_bundle_path, project_path, analyzer.config
+            )
 
+        if cache is not None:
+            cache.store(
+                result_payload,
+                [
+                    graph_path,
+                    result_payload.get("layoutFile"),
+                    result_payload.get("graphStore"),
+                ]
+                + list(ai_bundles),
+            )
         analyzer.emit_progress("done", 100, "Analysis complete")
 
     except FileNotFoundError as e:
@@ -2084,11 +2599,19 @@ def analyze_project_cli(
         sys.exit(1)
     finally:
         sys.stdout = orig_stdout
+        if cprofile is not None:
+            cprofile.disable()
+        if analyzer is not None:
+            analyzer.close()
 
 
 if __name__ == "__main__":
     import argparse
-    
+    import multiprocessing
+
+    # Workspace shards run on a process pool, including in frozen builds
+    multiprocessing.freeze_support()
+
     parser = argparse.ArgumentParser(description="CodeGnosis Analyzer Core")
     parser.add_argument("project_path", help="Path to the project to analyze")
     parser.add_argument("extensions", help="Comma-separated extensions to include")
@@ -2096,8 +2619,41 @@ if __name__ == "__main__":
     parser.add_argument("theme", help="Theme name (Dark/Light)")
     parser.add_argument("format", help="Output format (json)")
     parser.add_argument("--progress-file", help="Path to write progress JSON")
+    parser.add_argument("--sqlite", help="Also export the graph to this SQLite database")
+    parser.add_argument(
+        "--affected-by",
+        help="Comma-separated changed files; adds an `impact` section (affected files and tests)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a cProfile dump and add a per-stage `profile` section to the report",
+    )
+    parser.add_argument(
+        "--profile-file",
+        metavar="PSTATS_FILE",
+        help="Where --profile writes the cProfile dump (implies --profile; default: codegnosis_profile.pstats in the temp dir)",
+    )
+    parser.add_argument(
+        "--layout",
+        action="store_true",
+        help="Precompute 3D node positions next to the report (visualization.precomputeLayout)",
+    )
+    parser.add_argument(
+        "--subgraph",
+        metavar="QUERY",
+        help="Add a bounded `subgraph` section: top:K[:metric], hops:FILE[:K][:direction] or dir:DIRECTORY",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-analyse even if the project is unchanged since the stored result (analysisSettings.resultCache)",
+    )
     
     args = parser.parse_args()
+    profile_path = args.profile_file
+    if args.profile and not profile_path:
+        profile_path = str(Path(tempfile.gettempdir()) / "codegnosis_profile.pstats")
     
     analyze_project_cli(
         args.project_path,
@@ -2105,5 +2661,11 @@ if __name__ == "__main__":
         args.excluded,
         args.theme,
         args.format,
-        args.progress_file
+        args.progress_file,
+        args.sqlite,
+        args.affected_by,
+        profile_path,
+        args.layout,
+        args.subgraph,
+        not args.no_cache,
     )
@@ -0,0 +1,288 @@
+"""BOM-STRICT"""
+"""
+batch_analyze.py
+================
+Analyze many projects in one run on a single shared process pool.
+Each project goes through three kinds of pool task:
+
+    discover  walk/git-list the project, register and sniff its files
+    parse     run the dependency detectors over a chunk of its files
+    finish    resolve edges, run connectivity and write its result file
+
+Large projects are split into many parse chunks, so a handful of big
+repos doesn't leave cores idle while small repos finish. Each project
+gets <output>/<name>.json; batch_summary.json lists them all.
+
+Usage: python batch_analyze.py --output DIR [--projects-file LIST] [ROOT ...]
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from pathlib import Path
+
+import analyzer_core
+import file_discovery
+
+try:
+    import ghost_protocol
+except Exception:
+    ghost_protocol = None
+
+# A parse chunk closes at whichever limit it reaches first
+CHUNK_MAX_FILES = 400
+CHUNK_MAX_BYTES = 8 * 1024 * 1024
+
+# Per-process analyzers for projects this worker has parse tasks for
+_WORKER_ANALYZERS = {}
+_WORKER_ANALYZER_LIMIT = 8
+
+
+def _new_analyzer(project_path, extensions, excluded):
+    config = analyzer_core.load_codegnosis_config(project_path)
+    return analyzer_core.AnalyzerCore(
+        project_path, list(extensions), excluded_folders=list(excluded), config=config
+    )
+
+
+def _worker_analyzer(project_path, extensions, excluded):
+    key = (project_path, tuple(extensions), tuple(excluded))
+    analyzer = _WORKER_ANALYZERS.get(key)
+    if analyzer is None:
+        if len(_WORKER_ANALYZERS) >= _WORKER_ANALYZER_LIMIT:
+            _WORKER_ANALYZERS.pop(next(iter(_WORKER_ANALYZERS)))
+        analyzer = _WORKER_ANALYZERS[key] = _new_analyzer(project_path, extensions, excluded)
+    return analyzer
+
+
+# ---------------------------------------------------------
+# POOL TASKS (module level so they pickle)
+# ---------------------------------------------------------
+
+def _discover_task(project_path, extensions, excluded):
+    if not os.path.isdir(project_path):
+        raise FileNotFoundError(f"Project directory not found: {project_path}")
+    analyzer = _new_analyzer(project_path, extensions, excluded)
+    files = analyzer._find_files()
+    # Sniffing runs here so parse chunks only carry text files
+    file_discovery.sniff_entries(files, analyzer.max_file_size_bytes, analyzer.walker_threads)
+    return files
+
+
+def _parse_task(project_path, extensions, excluded, paths):
+    analyzer = _worker_analyzer(project_path, extensions, excluded)
+    detected = analyzer.detect_batch(paths)
+    # The worker analyzer is reused across chunks; hand its skips over once
+    parser_skips, analyzer.parser_skips = analyzer.parser_skips, []
+    return detected, parser_skips
+
+
+def _finish_task(project_path, extensions, excluded, files, detected, parser_skips, result_path):
+    started = time.time()
+    analyzer = _new_analyzer(project_path, extensions, excluded)
+    analyzer.parser_skips = parser_skips
+    analyzer.register_files(files)
+    rel_of = {entry.path: entry.rel_path for entry in files}
+    analyzer.link_dependencies((rel_of[path], deps) for path, deps in detected)
+    report = analyzer.finish_analysis(files)
+    try:
+        if ghost_protocol:
+            report["complianceReport"] = ghost_protocol.perform_compliance_scan(
+                report, project_path, analyzer.config
+            )
+        analyzer.write_report(report, result_path)
+    finally:
+        analyzer.close()
+    return {
+        "resultFile": str(result_path),
+        "totalFiles": report["summary"]["totalFiles"],
+        "totalConnections": report["summary"]["totalConnections"],
+        "cycleCount": report["graphStats"]["cycleCount"],
+        "healthWarnings": len(report["healthWarnings"]),
+        "unusedFiles": report["statistics"]["unusedFiles"],
+        "finishSeconds": round(time.time() - started, 3),
+    }
+
+
+# ---------------------------------------------------------
+# SCHEDULER
+# ---------------------------------------------------------
+
+def _chunk_paths(files):
+    chunk, chunk_bytes = [], 0
+    for entry in files:
+        if entry.kind != file_discovery.KIND_TEXT:
+            continue
+        chunk.append(entry.path)
+        chunk_bytes += entry.size
+        if len(chunk) >= CHUNK_MAX_FILES or chunk_bytes >= CHUNK_MAX_BYTES:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+
+
+def _result_names(project_roots):
+    """Unique result-file stems (project directory names, suffixed on clashes)."""
+    seen = {}
+    names = []
+    for root in project_roots:
+        base = Path(root).resolve().name or "project"
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        names.append(base if count == 0 else f"{base}_{count + 1}")
+    return names
+
+
+class _ProjectState:
+    __slots__ = (
+        "root", "result_path", "started", "files", "pending_chunks", "detected", "parser_skips",
+        "summary",
+    )
+
+    def __init__(self, root, result_path):
+        self.root = root
+        self.result_path = result_path
+        self.started = None
+        self.files = None
+        self.pending_chunks = 0
+        self.detected = []
+        self.parser_skips = []
+        self.summary = {"project": root}
+
+
+def analyze_batch(project_roots, output_dir, extensions=(), excluded=(), max_workers=None):
+    """
+    Analyze every project root on one process pool. Writes one result file
+    per project plus batch_summary.json into output_dir and returns the
+    summary dict. A failing project is recorded with its error; the rest
+    of the batch carries on.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    extensions, excluded = tuple(extensions), tuple(excluded)
+    batch_started = time.time()
+
+    projects = [
+        _ProjectState(str(root), output_dir / f"{name}.json")
+        for root, name in zip(project_roots, _result_names(project_roots))
+    ]
+    waiting = deque(projects)
+    tasks = {}
+
+    def fail(project, error):
+        project.summary["error"] = f"{type(error).__name__}: {error}"
+        print(f"[batch] {project.root} failed: {error}", file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+
+        def start_discovery():
+            # Bound in-flight discoveries so parse work for already-listed
+            # projects isn't queued behind every remaining walk
+            while waiting and sum(1 for kind, _ in tasks.values() if kind == "discover") < max_workers:
+                project = waiting.popleft()
+                project.started = time.time()
+                future = pool.submit(_discover_task, project.root, extensions, excluded)
+                tasks[future] = ("discover", project)
+
+        def start_finish(project):
+            future = pool.submit(
+                _finish_task, project.root, extensions, excluded,
+                project.files, project.detected, project.parser_skips, project.result_path,
+            )
+            tasks[future] = ("finish", project)
+
+        start_discovery()
+        while tasks:
+            done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, project = tasks.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    fail(project, e)
+                    continue
+
+                if kind == "discover":
+                    project.files = result
+                    for chunk in _chunk_paths(result):
+                        tasks[pool.submit(_parse_task, project.root, extensions, excluded, chunk)] = (
+                            "parse", project,
+                        )
+                        project.pending_chunks += 1
+                    if project.pending_chunks == 0:
+                        start_finish(project)
+                elif kind == "parse":
+                    if "error" in project.summary:
+                        continue
+                    detected, parser_skips = result
+                    project.detected.extend(detected)
+                    project.parser_skips.extend(parser_skips)
+                    project.pending_chunks -= 1
+                    if project.pending_chunks == 0:
+                        start_finish(project)
+                else:
+                    project.summary.update(result)
+                    project.summary["seconds"] = round(time.time() - project.started, 3)
+                    # Drop per-project state as soon as its report is on disk
+                    project.files = project.detected = project.parser_skips = None
+                    print(
+                        f"[batch] {project.root}: {result['totalFiles']} files, "
+                        f"{result['totalConnections']} connections",
+                        file=sys.stderr,
+                    )
+            start_discovery()
+
+    summaries = [project.summary for project in projects]
+    succeeded = [s for s in summaries if "error" not in s]
+    summary = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "projectCount": len(projects),
+        "failedCount": len(projects) - len(succeeded),
+        "workers": max_workers,
+        "totalFiles": sum(s["totalFiles"] for s in succeeded),
+        "totalConnections": sum(s["totalConnections"] for s in succeeded),
+        "seconds": round(time.time() - batch_started, 3),
+        "projects": summaries,
+    }
+    with open(output_dir / "batch_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="CodeGnosis batch analyzer")
+    parser.add_argument("roots", nargs="*", help="Project roots to analyze")
+    parser.add_argument("--projects-file", help="File listing one project root per line")
+    parser.add_argument("--output", required=True, help="Directory for result files and the summary")
+    parser.add_argument("--extensions", default="", help="Comma-separated extensions to include")
+    parser.add_argument("--excluded", default="", help="Comma-separated folders to exclude")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    roots = list(args.roots)
+    if args.projects_file:
+        with open(args.projects_file, "r", encoding="utf-8") as f:
+            roots.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    if not roots:
+        parser.error("no project roots given")
+
+    result = analyze_batch(
+        roots,
+        args.output,
+        extensions=[e.strip() for e in args.extensions.split(",") if e.strip()],
+        excluded=[e.strip() for e in args.excluded.split(",") if e.strip()],
+        max_workers=args.workers,
+    )
+    print(json.dumps({"summaryFile": str(Path(args.output) / "batch_summary.json"),
+                      "projects": result["projectCount"], "failed": result["failedCount"]}))
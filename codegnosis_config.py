@@ -0,0 +1,486 @@
+"""BOM-STRICT"""
+"""
+codegnosis_config.py
+====================
+The one loader for codegnosis.config.json. The file is read, merged with
+the defaults and validated once, then compiled into an immutable
+CompiledConfig: the exclusion layer, compiled custom parsers, the merged
+category and colour tables, compliance rules and the AI bundle
+exclusions. AnalyzerCore, ghost_protocol and ai_packager all take the
+same object, and compiled configs are cached per process, keyed on the
+file's stat (or the raw dict's contents), so a resident process pays for
+config work once.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import namedtuple
+from types import MappingProxyType
+
+import file_discovery
+import regex_guard
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILENAME = "codegnosis.config.json"
+
+# ---------------------------------------------------------
+# DEFAULTS
+# ---------------------------------------------------------
+
+DEFAULT_CONFIG = {
+    "language_extensions": {},
+    "compliance_checks": {
+        "required_header_text": "",
+        "mandatory_files": [],
+        "forbidden_licenses": ["AGPL", "GPL", "LGPL"],
+    },
+    "custom_regex_parsers": {},
+    "exclusions": {
+        "directories": [
+            ".git",
+            "node_modules",
+            "__pycache__",
+            "dist",
+            "build",
+            "target",
+        ],
+        "files": ["package-lock.json", ".DS_Store"],
+        "ignoreFiles": [".gitignore", ".codegnosisignore"],
+        "extensions": [
+            ".exe", ".dll", ".pyc", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+            ".zip", ".tar", ".gz", ".7z", ".rar",
+            ".xcf", ".psd", ".ai", ".sketch", ".fig", ".blend", ".fbx"
+        ],
+    },
+    "analysisSettings": {
+        "fileSizeLimitMB": 5,
+        "checkCircularDependencies": True,
+        "checkOrphans": True,
+        "checkMissingAssets": True,
+        "scanDepth": 10,
+        "discoveryMode": "walk",
+        "includeUntracked": True,
+        # Per-file budgets for custom_regex_parsers; files over either are
+        # skipped by the custom parsers and listed in customParserSkips
+        "customParserTimeoutMs": 2000,
+        "customParserMaxFileKB": 1024,
+        # Reuse the stored result when the project fingerprint is unchanged
+        "resultCache": True,
+    },
+    "tauri": {"enabled": False, "v2Checks": True},
+    "visualization": {
+        "maxNodes": 400,
+        "maxEdges": 900,
+        "categoryColors": {},
+        # Write 3D node positions (graph_layout) next to the report
+        "precomputeLayout": False,
+    },
+    # Files kept out of AI context bundles
+    "packaging": {
+        "excludeDirectories": [
+            "node_modules", "dist", "build", "target", ".git", "__pycache__", "_archive",
+        ],
+        "excludeFiles": ["package-lock.json"],
+        # Previous bundles (ai_bundle_<project>.txt, ai-bundle*.json)
+        "excludePrefixes": ["ai_bundle_", "ai-bundle"],
+        "excludeSuffixes": [".exe", ".dll", ".pdb", ".log", ".map", ".min.js", ".min.css"],
+    },
+}
+
+# Sections merged key by key over the defaults; the others replace them whole
+_MERGED_SECTIONS = [
+    "compliance_checks", "exclusions", "analysisSettings", "tauri", "visualization", "packaging",
+]
+_REPLACED_SECTIONS = ["language_extensions", "custom_regex_parsers"]
+
+# Built-in category and Graphviz colour tables; language_extensions and
+# visualization.categoryColors extend them
+MASTER_CATEGORIES = {
+    ".py": "Python",
+    ".js": "JavaScript",
+    ".cjs": "JavaScript",
+    ".mjs": "JavaScript Module",
+    ".jsx": "React",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript React",
+    ".cts": "TypeScript",
+    ".mts": "TypeScript Module",
+    ".html": "HTML",
+    ".htm": "HTML",
+    ".css": "CSS",
+    ".scss": "SCSS",
+    ".less": "Less",
+    ".java": "Java",
+    ".cs": "C#",
+    ".cpp": "C++",
+    ".c": "C",
+    ".h": "Header",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".php": "PHP",
+    ".rb": "Ruby",
+    ".swift": "Swift",
+    ".kt": "Kotlin",
+    ".pl": "Perl",
+    ".sh": "Shell",
+    ".ps1": "PowerShell",
+    ".cmd": "Batch",
+    ".bat": "Batch",
+    ".json": "JSON",
+    ".xml": "XML",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+    ".ini": "INI",
+    ".env": "ENV",
+    ".sql": "SQL",
+    ".db": "Database",
+    ".sqlite3": "SQLite",
+    ".md": "Markdown",
+    ".markdown": "Markdown",
+    ".txt": "Text",
+    ".csv": "CSV",
+    ".png": "Image",
+    ".jpg": "Image",
+    ".jpeg": "Image",
+    ".gif": "Image",
+    ".webp": "Image",
+    ".svg": "SVG",
+    ".ico": "Icon",
+    ".mp4": "Video",
+    ".mp3": "Audio",
+    ".ttf": "Font",
+    ".woff": "Font",
+    ".woff2": "Font",
+    ".docx": "Document",
+    ".pdf": "Document",
+    ".xlsx": "Spreadsheet",
+    ".dot": "Graphviz",
+    ".code-workspace": "Config",
+    ".webmanifest": "Config",
+    ".map": "Source Map",
+    ".coffee": "CoffeeScript",
+    ".applescript": "AppleScript",
+    ".bnf": "Grammar",
+    ".flow": "Flow",
+    ".exe": "Executable",
+    ".zip": "Archive",
+    ".tar": "Archive",
+    ".gz": "Archive",
+    ".1": "Man Page",
+}
+
+CATEGORY_COLORS = {
+    "Python": "lightblue",
+    "JavaScript": "lightyellow",
+    "JavaScript Module": "khaki",
+    "React": "lightcyan",
+    "TypeScript": "deepskyblue",
+    "TypeScript Module": "cornflowerblue",
+    "TypeScript React": "dodgerblue",
+    "HTML": "lightcoral",
+    "CSS": "lightgreen",
+    "SCSS": "mediumseagreen",
+    "Less": "palegreen",
+    "JSON": "wheat",
+    "YAML": "khaki",
+    "SQL": "plum",
+    "Image": "lavender",
+    "Icon": "violet",
+    "SVG": "lavenderblush",
+    "Document": "mistyrose",
+    "Spreadsheet": "palegreen",
+    "Graphviz": "lightsteelblue",
+    "Config": "lightgoldenrodyellow",
+    "Source Map": "gainsboro",
+    "CoffeeScript": "rosybrown",
+    "AppleScript": "lightpink",
+    "Grammar": "thistle",
+    "Flow": "powderblue",
+    "Executable": "silver",
+    "Archive": "darkgray",
+    "Batch": "tan",
+    "Man Page": "peachpuff",
+    "Default": "lightgray",
+    "Unfamiliar": "red",
+}
+
+
+# ---------------------------------------------------------
+# COMPILED PIECES
+# ---------------------------------------------------------
+
+CustomParser = namedtuple("CustomParser", ["name", "regex", "capture_group"])
+
+
+class PathExcluder:
+    """Path-component matcher for the `packaging` exclusions."""
+
+    __slots__ = ("directories", "files", "prefixes", "suffixes")
+
+    def __init__(self, directories=(), files=(), prefixes=(), suffixes=()):
+        self.directories = frozenset(directories)
+        self.files = frozenset(files)
+        self.prefixes = tuple(prefixes)
+        self.suffixes = tuple(suffixes)
+
+    def matches(self, rel_path):
+        parts = rel_path.split("/")
+        name = parts[-1]
+        if name in self.files or name.startswith(self.prefixes) or name.endswith(self.suffixes):
+            return True
+        return any(part in self.directories for part in parts[:-1])
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class CompiledConfig(namedtuple("CompiledConfig", [
+    "data", "fingerprint", "problems",
+    "exclusions", "excluded_dirs", "excluded_files", "excluded_extensions", "ignore_files",
+    "categories", "category_colors", "parsers", "parser_keywords",
+    "compliance", "packaging",
+])):
+    """
+    Immutable, compiled configuration. `data` is the merged file as
+    read-only mappings and tuples; get() reads its sections like a dict.
+    """
+
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[key]
+        return super().__getitem__(key)
+
+    def to_dict(self):
+        """A mutable deep copy of the merged config."""
+        return _thaw(self.data)
+
+    def __reduce__(self):
+        # Workers recompile (once per process, via the cache) rather than
+        # unpickling read-only mappings
+        return (compile_config, (self.to_dict(),))
+
+
+# ---------------------------------------------------------
+# MERGE AND VALIDATION
+# ---------------------------------------------------------
+
+def _merge(user_config, problems):
+    """User sections over the defaults; sections that aren't objects are ignored."""
+    merged = copy.deepcopy(DEFAULT_CONFIG)
+    for section in _MERGED_SECTIONS + _REPLACED_SECTIONS:
+        value = user_config.get(section)
+        if value is None:
+            continue
+        if not isinstance(value, dict):
+            problems.append(f"{section} must be an object")
+        elif section in _MERGED_SECTIONS:
+            merged[section].update(copy.deepcopy(value))
+        else:
+            merged[section] = copy.deepcopy(value)
+    return merged
+
+
+def _string_list(section, key, problems):
+    value = section.get(key)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return
+    problems.append(f"{key} must be a list of strings")
+    section[key] = []
+
+
+def _validate(merged, problems):
+    """Repair wrong-typed values in place, appending what was wrong to problems."""
+    for key in ("directories", "files", "ignoreFiles", "extensions"):
+        _string_list(merged["exclusions"], key, problems)
+    for key in ("excludeDirectories", "excludeFiles", "excludePrefixes", "excludeSuffixes"):
+        _string_list(merged["packaging"], key, problems)
+    for key in ("mandatory_files", "forbidden_licenses"):
+        _string_list(merged["compliance_checks"], key, problems)
+
+    analysis = merged["analysisSettings"]
+    for key in ("fileSizeLimitMB", "memoryLimitMB", "scanDepth",
+                "customParserTimeoutMs", "customParserMaxFileKB"):
+        value = analysis.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            problems.append(f"analysisSettings.{key} must be a non-negative number")
+            analysis[key] = DEFAULT_CONFIG["analysisSettings"].get(key, 0)
+
+    extensions = merged["language_extensions"]
+    for key in list(extensions):
+        if not isinstance(extensions[key], str):
+            problems.append(f"language_extensions[{key!r}] must be a category name")
+            del extensions[key]
+
+    for lang, parsers in list(merged["custom_regex_parsers"].items()):
+        if not isinstance(parsers, list):
+            problems.append(f"custom_regex_parsers.{lang} must be a list")
+            del merged["custom_regex_parsers"][lang]
+            continue
+        kept = []
+        for parser in parsers:
+            if not isinstance(parser, dict) or not isinstance(parser.get("regex_pattern"), str):
+                problems.append(f"custom_regex_parsers.{lang}: entry without a regex_pattern")
+                continue
+            try:
+                re.compile(parser["regex_pattern"])
+            except re.error as e:
+                problems.append(f"Invalid regex pattern '{parser.get('pattern_name', 'unknown')}': {e}")
+                continue
+            # Shapes that backtrack exponentially are refused unless opted into
+            shapes = regex_guard.lint_pattern(parser["regex_pattern"])
+            if shapes and not parser.get("allow_backtracking", False):
+                problems.append(
+                    f"Regex pattern '{parser.get('pattern_name', 'unknown')}' can backtrack "
+                    f"catastrophically ({', '.join(shapes)}); set allow_backtracking to keep it"
+                )
+                continue
+            kept.append(parser)
+        merged["custom_regex_parsers"][lang] = kept
+
+
+# ---------------------------------------------------------
+# COMPILATION
+# ---------------------------------------------------------
+
+def _compile_parsers(custom_parsers):
+    parsers = {}
+    keywords = {}
+    for lang, entries in custom_parsers.items():
+        compiled = []
+        lang_keywords = []
+        for entry in entries:
+            flags = re.MULTILINE if entry.get("is_multiline", False) else 0
+            compiled.append(CustomParser(
+                entry.get("pattern_name", "unknown"),
+                re.compile(entry["regex_pattern"], flags),
+                entry.get("capture_group", 1),
+            ))
+            # One parser without keywords disables the prefilter for the language
+            if lang_keywords is not None:
+                if entry.get("keywords"):
+                    lang_keywords.extend(kw.encode("utf-8") for kw in entry["keywords"])
+                else:
+                    lang_keywords = None
+        if compiled:
+            parsers[lang] = tuple(compiled)
+            keywords[lang] = None if lang_keywords is None else tuple(lang_keywords)
+    return MappingProxyType(parsers), MappingProxyType(keywords)
+
+
+def _compile(user_config):
+    problems = []
+    merged = _merge(user_config, problems)
+    _validate(merged, problems)
+    for problem in problems:
+        logger.warning(f"codegnosis.config.json: {problem}")
+    text = json.dumps(merged, sort_keys=True)
+
+    exclusions = merged["exclusions"]
+    parsers, parser_keywords = _compile_parsers(merged["custom_regex_parsers"])
+    packaging = merged["packaging"]
+    return CompiledConfig(
+        data=_freeze(merged),
+        fingerprint=hashlib.sha1(text.encode("utf-8")).hexdigest(),
+        problems=tuple(problems),
+        exclusions=file_discovery.ConfigExclusions(exclusions["directories"], exclusions["files"]),
+        excluded_dirs=frozenset(exclusions["directories"]),
+        excluded_files=frozenset(exclusions["files"]),
+        excluded_extensions=frozenset(ext.lower() for ext in exclusions["extensions"]),
+        ignore_files=tuple(exclusions["ignoreFiles"]),
+        categories=MappingProxyType({**MASTER_CATEGORIES, **merged["language_extensions"]}),
+        category_colors=MappingProxyType(
+            {**CATEGORY_COLORS, **merged["visualization"].get("categoryColors", {})}
+        ),
+        parsers=parsers,
+        parser_keywords=parser_keywords,
+        compliance=_freeze(merged["compliance_checks"]),
+        packaging=PathExcluder(
+            packaging["excludeDirectories"],
+            packaging["excludeFiles"],
+            packaging["excludePrefixes"],
+            packaging["excludeSuffixes"],
+        ),
+    )
+
+
+# Per-process caches of compiled configs
+_FILE_CACHE = {}
+_DICT_CACHE = {}
+_CACHE_LIMIT = 32
+
+
+def _remember(cache, key, config):
+    if len(cache) >= _CACHE_LIMIT:
+        cache.pop(next(iter(cache)))
+    cache[key] = config
+    return config
+
+
+def compile_config(config=None):
+    """
+    CompiledConfig for a config dict (merged over the defaults), None (the
+    defaults) or an already compiled config (returned as is).
+    """
+    if isinstance(config, CompiledConfig):
+        return config
+    config = config or {}
+    try:
+        key = json.dumps(config, sort_keys=True, default=str)
+    except Exception:
+        key = None
+    if key is not None and key in _DICT_CACHE:
+        return _DICT_CACHE[key]
+    compiled = _compile(config)
+    return compiled if key is None else _remember(_DICT_CACHE, key, compiled)
+
+
+def load_config(project_path):
+    """
+    Read, validate and compile project_path/codegnosis.config.json (the
+    defaults when it is missing or unreadable). Cached until the file changes.
+    """
+    config_path = os.path.abspath(os.path.join(str(project_path), CONFIG_FILENAME))
+    try:
+        st = os.stat(config_path)
+        key = (config_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = (config_path, None, None)
+    cached = _FILE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    user_config = {}
+    if key[1] is not None:
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                user_config = json.load(f)
+            if not isinstance(user_config, dict):
+                raise ValueError("top level must be an object")
+        except Exception as e:
+            logger.warning(f"Could not load codegnosis.config.json: {e}")
+            user_config = {}
+    return _remember(_FILE_CACHE, key, compile_config(user_config))
@@ -0,0 +1,380 @@
+"""BOM-STRICT"""
+"""
+sqlite_store.py
+===============
+Writes an analysis report into an indexed SQLite database so the frontend
+and scripts can page through files, query neighbours and filter by
+category without loading the whole JSON report.
+
+Tables:
+    meta           key/value (project name, generation time, summary JSON)
+    files          one row per node (project files and ext: nodes), with the
+                   per-file graph metrics as columns
+    edges          source_id -> target_id imports
+    sccs           strongly connected components (id, size)
+    metrics        any other numeric per-file values (file_id, name, value)
+    warnings       health warnings; warning_files links them to files
+
+Standalone: python -m exporters.sqlite_store <report.json> <out.db>
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from collections import deque
+from pathlib import Path
+
+import graph_algorithms
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    category TEXT,
+    content_kind TEXT,
+    size_bytes INTEGER,
+    lines INTEGER,
+    mtime REAL,
+    is_entry_point INTEGER NOT NULL DEFAULT 0,
+    is_unused INTEGER NOT NULL DEFAULT 0,
+    scc_id INTEGER,
+    dependency_count INTEGER,
+    inbound_count INTEGER,
+    outbound_count INTEGER,
+    depth_from_root INTEGER,
+    chain_depth INTEGER,
+    cycle_participation INTEGER,
+    page_rank REAL,
+    betweenness REAL,
+    community INTEGER
+);
+CREATE TABLE edges (
+    source_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    PRIMARY KEY (source_id, target_id)
+) WITHOUT ROWID;
+CREATE TABLE sccs (id INTEGER PRIMARY KEY, size INTEGER NOT NULL);
+CREATE TABLE metrics (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (file_id, name)
+) WITHOUT ROWID;
+CREATE TABLE warnings (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    severity TEXT,
+    reason TEXT,
+    payload TEXT
+);
+CREATE TABLE warning_files (
+    warning_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (warning_id, file_id)
+) WITHOUT ROWID;
+"""
+
+# Built after the bulk load; maintaining them row by row is slower
+INDEXES = """
+CREATE INDEX idx_files_category ON files (category);
+CREATE INDEX idx_files_scc ON files (scc_id);
+CREATE INDEX idx_edges_target ON edges (target_id, source_id);
+CREATE INDEX idx_metrics_name_value ON metrics (name, value);
+CREATE INDEX idx_warnings_type ON warnings (type);
+CREATE INDEX idx_warning_files_file ON warning_files (file_id);
+"""
+
+# Report metric -> files column. Every file carries these, so a column each
+# is far cheaper to write and read than a metrics row each
+METRIC_COLUMNS = {
+    "dependencyCount": "dependency_count",
+    "inboundCount": "inbound_count",
+    "outboundCount": "outbound_count",
+    "depthFromRoot": "depth_from_root",
+    "chainDepth": "chain_depth",
+    "cycleParticipation": "cycle_participation",
+    "pageRank": "page_rank",
+    "betweenness": "betweenness",
+    "community": "community",
+}
+
+# File-info fields stored as columns rather than in the metrics table
+_FILE_COLUMNS = {"sizeBytes", "lines", "mtime", "ctime"} | set(METRIC_COLUMNS)
+
+
+def _file_metrics(info):
+    for name, value in info.items():
+        if name in _FILE_COLUMNS or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            yield name, value
+
+
+def _file_rows(ids, files, scc_of):
+    for path, file_id in ids.items():
+        info = files.get(path, {})
+        category = info.get("category", "External" if path.startswith("ext:") else None)
+        yield (
+            file_id,
+            path,
+            category,
+            info.get("contentKind"),
+            info.get("sizeBytes"),
+            info.get("lines"),
+            info.get("mtime"),
+            int(bool(info.get("isEntryPoint"))),
+            int(bool(info.get("isUnused"))),
+            scc_of.get(path),
+            *(info.get(name) for name in METRIC_COLUMNS),
+        )
+
+
+def _edge_rows(ids, graph):
+    for path, source_id in ids.items():
+        targets = graph.get(path)
+        if targets:
+            for target_id in sorted({ids[target] for target in targets}):
+                yield source_id, target_id
+
+
+def export_sqlite(report, db_path):
+    """
+    Write report (as returned by AnalyzerCore.analyze) to db_path.
+    The database is built in a sibling temp file and moved into place, so
+    readers never see a half-written store. Returns the output path.
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    files = report.get("files", {})
+    graph = report.get("dependencyGraph", {})
+
+    # Ids follow path order, so the path index and the edges primary key are
+    # both filled by appends rather than random B-tree inserts
+    paths = set(files)
+    for source, targets in graph.items():
+        paths.add(source)
+        paths.update(targets)
+    ids = {path: i for i, path in enumerate(sorted(paths), start=1)}
+
+    components = graph_algorithms.strongly_connected_components(graph)
+    scc_of = graph_algorithms.component_index(components)
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        # A fresh file is discarded on failure, so durability pragmas only cost time
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("schemaVersion", str(SCHEMA_VERSION)),
+                    ("projectName", report.get("projectName", "")),
+                    ("generatedAt", report.get("generatedAt", "")),
+                    ("summary", json.dumps(report.get("summary", {}))),
+                    ("graphStats", json.dumps(report.get("graphStats", {}))),
+                    ("statistics", json.dumps(report.get("statistics", {}))),
+                ],
+            )
+            columns = [
+                "id", "path", "category", "content_kind", "size_bytes", "lines", "mtime",
+                "is_entry_point", "is_unused", "scc_id", *METRIC_COLUMNS.values(),
+            ]
+            conn.executemany(
+                f"INSERT INTO files ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                _file_rows(ids, files, scc_of),
+            )
+            conn.executemany(
+                "INSERT INTO edges (source_id, target_id) VALUES (?, ?)", _edge_rows(ids, graph)
+            )
+            conn.executemany(
+                "INSERT INTO sccs (id, size) VALUES (?, ?)",
+                ((i, len(component)) for i, component in enumerate(components)),
+            )
+            conn.executemany(
+                "INSERT INTO metrics (file_id, name, value) VALUES (?, ?, ?)",
+                (
+                    (ids[path], name, value)
+                    for path, info in files.items()
+                    for name, value in _file_metrics(info)
+                ),
+            )
+            _insert_warnings(conn, report.get("healthWarnings", []), ids)
+            conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+    except Exception:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return str(db_path)
+
+
+def _insert_warnings(conn, warnings, ids):
+    links = []
+    rows = []
+    for warning_id, warning in enumerate(warnings, start=1):
+        payload = {
+            k: v for k, v in warning.items() if k not in ("type", "severity", "reason", "file", "files")
+        }
+        rows.append(
+            (
+                warning_id,
+                warning.get("type", "unknown"),
+                warning.get("severity"),
+                warning.get("reason"),
+                json.dumps(payload) if payload else None,
+            )
+        )
+        linked = list(warning.get("files") or [])
+        if warning.get("file"):
+            linked.append(warning["file"])
+        for path in linked:
+            if path in ids:
+                links.append((warning_id, ids[path]))
+    conn.executemany(
+        "INSERT INTO warnings (id, type, severity, reason, payload) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.executemany("INSERT OR IGNORE INTO warning_files (warning_id, file_id) VALUES (?, ?)", links)
+
+
+# ---------------------------------------------------------
+# READ SIDE
+# ---------------------------------------------------------
+
+class GraphStore:
+    """Read-only queries against a database written by export_sqlite()."""
+
+    def __init__(self, db_path):
+        # as_uri() percent-encodes '#', '?' and '%' in the path
+        self.conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def meta(self):
+        return {row["key"]: row["value"] for row in self.conn.execute("SELECT key, value FROM meta")}
+
+    def files(self, offset=0, limit=100, category=None):
+        """One page of files ordered by path, optionally filtered by category."""
+        sql = "SELECT * FROM files"
+        params = []
+        if category is not None:
+            sql += " WHERE category = ?"
+            params.append(category)
+        sql += " ORDER BY path LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def file(self, path):
+        row = self.conn.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        info = dict(row)
+        metrics = {name: row[column] for name, column in METRIC_COLUMNS.items() if row[column] is not None}
+        for r in self.conn.execute("SELECT name, value FROM metrics WHERE file_id = ?", (row["id"],)):
+            metrics[r["name"]] = r["value"]
+        info["metrics"] = metrics
+        return info
+
+    def neighbours(self, path, direction="out"):
+        """Paths imported by path ("out") or importing it ("in")."""
+        if direction == "in":
+            sql = (
+                "SELECT s.path FROM files t JOIN edges e ON e.target_id = t.id"
+                " JOIN files s ON s.id = e.source_id WHERE t.path = ? ORDER BY s.path"
+            )
+        else:
+            sql = (
+                "SELECT t.path FROM files s JOIN edges e ON e.source_id = s.id"
+                " JOIN files t ON t.id = e.target_id WHERE s.path = ? ORDER BY t.path"
+            )
+        return [row[0] for row in self.conn.execute(sql, (path,))]
+
+    def shortest_path(self, source, target, max_depth=50):
+        """Shortest import chain from source to target (list of paths), or None."""
+        ids = dict(self.conn.execute("SELECT path, id FROM files WHERE path IN (?, ?)", (source, target)))
+        if source not in ids or target not in ids:
+            return None
+        start, goal = ids[source], ids[target]
+        parents = {start: None}
+        frontier = deque([(start, 0)])
+        while frontier:
+            node, depth = frontier.popleft()
+            if node == goal:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parents[node]
+                chain.reverse()
+                paths = dict(
+                    self.conn.execute(
+                        f"SELECT id, path FROM files WHERE id IN ({','.join('?' * len(chain))})", chain
+                    )
+                )
+                return [paths[i] for i in chain]
+            if depth >= max_depth:
+                continue
+            for (dep,) in self.conn.execute("SELECT target_id FROM edges WHERE source_id = ?", (node,)):
+                if dep not in parents:
+                    parents[dep] = node
+                    frontier.append((dep, depth + 1))
+        return None
+
+    def top_by_metric(self, name, limit=10):
+        """Files with the highest value for a metric (e.g. inboundCount)."""
+        column = METRIC_COLUMNS.get(name)
+        if column is not None:
+            sql = (
+                f"SELECT path, {column} FROM files WHERE {column} IS NOT NULL"
+                f" ORDER BY {column} DESC LIMIT ?"
+            )
+            return [(row[0], row[1]) for row in self.conn.execute(sql, (limit,))]
+        sql = (
+            "SELECT f.path, m.value FROM metrics m JOIN files f ON f.id = m.file_id"
+            " WHERE m.name = ? ORDER BY m.value DESC LIMIT ?"
+        )
+        return [(row[0], row[1]) for row in self.conn.execute(sql, (name, limit))]
+
+    def warnings(self, warning_type=None):
+        sql = "SELECT * FROM warnings"
+        params = []
+        if warning_type is not None:
+            sql += " WHERE type = ?"
+            params.append(warning_type)
+        results = []
+        for row in self.conn.execute(sql + " ORDER BY id", params):
+            warning = dict(row)
+            warning["files"] = [
+                r[0]
+                for r in self.conn.execute(
+                    "SELECT f.path FROM warning_files w JOIN files f ON f.id = w.file_id"
+                    " WHERE w.warning_id = ? ORDER BY f.path",
+                    (row["id"],),
+                )
+            ]
+            results.append(warning)
+        return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(export_sqlite(data, sys.argv[2]))
@@ -0,0 +1,675 @@
+"""BOM-STRICT"""
+"""
+file_discovery.py
+=================
+File discovery helpers for AnalyzerCore.
+Reads the local git index so tracked files can be enumerated without
+walking build artefacts, and falls back to the filesystem walk otherwise.
+Also compiles exclusion config and .gitignore-style files into a matcher
+that the walk uses to prune whole subtrees, and provides a scandir-based
+walker that captures stat data once per file, and a prefix sniffer that
+classifies files as text, binary or oversized before anything reads them.
+"""
+
+import os
+import re
+import struct
+import subprocess
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Index entry layout: ctime(8) mtime(8) dev ino mode uid gid size (24)
+_ENTRY_STAT_SIZE = 40
+_MODE_OFFSET = 24
+_FLAG_EXTENDED = 0x4000
+_NAME_MASK = 0x0FFF
+# Sparse-index directory entries and gitlinks (submodules) are not files
+_MODE_TYPE_MASK = 0o170000
+_MODE_DIRECTORY = 0o040000
+_MODE_GITLINK = 0o160000
+_MODE_REGULAR = 0o100000
+
+
+DEFAULT_IGNORE_FILES = [".gitignore", ".codegnosisignore"]
+
+# FileEntry.kind values assigned by sniff_entries(); None means not sniffed
+KIND_TEXT = "text"
+KIND_BINARY = "binary"
+KIND_OVERSIZED = "oversized"
+SNIFF_BYTES = 8192
+# Bytes expected in text: printable ASCII/high bytes plus common whitespace
+# controls. A NUL, or a prefix that is mostly other controls, means binary.
+_TEXT_BYTES = bytes([7, 8, 9, 10, 12, 13, 27]) + bytes(range(0x20, 0x100))
+
+
+class GitIndexError(Exception):
+    """Raised when the git index cannot be located or parsed."""
+
+
+class FileEntry:
+    """
+    Per-file record. Stat fields are captured once (from the DirEntry
+    during the walk) so later stages never stat the file again; the
+    analyzer fills in the rest (see file_records). ext: nodes have no path.
+    """
+
+    __slots__ = (
+        "path", "rel_path", "name", "size", "mtime", "ctime", "kind",
+        "category", "lines", "signature", "deps", "flags", "assets",
+    )
+
+    def __init__(self, path, rel_path, name, size, mtime, ctime, kind=None):
+        self.path = path
+        self.rel_path = rel_path
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.ctime = ctime
+        self.kind = kind
+        # Category code (see FileTable.categories)
+        self.category = None
+        self.lines = None
+        self.signature = None
+        # Dependency node ids (array) once linked
+        self.deps = ()
+        self.flags = 0
+        # Asset references found by the connectivity pass
+        self.assets = None
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"FileEntry({self.rel_path!r}, size={self.size})"
+
+
+def find_git_worktree(start_dir):
+    """
+    Locate the git worktree containing start_dir.
+    Returns (worktree_root, git_dir) or (None, None) if not inside a repo.
+    Handles `.git` files used by linked worktrees and submodules.
+    """
+    current = Path(start_dir).resolve()
+    for candidate in [current, *current.parents]:
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            try:
+                text = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None, None
+            if text.startswith("gitdir:"):
+                git_dir = Path(text[len("gitdir:"):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (candidate / git_dir).resolve()
+                return candidate, git_dir
+            return None, None
+    return None, None
+
+
+def _read_varint(data, pos):
+    """Decode a git offset varint (index v4 path prefix length)."""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def _hash_size(git_dir):
+    """Object id width for the repository (SHA-1 unless configured for SHA-256)."""
+    config_path = Path(git_dir) / "config"
+    try:
+        config_text = config_path.read_text(encoding="utf-8", errors="ignore").lower()
+    except OSError:
+        return 20
+    if "objectformat" in config_text and "sha256" in config_text:
+        return 32
+    return 20
+
+
+def read_git_index(git_dir):
+    """
+    Parse `<git_dir>/index` and return tracked file paths (POSIX, worktree-relative).
+    Supports index versions 2, 3 and 4. Conflict stages are de-duplicated and
+    sparse directory entries and submodule gitlinks are skipped.
+    """
+    index_path = Path(git_dir) / "index"
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise GitIndexError(f"Cannot read git index: {e}")
+
+    if len(data) < 12 or data[:4] != b"DIRC":
+        raise GitIndexError("Not a git index file")
+
+    version, count = struct.unpack(">II", data[4:12])
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"Unsupported git index version {version}")
+
+    hash_size = _hash_size(git_dir)
+    pos = 12
+    previous_name = b""
+    paths = []
+    seen = set()
+
+    try:
+        for _ in range(count):
+            entry_start = pos
+            mode = struct.unpack_from(">I", data, pos + _MODE_OFFSET)[0]
+            pos += _ENTRY_STAT_SIZE + hash_size
+            flags = struct.unpack_from(">H", data, pos)[0]
+            pos += 2
+            if version >= 3 and flags & _FLAG_EXTENDED:
+                pos += 2
+
+            if version == 4:
+                strip, pos = _read_varint(data, pos)
+                end = data.index(b"\x00", pos)
+                name = previous_name[: len(previous_name) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                name_len = flags & _NAME_MASK
+                if name_len < _NAME_MASK:
+                    end = pos + name_len
+                else:
+                    end = data.index(b"\x00", pos)
+                name = data[pos:end]
+                # Entries are NUL-padded to a multiple of eight bytes
+                entry_len = (end - entry_start) + 8 - ((end - entry_start) % 8)
+                pos = entry_start + entry_len
+            previous_name = name
+
+            mode_type = mode & _MODE_TYPE_MASK
+            if mode_type in (_MODE_DIRECTORY, _MODE_GITLINK):
+                continue
+            # Unmerged paths appear once per conflict stage
+            if name in seen:
+                continue
+            seen.add(name)
+            paths.append(name.decode("utf-8", errors="surrogateescape"))
+    except (struct.error, ValueError, IndexError) as e:
+        raise GitIndexError(f"Corrupt git index: {e}")
+
+    return paths
+
+
+def list_untracked_files(worktree_root):
+    """
+    List untracked-but-not-ignored files via `git ls-files`.
+    Returns None when the git executable is unavailable or fails.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--others", "--exclude-standard"],
+            cwd=str(worktree_root),
+            capture_output=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.info(f"git ls-files unavailable: {e}")
+        return None
+    if result.returncode != 0:
+        logger.info(f"git ls-files failed: {result.stderr.decode('utf-8', 'ignore').strip()}")
+        return None
+    return [
+        p.decode("utf-8", errors="surrogateescape")
+        for p in result.stdout.split(b"\x00")
+        if p
+    ]
+
+
+def git_discover(project_dir, include_untracked=False):
+    """
+    Enumerate files under project_dir from the git index.
+    Returns POSIX paths relative to project_dir, or None if project_dir is
+    not in a git repo or the index is unusable (callers should then fall
+    back to a filesystem walk). The index may still list files deleted from
+    the worktree; stat_entries() drops those.
+    """
+    resolved_dir = Path(project_dir).resolve()
+    worktree_root, git_dir = find_git_worktree(resolved_dir)
+    if worktree_root is None:
+        return None
+
+    try:
+        rel_paths = read_git_index(git_dir)
+    except GitIndexError as e:
+        logger.info(f"Git index discovery unavailable: {e}")
+        return None
+
+    if include_untracked:
+        untracked = list_untracked_files(worktree_root)
+        if untracked is None:
+            # Can't honour the request without git; a full walk is a superset
+            return None
+        rel_paths.extend(untracked)
+
+    # Restrict to the analysed subtree when the project is nested in a repo
+    prefix = ""
+    if resolved_dir != worktree_root:
+        prefix = resolved_dir.relative_to(worktree_root).as_posix() + "/"
+
+    found = []
+    for rel in rel_paths:
+        if prefix:
+            if not rel.startswith(prefix):
+                continue
+            rel = rel[len(prefix):]
+        found.append(rel)
+    return found
+
+
+# ---------------------------------------------------------
+# EXCLUSION MATCHING
+# ---------------------------------------------------------
+
+_GLOB_CHARS = set("*?[\\")
+
+
+def _translate_glob(pattern):
+    """Translate a gitignore glob (without anchoring slashes) to a regex body."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                at_end = i + 2 == n or pattern[i + 2] == "/"
+                if at_start and at_end:
+                    if i + 2 == n:
+                        out.append(".*")
+                        i += 2
+                    else:
+                        # "**/" matches zero or more leading directories
+                        out.append("(?:.*/)?")
+                        i += 3
+                    continue
+            out.append("[^/]*")
+            i += 1
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            # A "]" right after "[" or "[!" is literal, so search past it
+            search_from = i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1
+            end = pattern.find("]", search_from + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class ExclusionRule:
+    """A single compiled gitignore-style pattern."""
+
+    __slots__ = ("pattern", "regex", "negate", "dir_only", "file_only")
+
+    def __init__(self, pattern, regex, negate=False, dir_only=False, file_only=False):
+        self.pattern = pattern
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.file_only = file_only
+
+    def matches(self, rel_path, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.file_only and is_dir:
+            return False
+        return self.regex.match(rel_path) is not None
+
+
+def compile_rule(line, file_only=False, unanchored_paths=False):
+    """
+    Compile one gitignore line into an ExclusionRule (None for blanks/comments).
+    A slash at the start or middle anchors the pattern to its base directory,
+    unless unanchored_paths is set (used for config entries such as
+    "android/app/build", which match at any depth like bare names do).
+    """
+    line = line.rstrip("\r\n")
+    if not line or line.startswith("#"):
+        return None
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    negate = False
+    if line.startswith("!"):
+        negate = True
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    explicit_anchor = line.startswith("/")
+    line = line.lstrip("/")
+    anchored = explicit_anchor or ("/" in line and not unanchored_paths)
+    body = _translate_glob(line)
+    if not anchored and not line.startswith("**/"):
+        body = "(?:.*/)?" + body
+    return ExclusionRule(
+        line, re.compile(body + "$", re.DOTALL), negate, dir_only, file_only
+    )
+
+
+def _is_literal_name(entry):
+    return "/" not in entry and not (_GLOB_CHARS & set(entry)) and not entry.startswith("!")
+
+
+class ConfigExclusions:
+    """
+    The config layer of an ExclusionMatcher (excluded directory and file
+    entries), compiled once and shared by every matcher built from it.
+    """
+
+    __slots__ = ("directories", "files", "dir_names", "file_names", "rules")
+
+    def __init__(self, directories=(), files=()):
+        self.directories = tuple(directories)
+        self.files = tuple(files)
+        # Bare names are the common case; keep them as set lookups
+        dir_names = set()
+        file_names = set()
+        rules = []
+        for entry in self.directories:
+            if _is_literal_name(entry):
+                dir_names.add(entry)
+            else:
+                rule = compile_rule(entry.rstrip("/") + "/", unanchored_paths=True)
+                if rule:
+                    rules.append(rule)
+        for entry in self.files:
+            if _is_literal_name(entry):
+                file_names.add(entry)
+            else:
+                rule = compile_rule(entry, file_only=True, unanchored_paths=True)
+                if rule:
+                    rules.append(rule)
+        self.dir_names = frozenset(dir_names)
+        self.file_names = frozenset(file_names)
+        self.rules = tuple(rules)
+
+    def with_directories(self, directories):
+        """This layer plus extra excluded directories."""
+        if not directories:
+            return self
+        return ConfigExclusions(self.directories + tuple(directories), self.files)
+
+
+class ExclusionMatcher:
+    """
+    Compiled exclusion engine with .gitignore semantics.
+    Config entries are the lowest-precedence layer; ignore files found in the
+    tree are layered on top, deeper directories overriding shallower ones and
+    later lines overriding earlier ones (so `!pattern` can re-include).
+    Paths are POSIX strings relative to the project root.
+    """
+
+    def __init__(self, project_dir, directories=(), files=(), ignore_files=None, config_layer=None):
+        self.project_dir = str(project_dir)
+        self.ignore_files = list(
+            DEFAULT_IGNORE_FILES if ignore_files is None else ignore_files
+        )
+        if config_layer is None:
+            config_layer = ConfigExclusions(directories, files)
+        self._dir_names = config_layer.dir_names
+        self._file_names = config_layer.file_names
+        self._config_rules = config_layer.rules
+        # rel_dir -> list of rules from ignore files in that directory
+        self._layers = {}
+
+    def load_directory(self, rel_dir, filenames=None):
+        """
+        Compile ignore files found in rel_dir (once). Passing the directory's
+        filenames avoids probing the filesystem for files that aren't there.
+        """
+        if rel_dir in self._layers:
+            return
+        rules = []
+        abs_dir = os.path.join(self.project_dir, *rel_dir.split("/")) if rel_dir else self.project_dir
+        for ignore_name in self.ignore_files:
+            if filenames is not None and ignore_name not in filenames:
+                continue
+            try:
+                with open(os.path.join(abs_dir, ignore_name), "r", encoding="utf-8", errors="ignore") as f:
+                    for line in f:
+                        rule = compile_rule(line)
+                        if rule:
+                            rules.append(rule)
+            except OSError:
+                continue
+        self._layers[rel_dir] = rules
+
+    def is_excluded(self, rel_path, is_dir):
+        """
+        Decide a single path, assuming its parent directories were already
+        checked (as they are when a walk prunes top-down).
+        """
+        if self._layers:
+            parts = rel_path.split("/")
+            # Deepest ignore file wins; within a file the last matching line wins
+            for depth in range(len(parts) - 1, -1, -1):
+                base = "/".join(parts[:depth])
+                rules = self._layers.get(base)
+                if not rules:
+                    continue
+                sub_path = "/".join(parts[depth:])
+                for rule in reversed(rules):
+                    if rule.matches(sub_path, is_dir):
+                        return not rule.negate
+
+        name = rel_path.rpartition("/")[2]
+        if is_dir:
+            if name in self._dir_names:
+                return True
+        elif name in self._file_names:
+            return True
+        for rule in reversed(self._config_rules):
+            if rule.matches(rel_path, is_dir):
+                return not rule.negate
+        return False
+
+    def is_path_excluded(self, rel_path):
+        """
+        Decide a file path from a flat listing (e.g. the git index) by checking
+        every ancestor directory, loading ignore files on demand.
+        """
+        parts = rel_path.split("/")
+        self.load_directory("")
+        for depth in range(1, len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            if self.is_excluded(rel_dir, True):
+                return True
+            self.load_directory(rel_dir)
+        return self.is_excluded(rel_path, False)
+
+
+# ---------------------------------------------------------
+# DIRECTORY WALKING
+# ---------------------------------------------------------
+
+def default_walker_threads():
+    """Thread count for the walker; scandir releases the GIL while it waits on I/O."""
+    return min(8, os.cpu_count() or 1)
+
+
+def _scan_directory(abs_dir, rel_dir, matcher, prune=()):
+    """
+    List one directory. Returns (files, subdirs) where files are FileEntry
+    records and subdirs are (abs_path, rel_path) pairs that survived pruning.
+    Symlinked directories are not followed (matching os.walk's default).
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = list(it)
+    except OSError:
+        return files, subdirs
+
+    if matcher is not None:
+        matcher.load_directory(rel_dir, {e.name for e in entries})
+    prefix = rel_dir + "/" if rel_dir else ""
+
+    for entry in entries:
+        rel = prefix + entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if rel in prune:
+                    continue
+                if matcher is None or not matcher.is_excluded(rel, True):
+                    subdirs.append((entry.path, rel))
+                continue
+            if not entry.is_file():
+                continue
+            if matcher is not None and matcher.is_excluded(rel, False):
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        # Interned: every later stage looks files up by this string
+        files.append(
+            FileEntry(entry.path, sys.intern(rel), entry.name, st.st_size, st.st_mtime, st.st_ctime)
+        )
+    return files, subdirs
+
+
+def walk_files(project_dir, matcher=None, max_workers=1, start_dir="", prune=()):
+    """
+    Yield a FileEntry for every non-excluded file under project_dir.
+    start_dir limits the walk to one subtree (rel paths stay relative to
+    project_dir) and directories listed in prune are skipped whole.
+    With max_workers > 1, directories are listed concurrently on a thread
+    pool, so yield order is not deterministic.
+    """
+    root = str(project_dir)
+    prune = frozenset(prune)
+    if start_dir:
+        if matcher is not None:
+            # Ignore files above the subtree still apply inside it
+            parts = start_dir.split("/")
+            matcher.load_directory("")
+            for depth in range(1, len(parts) + 1):
+                rel_dir = "/".join(parts[:depth])
+                if matcher.is_excluded(rel_dir, True):
+                    return
+                if depth < len(parts):
+                    matcher.load_directory(rel_dir)
+        root = os.path.join(root, *start_dir.split("/"))
+
+    if max_workers <= 1:
+        pending = [(root, start_dir)]
+        while pending:
+            abs_dir, rel_dir = pending.pop()
+            files, subdirs = _scan_directory(abs_dir, rel_dir, matcher, prune)
+            yield from files
+            pending.extend(reversed(subdirs))
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_scan_directory, root, start_dir, matcher, prune)}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for abs_dir, rel_dir in subdirs:
+                    futures.add(pool.submit(_scan_directory, abs_dir, rel_dir, matcher, prune))
+                yield from files
+
+
+def stat_entries(project_dir, rel_paths):
+    """
+    Build FileEntry records for a flat listing of relative paths (e.g. from
+    the git index). Paths that no longer exist or aren't regular files are dropped.
+    """
+    root = str(project_dir)
+    entries = []
+    for rel in rel_paths:
+        abs_path = os.path.join(root, *rel.split("/"))
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            continue
+        if st.st_mode & _MODE_TYPE_MASK != _MODE_REGULAR:
+            continue
+        entries.append(
+            FileEntry(
+                abs_path, sys.intern(rel), rel.rpartition("/")[2], st.st_size, st.st_mtime, st.st_ctime
+            )
+        )
+    return entries
+
+
+# ---------------------------------------------------------
+# CONTENT SNIFFING
+# ---------------------------------------------------------
+
+def looks_binary(prefix):
+    """Heuristic binary test on a file prefix (NUL byte or >30% control bytes)."""
+    if not prefix:
+        return False
+    if b"\0" in prefix:
+        return True
+    return len(prefix.translate(None, _TEXT_BYTES)) > len(prefix) * 0.3
+
+
+def _sniff_entry(entry, max_text_bytes):
+    try:
+        with open(entry.path, "rb") as f:
+            prefix = f.read(SNIFF_BYTES)
+    except OSError:
+        # Unreadable now means unreadable later; treat it as opaque
+        entry.kind = KIND_BINARY
+        return
+    if looks_binary(prefix):
+        entry.kind = KIND_BINARY
+    elif entry.size > max_text_bytes:
+        entry.kind = KIND_OVERSIZED
+    else:
+        entry.kind = KIND_TEXT
+
+
+def sniff_entries(entries, max_text_bytes, max_workers=1):
+    """
+    Set entry.kind on every entry not already classified, reading at most
+    SNIFF_BYTES of each file. Text files over max_text_bytes become
+    KIND_OVERSIZED so later stages stream or skip them instead of loading
+    them whole.
+    """
+    pending = [entry for entry in entries if entry.kind is None]
+    if max_workers <= 1 or len(pending) < 2:
+        for entry in pending:
+            _sniff_entry(entry, max_text_bytes)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for _ in pool.map(lambda entry: _sniff_entry(entry, max_text_bytes), pending):
+            pass
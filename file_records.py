@@ -0,0 +1,260 @@
+"""BOM-STRICT"""
+"""
+file_records.py
+===============
+Per-file analysis state shared by every AnalyzerCore stage. Each project
+file and ext: node is one FileEntry record in a FileTable, addressed by a
+dense integer id (registration order); dependencies are arrays of ids.
+
+The path-keyed structures the rest of the code and the report consumers
+read (file_types, dependencyGraph, the report's `files`) are read-only
+Mapping views over the table, and report dicts are only built when a
+view is read or serialised.
+"""
+
+import json
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timezone
+
+import file_discovery
+
+# FileEntry.flags bits
+FLAG_UNUSED = 1
+FLAG_ENTRY_POINT = 2
+
+
+class FileTable:
+    """Records in registration order plus the one rel_path -> id index."""
+
+    def __init__(self):
+        self.records = []
+        self.ids = {}
+        # Category names by code; records hold the code
+        self.categories = []
+        self.category_codes = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, rel_path):
+        return rel_path in self.ids
+
+    def add(self, record):
+        """Register record (first one wins per rel_path); returns its id."""
+        node_id = self.ids.get(record.rel_path)
+        if node_id is None:
+            node_id = self.ids[record.rel_path] = len(self.records)
+            self.records.append(record)
+        return node_id
+
+    def add_external(self, name):
+        """Register an ext: node; it has no file on disk."""
+        record = file_discovery.FileEntry(None, name, name, 0, 0, 0)
+        record.category = self.category_code("External")
+        return self.add(record)
+
+    def category_code(self, category):
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def get(self, rel_path):
+        node_id = self.ids.get(rel_path)
+        return None if node_id is None else self.records[node_id]
+
+    def set_deps(self, node_id, target_ids):
+        if target_ids:
+            self.records[node_id].deps = array("i", target_ids)
+
+    def edge_count(self):
+        return sum(len(record.deps) for record in self.records)
+
+    def csr(self):
+        """The graph as (offsets, targets) arrays over ids."""
+        offsets = array("q", [0])
+        targets = array("i")
+        for record in self.records:
+            targets.extend(record.deps)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def importers(self):
+        """Reverse CSR (offsets, sources); each file's importers in id order."""
+        count = len(self.records)
+        offsets = array("q", bytes(8 * (count + 1)))
+        for record in self.records:
+            for target in record.deps:
+                offsets[target + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+        sources = array("q", bytes(8 * offsets[count]))
+        fill = array("q", offsets)
+        for source, record in enumerate(self.records):
+            for target in record.deps:
+                sources[fill[target]] = source
+                fill[target] += 1
+        return offsets, sources
+
+
+# ---------------------------------------------------------
+# REPORT RECORDS
+# ---------------------------------------------------------
+
+def centrality(value):
+    """A PageRank/betweenness score as reported (six significant digits)."""
+    return float(f"{value:.6g}")
+
+
+def file_info(record, category, imports, imported_by, chain_depth, cycle_count,
+              page_rank, betweenness, community):
+    """Report dict for one record (file or external node)."""
+    file = record.rel_path
+    info = {
+        "category": category,
+        "imports": imports,
+        "importedBy": imported_by,
+        "isEntryPoint": bool(record.flags & FLAG_ENTRY_POINT),
+        "dependencyCount": len(imports),
+        "isUnused": bool(record.flags & FLAG_UNUSED),
+        "inboundCount": len(imported_by),
+        "outboundCount": len(imports),
+        "depthFromRoot": len(file.split("/")) - 1,
+        "chainDepth": chain_depth,
+        "cycleParticipation": cycle_count,
+        "pageRank": centrality(page_rank),
+        "betweenness": centrality(betweenness),
+        "community": community,
+        "mtime": 0,
+        "size": "0KB",
+        "signature": record.signature,
+    }
+    if record.path is not None:
+        info["size"] = f"{record.size / 1024:.1f}KB"
+        info["sizeBytes"] = record.size
+        info["mtime"] = record.mtime
+        info["ctime"] = record.ctime
+        try:
+            info["lastModified"] = datetime.fromtimestamp(record.mtime, timezone.utc).isoformat()
+        except Exception:
+            pass
+        info["contentKind"] = record.kind
+        if record.lines is not None:
+            info["lines"] = record.lines
+    return info
+
+
+def write_report(report, path):
+    """json.dump(report) with ReportView sections streamed member by member."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i, (key, value) in enumerate(report.items()):
+            if i:
+                f.write(", ")
+            f.write(json.dumps(key))
+            f.write(": ")
+            if isinstance(value, ReportView):
+                value.write_json(f)
+            else:
+                json.dump(value, f)
+        f.write("}")
+
+
+# ---------------------------------------------------------
+# READ-ONLY VIEWS
+# ---------------------------------------------------------
+
+class ReportView(Mapping):
+    """A report section materialised on access; write_json streams it."""
+
+    def write_json(self, f):
+        f.write("{")
+        for i, (key, value) in enumerate(self._json_items()):
+            if i:
+                f.write(", ")
+            f.write(json.dumps(key))
+            f.write(": ")
+            f.write(value)
+        f.write("}")
+
+    def _json_items(self):
+        for key, value in self.items():
+            yield key, json.dumps(value)
+
+
+class _TableView(ReportView):
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return len(self.table.records)
+
+    def __iter__(self):
+        for record in self.table.records:
+            yield record.rel_path
+
+    def __contains__(self, rel_path):
+        return rel_path in self.table.ids
+
+    def __getitem__(self, rel_path):
+        node_id = self.table.ids.get(rel_path)
+        if node_id is None:
+            raise KeyError(rel_path)
+        return self._value(node_id)
+
+    def items(self):
+        for node_id, record in enumerate(self.table.records):
+            yield record.rel_path, self._value(node_id)
+
+    def values(self):
+        for node_id in range(len(self.table.records)):
+            yield self._value(node_id)
+
+
+class CategoryView(_TableView):
+    """file_types: rel_path -> category."""
+
+    def _value(self, node_id):
+        return self.table.categories[self.table.records[node_id].category]
+
+
+class GraphView(_TableView):
+    """dependencyGraph: rel_path -> [imported rel_paths], every record as a key."""
+
+    def _value(self, node_id):
+        records = self.table.records
+        return [records[target].rel_path for target in records[node_id].deps]
+
+
+class FilesView(_TableView):
+    """The report's `files`: rel_path -> file_info dict, built on access."""
+
+    def __init__(self, table, importers, chain_depths, cycle_participation, page_ranks, betweenness,
+                 communities):
+        super().__init__(table)
+        self.importer_offsets, self.importer_sources = importers
+        self.chain_depths = chain_depths
+        self.cycle_participation = cycle_participation
+        self.page_ranks = page_ranks
+        self.betweenness = betweenness
+        self.communities = communities
+
+    def _value(self, node_id):
+        records = self.table.records
+        record = records[node_id]
+        sources = self.importer_sources[
+            self.importer_offsets[node_id]:self.importer_offsets[node_id + 1]
+        ]
+        return file_info(
+            record,
+            self.table.categories[record.category],
+            [records[target].rel_path for target in record.deps],
+            [records[source].rel_path for source in sources],
+            self.chain_depths[node_id],
+            self.cycle_participation.get(record.rel_path, 0),
+            self.page_ranks[node_id],
+            self.betweenness[node_id],
+            self.communities[node_id],
+        )
@@ -12,44 +12,22 @@ import json
 from pathlib import Path
 import re
 
+import codegnosis_config
+
 def load_config(project_root):
     """
     Load compliance configuration from codegnosis.config.json.
     Falls back to defaults if file doesn't exist or is invalid.
     """
-    config_path = Path(project_root) / "codegnosis.config.json"
-    default_config = {
-        "compliance_checks": {
-            "required_header_text": "",
-            "mandatory_files": [],
-            "forbidden_licenses": ["AGPL", "GPL", "LGPL"]
-        }
-    }
-
-    if not config_path.exists():
-        return default_config
-
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        # Merge with defaults to ensure all keys exist
-        compliance = config.get("compliance_checks", {})
-        return {
-            "compliance_checks": {
-                "required_header_text": compliance.get("required_header_text", ""),
-                "mandatory_files": compliance.get("mandatory_files", []),
-                "forbidden_licenses": compliance.get("forbidden_licenses", ["AGPL", "GPL", "LGPL"])
-            }
-        }
-    except Exception as e:
-        import sys
-        print(f"[compliance] Warning: Could not load config file: {e}", file=sys.stderr)
-        return default_config
+    compliance = codegnosis_config.load_config(project_root).compliance
+    return {"compliance_checks": {key: list(value) if isinstance(value, tuple) else value
+                                  for key, value in compliance.items()}}
 
-def perform_compliance_scan(report_data, project_root):
+def perform_compliance_scan(report_data, project_root, config=None):
     """
     Scans analyzed files for legal and structural compliance.
-    Reads rules from codegnosis.config.json for customizable checks.
+    Rules come from config (the analyzer's CompiledConfig), else from the
+    project's codegnosis.config.json.
     """
     import sys
     print(f"[compliance] Initiating Ghost Protocol Scan: {report_data.get('projectName', 'Unknown')}", file=sys.stderr)
@@ -57,8 +35,9 @@ def perform_compliance_scan(report_data, project_root):
     project_root = Path(project_root)
 
     # Load configuration
-    config = load_config(project_root)
-    compliance_config = config["compliance_checks"]
+    if config is None:
+        config = codegnosis_config.load_config(project_root)
+    compliance_config = config.compliance
 
     compliance_report = {
         "status": "Incomplete",
@@ -0,0 +1,617 @@
+"""BOM-STRICT"""
+"""
+graph_algorithms.py
+===================
+Graph algorithms over the analyzer's dependency graph
+({file: [imported files]}). Everything here is iterative so deep import
+chains in large projects never hit Python's recursion limit, and works on
+integer node ids internally so large graphs stay in flat lists.
+
+The centrality measures run vectorised on NumPy when it is installed and
+fall back to plain Python over the same CSR arrays otherwise.
+"""
+
+import random
+from collections import deque
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+
+def index_graph(graph):
+    """
+    Number the nodes of graph. Returns (nodes, adjacency) where nodes[i] is
+    the name of node i and adjacency[i] lists its targets' ids. Nodes that
+    only appear as edge targets are included.
+    """
+    ids = {node: i for i, node in enumerate(graph)}
+    nodes = list(graph)
+    adjacency = []
+    for deps in graph.values():
+        row = []
+        for dep in deps:
+            dep_id = ids.get(dep)
+            if dep_id is None:
+                dep_id = ids[dep] = len(nodes)
+                nodes.append(dep)
+            row.append(dep_id)
+        adjacency.append(row)
+    adjacency.extend([] for _ in range(len(nodes) - len(adjacency)))
+    return nodes, adjacency
+
+
+def strongly_connected_components(graph):
+    """
+    Tarjan's algorithm. Returns a list of components (lists of nodes) in
+    reverse topological order: every edge leaving a component points to a
+    component earlier in the list.
+    """
+    nodes, adjacency = index_graph(graph)
+    return [[nodes[i] for i in component] for component in _tarjan(adjacency)]
+
+
+def _tarjan(adjacency):
+    count = len(adjacency)
+    index_of = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if index_of[root] != -1:
+            continue
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, neighbours = work[-1]
+            advanced = False
+            for dep in neighbours:
+                if index_of[dep] == -1:
+                    index_of[dep] = lowlink[dep] = counter
+                    counter += 1
+                    stack.append(dep)
+                    on_stack[dep] = True
+                    work.append((dep, iter(adjacency[dep])))
+                    advanced = True
+                    break
+                if on_stack[dep] and index_of[dep] < lowlink[node]:
+                    lowlink[node] = index_of[dep]
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def component_index(components):
+    """Map each node to the position of its component in components."""
+    return {node: i for i, component in enumerate(components) for node in component}
+
+
+def _bits_to_indices(bits):
+    """Positions of the set bits of a Python int, ascending."""
+    text = bin(bits)[:1:-1]
+    positions = []
+    pos = text.find("1")
+    while pos != -1:
+        positions.append(pos)
+        pos = text.find("1", pos + 1)
+    return positions
+
+
+class ReachabilityIndex:
+    """
+    Reverse-reachability ("who depends on this, transitively?") over the SCC
+    condensation of graph. A file's dependents are its whole component plus
+    every component that can reach it, so closures are computed per
+    component as int bitsets (bit i = component i) on first use and cached;
+    a query ORs the cached closures of the changed files' components.
+    """
+
+    def __init__(self, graph, cache_size=4096):
+        nodes, adjacency = index_graph(graph)
+        components = _tarjan(adjacency)
+        self.components = [[nodes[i] for i in component] for component in components]
+        self.component_of = {}
+        for comp_id, component in enumerate(self.components):
+            for node in component:
+                self.component_of[node] = comp_id
+
+        node_component = [0] * len(nodes)
+        for comp_id, component in enumerate(components):
+            for i in component:
+                node_component[i] = comp_id
+        # component -> components with an edge into it (its direct dependents)
+        parents = [set() for _ in components]
+        for source, targets in enumerate(adjacency):
+            source_comp = node_component[source]
+            for target in targets:
+                target_comp = node_component[target]
+                if target_comp != source_comp:
+                    parents[target_comp].add(source_comp)
+        self.parents = [sorted(p) for p in parents]
+        self.cache_size = cache_size
+        self._closures = {}
+
+    def _closure(self, comp_id):
+        bits = self._closures.get(comp_id)
+        if bits is not None:
+            return bits
+        # Mark visits in a byte-per-bit buffer; big-int updates per step
+        # would make one traversal quadratic in the component count
+        packed = bytearray((len(self.components) + 7) // 8)
+        packed[comp_id >> 3] |= 1 << (comp_id & 7)
+        reused = []
+        stack = [comp_id]
+        while stack:
+            current = stack.pop()
+            for parent in self.parents[current]:
+                if packed[parent >> 3] & (1 << (parent & 7)):
+                    continue
+                packed[parent >> 3] |= 1 << (parent & 7)
+                cached = self._closures.get(parent)
+                if cached is not None:
+                    reused.append(cached)
+                else:
+                    stack.append(parent)
+        bits = int.from_bytes(packed, "little")
+        for cached in reused:
+            bits |= cached
+        if len(self._closures) >= self.cache_size:
+            self._closures.pop(next(iter(self._closures)))
+        self._closures[comp_id] = bits
+        return bits
+
+    def dependents(self, changed):
+        """
+        Every node that transitively depends on any node in changed,
+        including the changed nodes themselves. Unknown nodes are ignored.
+        """
+        bits = 0
+        for node in changed:
+            comp_id = self.component_of.get(node)
+            if comp_id is not None:
+                bits |= self._closure(comp_id)
+        result = []
+        for comp_id in _bits_to_indices(bits):
+            result.extend(self.components[comp_id])
+        return result
+
+
+# ---------------------------------------------------------
+# CSR GRAPHS
+# ---------------------------------------------------------
+# Node i's targets are targets[offsets[i]:offsets[i + 1]]; the report
+# stage builds these from the FileTable or loads them from the spill store.
+
+def csr_chain_depths(offsets, targets):
+    """
+    Longest dependency chain from each node, as an array indexed by node.
+    A leaf counts 1; a node reached again while it is on the current path
+    counts 0, so cycles don't recurse forever. Iterative, memoised per node.
+    """
+    count = len(offsets) - 1
+    memo = [0] * count
+    visiting = bytearray(count)
+    for root in range(count):
+        if memo[root]:
+            continue
+        visiting[root] = 1
+        work = [[root, offsets[root], 0]]
+        while work:
+            frame = work[-1]
+            node, pos, best = frame
+            end = offsets[node + 1]
+            while pos < end:
+                dep = targets[pos]
+                pos += 1
+                if memo[dep]:
+                    if memo[dep] > best:
+                        best = memo[dep]
+                elif not visiting[dep]:
+                    frame[1] = pos
+                    frame[2] = best
+                    visiting[dep] = 1
+                    work.append([dep, offsets[dep], 0])
+                    break
+            else:
+                work.pop()
+                visiting[node] = 0
+                memo[node] = best + 1
+                if work:
+                    parent = work[-1]
+                    if memo[node] > parent[2]:
+                        parent[2] = memo[node]
+    return memo
+
+
+def csr_short_cycles(offsets, targets, max_length=5, limit=10):
+    """
+    The first `limit` cycles of at most max_length entries (closing node
+    repeated) met by a depth-first walk in node order, as node lists.
+    Each node is expanded once, so a cycle is only found through the path
+    that first reaches it. The walk is iterative and stops once `limit`
+    cycles are found.
+    """
+    count = len(offsets) - 1
+    visited = bytearray(count)
+    # Position of each node on the current path, -1 when off it
+    position = [-1] * count
+    path = []
+    cycles = []
+    seen = set()
+    for root in range(count):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        position[root] = 0
+        path.append(root)
+        cursor = [offsets[root]]
+        while path:
+            node = path[-1]
+            pos = cursor[-1]
+            if pos == offsets[node + 1]:
+                path.pop()
+                cursor.pop()
+                position[node] = -1
+                continue
+            cursor[-1] = pos + 1
+            dep = targets[pos]
+            if position[dep] != -1:
+                cycle = path[position[dep]:] + [dep]
+                key = tuple(cycle)
+                if len(cycle) <= max_length and key not in seen:
+                    seen.add(key)
+                    cycles.append(cycle)
+                    if len(cycles) >= limit:
+                        return cycles
+            elif not visited[dep]:
+                visited[dep] = 1
+                position[dep] = len(path)
+                path.append(dep)
+                cursor.append(offsets[dep])
+    return cycles
+
+
+def csr_reverse(offsets, targets):
+    """The transposed graph as CSR (offsets, sources); sources in node order."""
+    count = len(offsets) - 1
+    in_offsets = [0] * (count + 1)
+    for target in targets:
+        in_offsets[target + 1] += 1
+    for i in range(count):
+        in_offsets[i + 1] += in_offsets[i]
+    sources = [0] * len(targets)
+    fill = in_offsets[:-1]
+    for source in range(count):
+        for pos in range(offsets[source], offsets[source + 1]):
+            target = targets[pos]
+            sources[fill[target]] = source
+            fill[target] += 1
+    return in_offsets, sources
+
+
+# ---------------------------------------------------------
+# CENTRALITY
+# ---------------------------------------------------------
+# Rank flows along imports, so a file scores high when files that are
+# themselves widely depended on import it.
+
+PAGERANK_DAMPING = 0.85
+# BFS sources sampled for betweenness; smaller graphs are computed exactly
+BETWEENNESS_SAMPLES = 64
+# The pure-Python fallback samples fewer sources, keeping the total BFS
+# work near this many node and edge visits
+PYTHON_BETWEENNESS_BUDGET = 1_000_000
+
+
+def csr_pagerank(offsets, targets, damping=PAGERANK_DAMPING, tolerance=1e-6, max_iterations=100):
+    """
+    PageRank per node (summing to 1) by power iteration. Rank held by files
+    that import nothing is spread evenly over all files.
+    """
+    count = len(offsets) - 1
+    if count <= 0:
+        return []
+    if numpy is not None:
+        return _pagerank_numpy(offsets, targets, count, damping, tolerance, max_iterations)
+    return _pagerank_python(offsets, targets, count, damping, tolerance, max_iterations)
+
+
+def _pagerank_numpy(offsets, targets, count, damping, tolerance, max_iterations):
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    targets = numpy.asarray(targets, dtype=numpy.int64)
+    out_degree = numpy.diff(offsets)
+    edge_sources = numpy.repeat(numpy.arange(count), out_degree)
+    dangling = out_degree == 0
+    inverse = numpy.zeros(count)
+    inverse[~dangling] = 1.0 / out_degree[~dangling]
+    rank = numpy.full(count, 1.0 / count)
+    for _ in range(max_iterations):
+        share = (rank * inverse)[edge_sources]
+        updated = damping * numpy.bincount(targets, weights=share, minlength=count)
+        updated += (1.0 - damping + damping * rank[dangling].sum()) / count
+        delta = numpy.abs(updated - rank).sum()
+        rank = updated
+        if delta < count * tolerance:
+            break
+    return rank.tolist()
+
+
+def _pagerank_python(offsets, targets, count, damping, tolerance, max_iterations):
+    # Pull over the reversed graph so each node's sum is one C-level call
+    in_offsets, sources = csr_reverse(offsets, targets)
+    inverse = [0.0] * count
+    dangling = []
+    for i in range(count):
+        degree = offsets[i + 1] - offsets[i]
+        if degree:
+            inverse[i] = 1.0 / degree
+        else:
+            dangling.append(i)
+    rank = [1.0 / count] * count
+    for _ in range(max_iterations):
+        share = [r * w for r, w in zip(rank, inverse)].__getitem__
+        base = (1.0 - damping + damping * sum(rank[i] for i in dangling)) / count
+        updated = [
+            base + damping * sum(map(share, sources[in_offsets[i]:in_offsets[i + 1]]))
+            for i in range(count)
+        ]
+        delta = sum(abs(a - b) for a, b in zip(updated, rank))
+        rank = updated
+        if delta < count * tolerance:
+            break
+    return rank
+
+
+def csr_betweenness(offsets, targets, samples=BETWEENNESS_SAMPLES, seed=0):
+    """
+    Normalised betweenness centrality per node (Brandes over directed
+    shortest paths). Above `samples` nodes it is estimated from that many
+    seeded random BFS sources, so reports stay reproducible.
+    """
+    count = len(offsets) - 1
+    if count <= 2:
+        return [0.0] * max(count, 0)
+    if numpy is None:
+        samples = min(samples, max(1, PYTHON_BETWEENNESS_BUDGET // (count + len(targets))))
+    if count <= samples:
+        sources = range(count)
+    else:
+        sources = sorted(random.Random(seed).sample(range(count), samples))
+    if numpy is not None:
+        centrality = _betweenness_numpy(offsets, targets, count, sources)
+    else:
+        centrality = _betweenness_python(offsets, targets, count, sources)
+    scale = count / len(sources) / ((count - 1) * (count - 2))
+    return [value * scale for value in centrality]
+
+
+def _betweenness_numpy(offsets, targets, count, sources):
+    # Level-synchronous BFS: every frontier is expanded in one gather
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    targets = numpy.asarray(targets, dtype=numpy.int64)
+    centrality = numpy.zeros(count)
+    for source in sources:
+        dist = numpy.full(count, -1, dtype=numpy.int64)
+        sigma = numpy.zeros(count)
+        dist[source] = 0
+        sigma[source] = 1.0
+        frontier = numpy.array([source], dtype=numpy.int64)
+        levels = []
+        depth = 0
+        while frontier.size:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            edge_sources = numpy.repeat(frontier, counts)
+            positions = numpy.arange(total) + numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+            edge_targets = targets[positions]
+            dist[edge_targets[dist[edge_targets] == -1]] = depth + 1
+            # Keep only shortest-path edges
+            on_path = dist[edge_targets] == depth + 1
+            edge_sources, edge_targets = edge_sources[on_path], edge_targets[on_path]
+            sigma += numpy.bincount(edge_targets, weights=sigma[edge_sources], minlength=count)
+            levels.append((edge_sources, edge_targets))
+            frontier = numpy.flatnonzero(dist == depth + 1)
+            depth += 1
+        delta = numpy.zeros(count)
+        for edge_sources, edge_targets in reversed(levels):
+            delta += numpy.bincount(
+                edge_sources,
+                weights=sigma[edge_sources] / sigma[edge_targets] * (1.0 + delta[edge_targets]),
+                minlength=count,
+            )
+        delta[source] = 0.0
+        centrality += delta
+    return centrality.tolist()
+
+
+def _betweenness_python(offsets, targets, count, sources):
+    centrality = [0.0] * count
+    for source in sources:
+        dist = [-1] * count
+        sigma = [0] * count
+        dist[source] = 0
+        sigma[source] = 1
+        # BFS order doubles as the queue
+        order = [source]
+        head = 0
+        while head < len(order):
+            node = order[head]
+            head += 1
+            next_depth = dist[node] + 1
+            node_sigma = sigma[node]
+            for pos in range(offsets[node], offsets[node + 1]):
+                dep = targets[pos]
+                if dist[dep] == -1:
+                    dist[dep] = next_depth
+                    order.append(dep)
+                if dist[dep] == next_depth:
+                    sigma[dep] += node_sigma
+        delta = [0.0] * count
+        for node in reversed(order):
+            next_depth = dist[node] + 1
+            total = 0.0
+            for pos in range(offsets[node], offsets[node + 1]):
+                dep = targets[pos]
+                if dist[dep] == next_depth:
+                    total += (1.0 + delta[dep]) / sigma[dep]
+            delta[node] = sigma[node] * total
+            if node != source:
+                centrality[node] += delta[node]
+    return centrality
+
+
+# ---------------------------------------------------------
+# COMMUNITIES
+# ---------------------------------------------------------
+# Louvain modularity clustering over the undirected import graph (an
+# import in both directions weighs 2). Each pass is linear in the edges
+# and the graph shrinks at every level, so the whole run is near-linear.
+
+def csr_communities(offsets, targets, max_levels=10, max_passes=20):
+    """
+    Community id per node, numbered by size (0 is the largest; ties by
+    lowest node id). Nodes without edges belong to none and get -1.
+    """
+    count = len(offsets) - 1
+    graph = [{} for _ in range(count)]
+    for source in range(count):
+        links = graph[source]
+        for pos in range(offsets[source], offsets[source + 1]):
+            target = targets[pos]
+            if target != source:
+                links[target] = links.get(target, 0) + 1
+                graph[target][source] = graph[target].get(source, 0) + 1
+    degrees = [sum(links.values()) for links in graph]
+    linked = [degree > 0 for degree in degrees]
+    total = sum(degrees)
+    membership = list(range(count))
+
+    for _ in range(max_levels):
+        if not total:
+            break
+        community, moved = _louvain_pass(graph, degrees, total, max_passes)
+        if not moved:
+            break
+        renumber = {}
+        for c in community:
+            if c not in renumber:
+                renumber[c] = len(renumber)
+        community = [renumber[c] for c in community]
+        membership = [community[c] for c in membership]
+        # Collapse each community into one node; internal weight stays in
+        # the node's degree
+        aggregated = [{} for _ in range(len(renumber))]
+        aggregated_degrees = [0] * len(renumber)
+        for node, links in enumerate(graph):
+            own = community[node]
+            aggregated_degrees[own] += degrees[node]
+            row = aggregated[own]
+            for other, weight in links.items():
+                other = community[other]
+                if other != own:
+                    row[other] = row.get(other, 0) + weight
+        graph, degrees = aggregated, aggregated_degrees
+
+    sizes = {}
+    first = {}
+    for node, c in enumerate(membership):
+        if linked[node]:
+            sizes[c] = sizes.get(c, 0) + 1
+            first.setdefault(c, node)
+    order = sorted(sizes, key=lambda c: (-sizes[c], first[c]))
+    final = {c: i for i, c in enumerate(order)}
+    return [final[c] if linked[node] else -1 for node, c in enumerate(membership)]
+
+
+def _louvain_pass(graph, degrees, total, max_passes):
+    """
+    Local moving: (community per node, whether any node moved). Only nodes
+    whose neighbourhood changed are revisited, up to max_passes visits per
+    node on average.
+    """
+    count = len(graph)
+    community = list(range(count))
+    totals = list(degrees)
+    queue = deque(node for node in range(count) if degrees[node])
+    queued = bytearray(count)
+    for node in queue:
+        queued[node] = 1
+    moved_any = False
+    budget = max_passes * count
+    while queue and budget:
+        budget -= 1
+        node = queue.popleft()
+        queued[node] = 0
+        links = graph[node]
+        degree = degrees[node]
+        current = community[node]
+        weights = {}
+        for other, weight in links.items():
+            c = community[other]
+            weights[c] = weights.get(c, 0) + weight
+        totals[current] -= degree
+        scale = degree / total
+        best = current
+        best_gain = weights.get(current, 0) - totals[current] * scale
+        for c, weight in weights.items():
+            gain = weight - totals[c] * scale
+            if gain > best_gain:
+                best, best_gain = c, gain
+        totals[best] += degree
+        if best != current:
+            community[node] = best
+            moved_any = True
+            for other in links:
+                if not queued[other] and community[other] != best:
+                    queued[other] = 1
+                    queue.append(other)
+    return community, moved_any
+
+
+def csr_modularity(offsets, targets, communities):
+    """Modularity of a partition of the undirected import graph."""
+    count = len(offsets) - 1
+    internal = {}
+    totals = {}
+    edges = 0
+    for source in range(count):
+        own = communities[source]
+        for pos in range(offsets[source], offsets[source + 1]):
+            target = targets[pos]
+            if target == source:
+                continue
+            edges += 1
+            totals[own] = totals.get(own, 0) + 1
+            other = communities[target]
+            totals[other] = totals.get(other, 0) + 1
+            if other == own:
+                internal[own] = internal.get(own, 0) + 1
+    if not edges:
+        return 0.0
+    return sum(
+        internal.get(c, 0) / edges - (totals[c] / (2 * edges)) ** 2 for c in totals
+    )
@@ -0,0 +1,411 @@
+"""BOM-STRICT"""
+"""
+graph_diff.py
+=============
+Architectural diff between two CodeGnosis runs, for CI.
+Each side is a result file (codegnosis_result.json) or a SQLite graph store
+written by exporters.sqlite_store. Reports added/removed files, edges,
+cycles and orphans plus metric deltas. Cycles are compared as SCC groups: a
+group is removed when its files no longer all share one in head, and added
+when they did not all share one in base, so two cycles merging report only
+the merged group as added.
+
+Result files are read as a stream, one `files`/`dependencyGraph` member at
+a time, and edges are kept as hashed integer pairs, so comparing two very
+large reports costs two linear passes and set differences rather than
+loading both documents whole.
+
+Usage: python graph_diff.py <base> <head> [--output diff.json]
+"""
+
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import graph_algorithms
+
+# Per-file metrics compared between runs
+DIFF_METRICS = [
+    "inboundCount",
+    "outboundCount",
+    "dependencyCount",
+    "chainDepth",
+    "cycleParticipation",
+    "lines",
+    "sizeBytes",
+]
+
+_HASH_MASK = (1 << 64) - 1
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,}:])")
+
+
+# ---------------------------------------------------------
+# STREAMING JSON
+# ---------------------------------------------------------
+
+class _JsonStream:
+    """
+    Pull parser over a JSON document. members() walks an object key by key
+    and the caller decodes (or walks into) each value, so only one member
+    value is held in memory at a time.
+    """
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        # Grow geometrically so an unfinished large value is re-parsed
+        # O(log n) times, not once per chunk
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        if self.pos < len(self.buf) and self.buf[self.pos] not in " \t\n\r":
+            return self.buf[self.pos]
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def _separator(self):
+        """Consume and return the next ',', '}' or ':' (skipping whitespace)."""
+        while True:
+            match = _SEPARATOR.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return match.group(1)
+            if _WHITESPACE.match(self.buf, self.pos).end() < len(self.buf):
+                raise ValueError(f"Malformed object near offset {self.pos}")
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def value(self):
+        """Decode the complete value at the current position."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending exactly at the buffer edge may be cut short
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Yield each key of the object at the current position; the caller consumes its value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if self._separator() != ":":
+                raise ValueError(f"Expected ':' near offset {self.pos}")
+            yield key
+            separator = self._separator()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Malformed object near offset {self.pos}")
+
+
+# ---------------------------------------------------------
+# RUN SNAPSHOTS
+# ---------------------------------------------------------
+
+class RunSnapshot:
+    """The comparable parts of one run: file metrics, hashed edges, summary numbers."""
+
+    def __init__(self, source):
+        self.source = source
+        # path -> tuple of DIFF_METRICS values
+        self.files = {}
+        self.orphans = set()
+        # (hash(src) << 64 | hash(dst)) for every edge
+        self.edges = set()
+        # hash(src) -> [hash(dst), ...], for cycle detection in the changed region
+        self.adjacency = {}
+        # hash -> path for every edge endpoint
+        self.names = {}
+        self.summary = {}
+        # Summary sections the run carried
+        self.sections = set()
+
+    def add_file(self, path, info):
+        self.files[path] = tuple(info.get(metric) for metric in DIFF_METRICS)
+        if info.get("isUnused"):
+            self.orphans.add(path)
+
+    def add_edges(self, source, targets):
+        source_hash = hash(source) & _HASH_MASK
+        self.names[source_hash] = source
+        out = self.adjacency.setdefault(source_hash, [])
+        for target in targets:
+            target_hash = hash(target) & _HASH_MASK
+            self.names[target_hash] = target
+            out.append(target_hash)
+            self.edges.add(source_hash << 64 | target_hash)
+
+    def add_summary(self, section, values):
+        if not isinstance(values, dict):
+            return
+        self.sections.add(section)
+        for name, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.summary[f"{section}.{name}"] = value
+
+    def edge_names(self, edge):
+        return [self.names[edge >> 64], self.names[edge & _HASH_MASK]]
+
+    def cycle_groups(self, region):
+        """Nodes on a cycle within region (a set of hashes), grouped by SCC."""
+        adjacency = {
+            node: [t for t in self.adjacency.get(node, ()) if t in region] for node in region
+        }
+        groups = set()
+        for component in graph_algorithms.strongly_connected_components(adjacency):
+            if len(component) > 1 or component[0] in adjacency[component[0]]:
+                groups.add(frozenset(self.names[h] for h in component))
+        return groups
+
+
+def _load_report(path):
+    snapshot = RunSnapshot(str(path))
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key == "files":
+                for rel_path in stream.members():
+                    snapshot.add_file(rel_path, stream.value())
+            elif key == "dependencyGraph":
+                for rel_path in stream.members():
+                    snapshot.add_edges(rel_path, stream.value())
+            elif key in ("graphStats", "statistics"):
+                snapshot.add_summary(key, stream.value())
+            else:
+                stream.value()
+    return snapshot
+
+
+def _load_store(path):
+    snapshot = RunSnapshot(str(path))
+    # as_uri() percent-encodes '#', '?' and '%' in the path
+    conn = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        paths = {}
+        # Metric columns in DIFF_METRICS order
+        for row in conn.execute(
+            "SELECT id, path, is_unused, inbound_count, outbound_count, dependency_count,"
+            " chain_depth, cycle_participation, lines, size_bytes FROM files"
+        ):
+            paths[row[0]] = row[1]
+            info = dict(zip(DIFF_METRICS, row[3:]))
+            info["isUnused"] = bool(row[2])
+            snapshot.add_file(row[1], info)
+        source_id = None
+        targets = []
+        for src, dst in conn.execute("SELECT source_id, target_id FROM edges ORDER BY source_id"):
+            if src != source_id:
+                if targets:
+                    snapshot.add_edges(paths[source_id], targets)
+                source_id, targets = src, []
+            targets.append(paths[dst])
+        if targets:
+            snapshot.add_edges(paths[source_id], targets)
+        for key, value in conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('graphStats', 'statistics')"
+        ):
+            snapshot.add_summary(key, json.loads(value))
+    finally:
+        conn.close()
+    return snapshot
+
+
+def load_run(path):
+    """Load a result JSON file or a SQLite graph store into a RunSnapshot."""
+    with open(path, "rb") as f:
+        is_sqlite = f.read(16) == b"SQLite format 3\x00"
+    return _load_store(path) if is_sqlite else _load_report(path)
+
+
+# ---------------------------------------------------------
+# DIFF
+# ---------------------------------------------------------
+
+def _change_region(base, head, changed_edges):
+    """
+    Nodes that reach, and are reached from, an endpoint of a changed edge in
+    the union of both graphs. Cycle groups can only differ inside it: an
+    SCC with no such node keeps all its internal edges, and any SCC that
+    absorbs it in the other run must contain a changed edge, whose region
+    would then include it. SCCs touching the region lie wholly inside it.
+    """
+    seeds = set()
+    for edge in changed_edges:
+        seeds.add(edge >> 64)
+        seeds.add(edge & _HASH_MASK)
+    graphs = (base.adjacency, head.adjacency)
+
+    forward = set(seeds)
+    stack = list(seeds)
+    while stack:
+        node = stack.pop()
+        for adjacency in graphs:
+            for target in adjacency.get(node, ()):
+                if target not in forward:
+                    forward.add(target)
+                    stack.append(target)
+
+    # Walk backwards, but only through nodes already known to be reachable
+    reverse = {}
+    for node in forward:
+        for adjacency in graphs:
+            for target in adjacency.get(node, ()):
+                reverse.setdefault(target, []).append(node)
+    region = set(seeds)
+    stack = list(seeds)
+    while stack:
+        node = stack.pop()
+        for source in reverse.get(node, ()):
+            if source not in region:
+                region.add(source)
+                stack.append(source)
+    return region
+
+
+def _delta(base, head):
+    if isinstance(base, (int, float)) and isinstance(head, (int, float)):
+        return round(head - base, 6)
+    return None
+
+
+def _broken_cycles(groups, other):
+    """
+    Groups from one run whose members no longer all share a cycle group in
+    the other. A group merged into a larger one is not broken.
+    """
+    group_of = {name: i for i, group in enumerate(other) for name in group}
+    broken = []
+    for group in groups:
+        owners = {group_of.get(name) for name in group}
+        if len(owners) != 1 or None in owners:
+            broken.append(sorted(group))
+    return sorted(broken)
+
+
+def diff_runs(base, head):
+    """Compare two RunSnapshots. Lists are sorted so output is stable for CI."""
+    base_files = base.files.keys()
+    head_files = head.files.keys()
+
+    added_edges = head.edges - base.edges
+    removed_edges = base.edges - head.edges
+
+    base_cycles = head_cycles = set()
+    if added_edges or removed_edges:
+        region = _change_region(base, head, added_edges | removed_edges)
+        base_cycles = base.cycle_groups(region)
+        head_cycles = head.cycle_groups(region)
+
+    file_deltas = {}
+    for path in base_files & head_files:
+        before = base.files[path]
+        after = head.files[path]
+        if before == after:
+            continue
+        changes = {}
+        for metric, old, new in zip(DIFF_METRICS, before, after):
+            if old != new:
+                changes[metric] = {"base": old, "head": new, "delta": _delta(old, new)}
+        file_deltas[path] = changes
+
+    # Stores written before `statistics` was exported only carry graphStats
+    shared = base.sections & head.sections
+    summary_deltas = {}
+    for name in sorted(base.summary.keys() | head.summary.keys()):
+        if name.partition(".")[0] not in shared:
+            continue
+        old = base.summary.get(name)
+        new = head.summary.get(name)
+        if old != new:
+            summary_deltas[name] = {"base": old, "head": new, "delta": _delta(old, new)}
+
+    return {
+        "base": {"source": base.source, "files": len(base.files), "edges": len(base.edges)},
+        "head": {"source": head.source, "files": len(head.files), "edges": len(head.edges)},
+        "files": {
+            "added": sorted(head_files - base_files),
+            "removed": sorted(base_files - head_files),
+        },
+        "edges": {
+            "added": sorted(head.edge_names(e) for e in added_edges),
+            "removed": sorted(base.edge_names(e) for e in removed_edges),
+        },
+        "cycles": {
+            "added": _broken_cycles(head_cycles, base_cycles),
+            "removed": _broken_cycles(base_cycles, head_cycles),
+        },
+        "orphans": {
+            "added": sorted(head.orphans - base.orphans),
+            "removed": sorted(base.orphans - head.orphans),
+        },
+        "metricDeltas": {
+            "summary": summary_deltas,
+            "files": {path: file_deltas[path] for path in sorted(file_deltas)},
+        },
+    }
+
+
+def diff_files(base_path, head_path):
+    return diff_runs(load_run(base_path), load_run(head_path))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Diff two CodeGnosis runs")
+    parser.add_argument("base", help="Base result JSON or SQLite graph store")
+    parser.add_argument("head", help="Head result JSON or SQLite graph store")
+    parser.add_argument("--output", help="Write the diff here instead of stdout")
+    args = parser.parse_args()
+
+    result = diff_files(args.base, args.head)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    print(
+        f"[diff] files +{len(result['files']['added'])}/-{len(result['files']['removed'])}, "
+        f"edges +{len(result['edges']['added'])}/-{len(result['edges']['removed'])}, "
+        f"cycles +{len(result['cycles']['added'])}/-{len(result['cycles']['removed'])}",
+        file=sys.stderr,
+    )
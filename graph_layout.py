@@ -0,0 +1,333 @@
+"""BOM-STRICT"""
+"""
+graph_layout.py
+===============
+Precomputed 3D node positions for the frontend's force-directed graph,
+so the webview can open a large graph without running the simulation.
+
+Positions are seeded from structure: each community gets its own region
+of a packed spiral, and inside it files from the same directory start
+close together. Files in no community start on a shell around the spiral. A force layout then refines the seeds. Springs run along
+imports. Repulsion is approximated Barnes-Hut style: the other nodes are
+binned into a coarse grid and each occupied cell acts as one mass at its
+centroid. Everything is vectorised with NumPy; without it the seeds are
+emitted as they are, which is still a stable, structured layout.
+
+Buffer format (little-endian): b"CGL1", uint32 node count, then float32
+x, y, z per node in the order of the report's `files`. Buffers are cached
+by graph hash, so an unchanged graph reuses its layout.
+"""
+
+import hashlib
+import math
+import os
+import shutil
+import struct
+import sys
+import zlib
+from array import array
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+LAYOUT_VERSION = 1
+MAGIC = b"CGL1"
+
+# Rest distance between connected files, in layout units
+SPACING = 10.0
+ITERATIONS = 40
+GRAVITY = 0.05
+# Node x grid-cell pairs evaluated for repulsion per iteration; the grid
+# is made coarser on large graphs to stay inside it
+REPULSION_WORK = 4_000_000
+# Exact repulsion pairs between nodes sharing a grid cell, per iteration
+NEAR_PAIRS = 500_000
+# Evaluated in blocks of nodes so temporaries stay small
+BLOCK_PAIRS = 250_000
+
+
+def graph_hash(names, offsets, targets, communities):
+    """Identity of a layout: nodes, edges, communities, method and version."""
+    method = "force" if numpy is not None else "seeded"
+    digest = hashlib.sha1(f"layout:{LAYOUT_VERSION}:{method}:{len(names)}".encode("utf-8"))
+    for name in names:
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(array("q", offsets).tobytes())
+    digest.update(array("q", targets).tobytes())
+    digest.update(array("q", communities).tobytes())
+    return digest.hexdigest()
+
+
+def write_layout(dest_path, cache_dir, names, offsets, targets, communities):
+    """
+    Write the layout buffer for the graph to dest_path, from the cache when
+    the same graph was laid out before. Returns the report's `layout` section.
+    """
+    key = graph_hash(names, offsets, targets, communities)
+    cache_path = os.path.join(cache_dir, f"layout_{key}.bin") if cache_dir else None
+    cached = bool(cache_path) and os.path.isfile(cache_path)
+    if not cached:
+        positions = compute_layout(names, offsets, targets, communities)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            write_buffer(tmp_path, positions)
+            os.replace(tmp_path, cache_path)
+        else:
+            write_buffer(dest_path, positions)
+    if cache_path and os.path.abspath(cache_path) != os.path.abspath(dest_path):
+        shutil.copyfile(cache_path, dest_path)
+    return {
+        "file": str(dest_path),
+        "format": "CGL1 float32 xyz",
+        "nodes": len(names),
+        "graphHash": key,
+        "method": "force" if numpy is not None else "seeded",
+        "cached": cached,
+    }
+
+
+def write_buffer(path, positions):
+    """positions: flat x, y, z floats (or an (n, 3) array)."""
+    if numpy is not None and isinstance(positions, numpy.ndarray):
+        coords = positions.astype("<f4").tobytes()
+        count = len(positions)
+    else:
+        values = array("f", positions)
+        count = len(values) // 3
+        if sys.byteorder == "big":
+            values.byteswap()
+        coords = values.tobytes()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", count))
+        f.write(coords)
+
+
+def read_buffer(path):
+    """A layout buffer back as a flat float array of x, y, z triples."""
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a layout buffer")
+        (count,) = struct.unpack("<I", f.read(4))
+        values = array("f")
+        values.frombytes(f.read(12 * count))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def compute_layout(names, offsets, targets, communities):
+    """Seeded positions, refined by the force layout when NumPy is available."""
+    seeds = seed_positions(names, communities)
+    if numpy is None or len(names) < 2:
+        return seeds
+    return force_layout(offsets, targets, numpy.array(seeds, dtype=numpy.float64).reshape(-1, 3))
+
+
+# ---------------------------------------------------------
+# SEEDING
+# ---------------------------------------------------------
+
+def _cbrt(value):
+    return value ** (1.0 / 3.0)
+
+
+def _direction(value):
+    """A unit vector picked by a 32-bit hash (stable across runs)."""
+    theta = 2.0 * math.pi * (value & 0xFFFF) / 65536.0
+    z = 2.0 * ((value >> 16) & 0xFFFF) / 65535.0 - 1.0
+    r = math.sqrt(max(0.0, 1.0 - z * z))
+    return r * math.cos(theta), r * math.sin(theta), z
+
+
+def seed_positions(names, communities, spacing=SPACING):
+    """
+    Flat x, y, z per node. Communities (largest first) sit on a golden-angle
+    spiral whose radius grows with the files already placed, so their regions
+    don't overlap. Within one, a file starts out from its community centre in
+    its directory's direction, jittered by its own path. Files in no
+    community (-1) start the same way from the origin, on a shell just
+    outside the spiral.
+    """
+    count = len(names)
+    group_count = max(communities, default=-1) + 1
+    sizes = [0] * group_count
+    for c in communities:
+        if c >= 0:
+            sizes[c] += 1
+
+    golden = math.pi * (3.0 - math.sqrt(5.0))
+    centres = []
+    placed = 0
+    for c in range(group_count):
+        radius = spacing * 2.0 * _cbrt(placed + sizes[c] / 2.0) if c else 0.0
+        placed += sizes[c]
+        z = 1.0 - 2.0 * (c + 0.5) / group_count
+        r = math.sqrt(max(0.0, 1.0 - z * z))
+        angle = golden * c
+        centres.append((radius * r * math.cos(angle), radius * r * math.sin(angle), radius * z))
+    shell = spacing * 2.0 * _cbrt(placed) + spacing
+
+    positions = [0.0] * (3 * count)
+    for node, name in enumerate(names):
+        c = communities[node]
+        if c < 0:
+            cx = cy = cz = 0.0
+            reach = shell
+        else:
+            cx, cy, cz = centres[c]
+            reach = spacing * _cbrt(sizes[c])
+        directory = name.rpartition("/")[0]
+        dx, dy, dz = _direction(zlib.crc32(directory.encode("utf-8")))
+        jx, jy, jz = _direction(zlib.crc32(name.encode("utf-8")))
+        positions[3 * node] = cx + reach * (0.6 * dx + 0.4 * jx)
+        positions[3 * node + 1] = cy + reach * (0.6 * dy + 0.4 * jy)
+        positions[3 * node + 2] = cz + reach * (0.6 * dz + 0.4 * jz)
+    return positions
+
+
+# ---------------------------------------------------------
+# FORCE LAYOUT
+# ---------------------------------------------------------
+
+def force_layout(offsets, targets, positions, iterations=ITERATIONS, spacing=SPACING):
+    """
+    Fruchterman-Reingold refinement of positions ((n, 3) array) with grid
+    approximated repulsion and linear cooling. Files without any import
+    edge are left out of the simulation and parked on a shell just outside
+    it, in the direction they were seeded. Returns the new array, scaled
+    back to the seeds' spread.
+    """
+    count = len(positions)
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    targets = numpy.asarray(targets, dtype=numpy.int64)
+    sources = numpy.repeat(numpy.arange(count), numpy.diff(offsets))
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+
+    seed_centred = positions - positions.mean(axis=0)
+    degree = numpy.bincount(sources, minlength=count) + numpy.bincount(targets, minlength=count)
+    linked = numpy.flatnonzero(degree)
+    if len(linked) < 2:
+        return seed_centred
+    remap = numpy.full(count, -1, dtype=numpy.int64)
+    remap[linked] = numpy.arange(len(linked))
+    moved = _simulate(positions[linked], remap[sources], remap[targets], iterations, spacing)
+
+    result = numpy.empty_like(positions)
+    result[linked] = moved - moved.mean(axis=0)
+    isolated = numpy.flatnonzero(degree == 0)
+    if len(isolated):
+        shell = 1.1 * numpy.sqrt((result[linked] ** 2).sum(axis=1).max())
+        direction = seed_centred[isolated]
+        length = numpy.sqrt((direction * direction).sum(axis=1))
+        direction[length == 0] = (0.0, 0.0, 1.0)
+        length[length == 0] = 1.0
+        result[isolated] = direction * (shell / length)[:, None]
+
+    # Keep the seeds' overall scale so the UI's camera defaults still fit
+    spread = numpy.sqrt((result * result).sum(axis=1).mean())
+    seed_spread = numpy.sqrt((seed_centred * seed_centred).sum(axis=1).mean())
+    if spread > 0:
+        result *= seed_spread / spread
+    return result
+
+
+def _simulate(positions, sources, targets, iterations, k):
+    count = len(positions)
+    softening = (0.1 * k) ** 2
+    start_temperature = k * max(1.0, _cbrt(count)) * 0.5
+    for step in range(iterations):
+        displacement = _repulsion(positions, k, softening)
+        delta = positions[targets] - positions[sources]
+        # Attraction d^2 / k along the edge
+        pull = delta * (numpy.sqrt((delta * delta).sum(axis=1)) / k)[:, None]
+        for axis in range(3):
+            displacement[:, axis] += numpy.bincount(sources, weights=pull[:, axis], minlength=count)
+            displacement[:, axis] -= numpy.bincount(targets, weights=pull[:, axis], minlength=count)
+        # Weak pull to the centre keeps small separate components close
+        displacement -= GRAVITY * (positions - positions.mean(axis=0))
+        temperature = start_temperature * (1.0 - step / iterations)
+        length = numpy.sqrt((displacement * displacement).sum(axis=1))
+        scale = numpy.minimum(length, temperature) / numpy.maximum(length, 1e-9)
+        positions = positions + displacement * scale[:, None]
+    return positions
+
+
+def _repulsion(positions, k, softening):
+    """
+    Repulsive displacement k^2 / d per node: each other grid cell acts as
+    its total mass at its centroid, nodes sharing the node's cell repel it
+    one by one.
+    """
+    count = len(positions)
+    cells_per_axis = int(max(1, min(16, _cbrt(max(1.0, min(count / 16.0, REPULSION_WORK / count))))))
+    low = positions.min(axis=0)
+    span = positions.max(axis=0) - low + 1e-9
+    grid = numpy.minimum((positions - low) / span * cells_per_axis, cells_per_axis - 1).astype(numpy.int64)
+    cell = (grid[:, 0] * cells_per_axis + grid[:, 1]) * cells_per_axis + grid[:, 2]
+    cell_total = cells_per_axis ** 3
+    mass = numpy.bincount(cell, minlength=cell_total).astype(numpy.float64)
+    sums = numpy.stack(
+        [numpy.bincount(cell, weights=positions[:, axis], minlength=cell_total) for axis in range(3)],
+        axis=1,
+    )
+    occupied = numpy.flatnonzero(mass)
+    slot = numpy.full(cell_total, -1, dtype=numpy.int64)
+    slot[occupied] = numpy.arange(len(occupied))
+    centroids = sums[occupied] / mass[occupied][:, None]
+    masses = mass[occupied]
+    kk = k * k
+
+    # sum_j w_j (p - c_j) = p * sum_j w_j - W @ C, with |p - c|^2 expanded,
+    # so the blocks are matrix products rather than (nodes, cells, 3) arrays
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    displacement = numpy.empty_like(positions)
+    block = max(1, BLOCK_PAIRS // len(occupied))
+    for start in range(0, count, block):
+        stop = min(start + block, count)
+        chunk = positions[start:stop]
+        distance = (chunk * chunk).sum(axis=1)[:, None] + centroid_norms[None, :] - 2.0 * (chunk @ centroids.T)
+        weight = masses[None, :] / (numpy.maximum(distance, 0.0) + softening)
+        weight[numpy.arange(stop - start), slot[cell[start:stop]]] = 0.0
+        displacement[start:stop] = kk * (chunk * weight.sum(axis=1)[:, None] - weight @ centroids)
+
+    mass_int = mass.astype(numpy.int64)
+    if int((mass_int * (mass_int - 1)).sum()) // 2 <= NEAR_PAIRS:
+        displacement += kk * _near_field(positions, cell, mass_int, softening)
+    else:
+        # Too crowded for exact pairs: own cell as the centroid of the others
+        others = mass[cell] - 1.0
+        own_centroid = (sums[cell] - positions) / numpy.maximum(others, 1.0)[:, None]
+        delta = positions - own_centroid
+        weight = numpy.where(others > 0, others / ((delta * delta).sum(axis=1) + softening), 0.0)
+        displacement += kk * delta * weight[:, None]
+    return displacement
+
+
+def _near_field(positions, cell, mass, softening):
+    """Exact repulsion (before the k^2 factor) between nodes sharing a cell."""
+    count = len(positions)
+    order = numpy.argsort(cell, kind="stable")
+    group_end = numpy.cumsum(mass)[cell[order]]
+    # Each unordered pair once: a node with the nodes after it in its cell
+    position = numpy.arange(count)
+    partners = group_end - position - 1
+    total = int(partners.sum())
+    first = numpy.repeat(position, partners)
+    second = first + 1 + numpy.arange(total) - numpy.repeat(numpy.cumsum(partners) - partners, partners)
+    first, second = order[first], order[second]
+    delta = positions[first] - positions[second]
+    delta *= (1.0 / ((delta * delta).sum(axis=1) + softening))[:, None]
+    return numpy.stack(
+        [
+            numpy.bincount(first, weights=delta[:, axis], minlength=count)
+            - numpy.bincount(second, weights=delta[:, axis], minlength=count)
+            for axis in range(3)
+        ],
+        axis=1,
+    )
@@ -0,0 +1,736 @@
+"""BOM-STRICT"""
+"""
+import_resolution.py
+====================
+Import scanning and resolution helpers for AnalyzerCore.
+Scans Python import statements without building an AST, lexes JS/TS
+module specifiers in a single linear pass, and builds a
+module-name index over the project's Python files once per run so absolute
+and relative imports resolve with dictionary lookups instead of probing the
+filesystem. tsconfig/jsconfig `paths` aliases are loaded once into a prefix
+trie, and monorepo workspaces (package.json `workspaces`, Cargo.toml
+`[workspace]`) map package and crate names to their member directories.
+"""
+
+import ast
+import glob
+import json
+import os
+import re
+from collections import namedtuple
+
+try:
+    import tomllib
+except Exception:
+    tomllib = None
+
+# One imported name as written in source. level is the number of leading
+# dots (0 = absolute); name is the imported member for `from X import name`
+# and None for plain `import X`.
+PythonImport = namedtuple("PythonImport", ["level", "module", "name"])
+
+
+# ---------------------------------------------------------
+# PYTHON IMPORT SCANNING
+# ---------------------------------------------------------
+
+# One pass over the source that consumes strings and comments whole, so an
+# "import" inside a docstring is never mistaken for a statement. Imports at
+# the start of a line are statements at any nesting depth (if TYPE_CHECKING,
+# try/except, function bodies); any other bare "import" keyword means a
+# construct the scanner doesn't model (e.g. `try: import x`). String prefixes
+# (r, b, f...) don't change where a literal ends, so they aren't matched.
+_PY_SCAN = re.compile(
+    rb"""
+      (?P<string>(?:
+            \"\"\"[^"\\]*(?:(?:\\[\s\S]|"(?!""))[^"\\]*)*\"\"\"
+          | \'\'\'[^'\\]*(?:(?:\\[\s\S]|'(?!''))[^'\\]*)*\'\'\'
+          | "[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*"
+          | '[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*'
+      ))
+    | (?P<comment>\#[^\n]*)
+    | (?P<statement>^[ \t]*(?:import|from)\b)
+    | (?P<stray>\bimport\b)
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+# Rest of a logical line: a parenthesised name list, backslash continuations,
+# up to a newline, comment or semicolon
+_PY_LOGICAL_LINE = re.compile(rb"(?:\([^)]*\)|\\\r?\n|[^\n#;()])*")
+_PY_COMMENT = re.compile(rb"#[^\n]*")
+_PY_FROM = re.compile(r"^from\s*(\.*)\s*([\w.]*)\s+import\s+(.+)$")
+_PY_IMPORT = re.compile(r"^import\s+(.+)$")
+_PY_DOTTED = re.compile(r"^[A-Za-z_]\w*(?:\s*\.\s*[A-Za-z_]\w*)*$")
+_PY_NAME = re.compile(r"^(?:[A-Za-z_]\w*|\*)$")
+
+
+def _split_aliases(text):
+    """Split 'a as b, c' into ['a', 'c']; None if the list is malformed."""
+    names = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            # A trailing comma is legal inside parentheses
+            continue
+        name = item.split(" as ")[0].strip()
+        names.append(name)
+    return names or None
+
+
+def _parse_import_statement(text):
+    """Parse one normalised import statement into PythonImports, or None."""
+    match = _PY_FROM.match(text)
+    if match:
+        dots, module, names_text = match.groups()
+        if not dots and not module:
+            return None
+        names_text = names_text.strip()
+        if names_text.startswith("("):
+            if not names_text.endswith(")"):
+                return None
+            names_text = names_text[1:-1]
+        names = _split_aliases(names_text)
+        if not names or not all(_PY_NAME.match(n) for n in names):
+            return None
+        module = module.replace(" ", "")
+        return [PythonImport(len(dots), module, name) for name in names]
+
+    match = _PY_IMPORT.match(text)
+    if match:
+        names = _split_aliases(match.group(1))
+        if not names or not all(_PY_DOTTED.match(n) for n in names):
+            return None
+        return [PythonImport(0, re.sub(r"\s+", "", n), None) for n in names]
+    return None
+
+
+def _ast_python_imports(source):
+    """Full-AST fallback; returns None if the source doesn't parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(PythonImport(0, alias.name, None))
+        elif isinstance(node, ast.ImportFrom):
+            # Keep level so relative imports resolve against the package
+            for alias in node.names:
+                imports.append(PythonImport(node.level or 0, node.module or "", alias.name))
+    return imports
+
+
+def scan_python_imports(data):
+    """
+    Find import statements in Python source (bytes or mmap) from a single
+    regex pass over strings, comments and statement heads. Falls back to
+    ast.parse only when it meets an import it can't parse itself; if the
+    file doesn't parse either (Python 2, templates), the scanner's own
+    results are returned.
+    """
+    imports = []
+    needs_ast = False
+    pos = 0
+    end_of_data = len(data)
+    while pos < end_of_data:
+        match = _PY_SCAN.search(data, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        pos = match.end()
+        if kind == "statement":
+            head_start = match.start()
+            line = _PY_LOGICAL_LINE.match(data, pos)
+            pos = line.end()
+            raw = bytes(data[head_start:pos])
+            text = _PY_COMMENT.sub(b"", raw).decode("utf-8", errors="ignore")
+            text = " ".join(text.replace("\\", " ").split())
+            parsed = _parse_import_statement(text)
+            if parsed is None:
+                needs_ast = True
+            else:
+                imports.extend(parsed)
+        elif kind == "stray":
+            needs_ast = True
+        if pos == match.start():
+            pos += 1
+
+    if needs_ast:
+        source = data[:] if not isinstance(data, bytes) else data
+        fallback = _ast_python_imports(source.decode("utf-8", errors="ignore"))
+        if fallback is not None:
+            return fallback
+    return imports
+
+
+# ---------------------------------------------------------
+# JS/TS IMPORT SCANNING
+# ---------------------------------------------------------
+
+# Single left-to-right pass. Comments, strings and template literals are
+# consumed whole; every alternative is either a fixed-terminator scan or a
+# literal, so the pass is linear even on minified bundles. An unterminated
+# block comment runs to the end of the data, so no "/*" is scanned twice.
+_JS_SCAN = re.compile(
+    rb"""
+      (?P<comment>//[^\n]*|/\*[^*]*(?:\*+[^*/][^*]*)*(?:\*+/|\**\Z))
+    | (?P<string>"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*"|'[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*')
+    | (?P<template>`[^`\\]*(?:\\[\s\S][^`\\]*)*`)
+    | (?P<slash>/)
+    | (?P<keyword>(?<![\w$.])(?:import|export|require)(?![\w$]))
+    """,
+    re.VERBOSE,
+)
+
+_JS_SPECIFIER = rb"""(?:"([^"\\\n]*)"|'([^'\\\n]*)')"""
+# Continuations matched right after the keyword; each yields one specifier
+_JS_IMPORT_FROM = re.compile(
+    rb"\s*(?:type\s+)?(?:[\w$]+\s*,?\s*)?(?:\{[^}]*\}|\*\s*as\s+[\w$]+)?\s*from\s*" + _JS_SPECIFIER
+)
+_JS_IMPORT_BARE = re.compile(rb"\s*" + _JS_SPECIFIER)
+_JS_CALL = re.compile(rb"\s*\(\s*" + _JS_SPECIFIER + rb"\s*[,)]")
+_JS_EXPORT_FROM = re.compile(
+    rb"\s*(?:type\s+)?(?:\*(?:\s*as\s+[\w$]+)?|\{[^}]*\})\s*from\s*" + _JS_SPECIFIER
+)
+# Regex literal body: classes may contain "/", escapes may contain anything
+_JS_REGEX_LITERAL = re.compile(rb"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# After these characters a "/" starts a regex literal rather than a division
+_JS_REGEX_PRECEDERS = frozenset(b"(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = frozenset(
+    [b"return", b"typeof", b"case", b"do", b"else", b"in", b"of", b"new",
+     b"delete", b"void", b"throw", b"instanceof", b"yield", b"await"]
+)
+_JS_WHITESPACE = frozenset(b" \t\r\n")
+_JS_WORD = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+
+
+def _js_slash_starts_regex(data, pos):
+    """Decide regex-vs-division for the "/" at pos from the preceding token."""
+    i = pos - 1
+    while i >= 0 and data[i] in _JS_WHITESPACE:
+        i -= 1
+    if i < 0:
+        return True
+    prev = data[i]
+    if prev == 0x3C:  # "<" - a JSX closing tag, not a regex
+        return False
+    if prev in _JS_REGEX_PRECEDERS:
+        return True
+    if prev in _JS_WORD:
+        start = i
+        while start > 0 and i - start < 10 and data[start - 1] in _JS_WORD:
+            start -= 1
+        return bytes(data[start:i + 1]) in _JS_REGEX_KEYWORDS
+    return False
+
+
+def _js_quote_in_text(data, pos):
+    """
+    True when the quote at pos directly follows a word that isn't a
+    keyword, as an apostrophe in JSX text does ("Don't"); code only puts a
+    string literal straight after a word when the word is a keyword.
+    """
+    i = pos - 1
+    if i < 0 or data[i] not in _JS_WORD:
+        return False
+    start = i
+    while start > 0 and i - start < 10 and data[start - 1] in _JS_WORD:
+        start -= 1
+    return bytes(data[start:i + 1]) not in _JS_REGEX_KEYWORDS
+
+
+def _js_specifier(match):
+    value = match.group(1) if match.group(1) is not None else match.group(2)
+    return value.decode("utf-8", errors="ignore")
+
+
+def scan_js_imports(data):
+    """
+    Extract module specifiers from JS/TS source (bytes or mmap): static
+    imports (including multi-line and `import type`), side-effect imports,
+    `export ... from` re-exports, dynamic import() and require() calls with
+    literal arguments. Anything inside comments, strings, template literals
+    or regex literals is ignored.
+    """
+    specifiers = []
+    pos = 0
+    end_of_data = len(data)
+    while pos < end_of_data:
+        match = _JS_SCAN.search(data, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        pos = match.end()
+        if kind == "string" and _js_quote_in_text(data, match.start()):
+            # Prose, not a string: rescan from just after the quote
+            pos = match.start() + 1
+            continue
+        if kind == "slash":
+            if _js_slash_starts_regex(data, match.start()):
+                literal = _JS_REGEX_LITERAL.match(data, match.start())
+                if literal:
+                    pos = literal.end()
+            continue
+        if kind != "keyword":
+            continue
+
+        keyword = match.group("keyword")
+        if keyword == b"import":
+            candidates = (_JS_CALL, _JS_IMPORT_FROM, _JS_IMPORT_BARE)
+        elif keyword == b"export":
+            candidates = (_JS_EXPORT_FROM,)
+        else:
+            candidates = (_JS_CALL,)
+        for candidate in candidates:
+            statement = candidate.match(data, pos)
+            if statement:
+                specifiers.append(_js_specifier(statement))
+                pos = statement.end()
+                break
+    return specifiers
+
+
+# ---------------------------------------------------------
+# TSCONFIG / JSCONFIG PATH ALIASES
+# ---------------------------------------------------------
+
+ALIAS_CONFIG_FILES = ["tsconfig.json", "jsconfig.json"]
+
+# tsconfig is JSONC: strings are kept, comments and trailing commas dropped
+_JSONC_NOISE = re.compile(r'("(?:[^"\\\n]|\\.)*")|//[^\n]*|/\*[\s\S]*?\*/|,(?=\s*[}\]])')
+
+
+def _load_jsonc(path):
+    with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        text = f.read()
+    return json.loads(_JSONC_NOISE.sub(lambda m: m.group(1) or "", text))
+
+
+def _read_compiler_options(config_path, seen):
+    """
+    Return (base_url, paths, paths_base) for config_path after following
+    relative `extends`. Directories are absolute; an option declared in a
+    parent config stays relative to that parent's directory.
+    """
+    config_path = os.path.normpath(config_path)
+    if config_path in seen or not os.path.isfile(config_path):
+        return None, None, None
+    seen.add(config_path)
+    try:
+        config = _load_jsonc(config_path)
+    except Exception:
+        return None, None, None
+    if not isinstance(config, dict):
+        return None, None, None
+
+    base_url = paths = paths_base = None
+    config_dir = os.path.dirname(config_path)
+    extends = config.get("extends")
+    for parent in extends if isinstance(extends, list) else [extends]:
+        # Package-name extends (e.g. @tsconfig/node18) live in node_modules
+        if not isinstance(parent, str) or not parent.startswith((".", "/")):
+            continue
+        parent_path = os.path.join(config_dir, parent)
+        if not parent_path.endswith(".json"):
+            parent_path += ".json"
+        p_base_url, p_paths, p_paths_base = _read_compiler_options(parent_path, seen)
+        base_url = p_base_url or base_url
+        if p_paths is not None:
+            paths, paths_base = p_paths, p_paths_base
+
+    options = config.get("compilerOptions") or {}
+    if isinstance(options.get("baseUrl"), str):
+        base_url = os.path.normpath(os.path.join(config_dir, options["baseUrl"]))
+    if isinstance(options.get("paths"), dict):
+        paths, paths_base = options["paths"], config_dir
+    # Without baseUrl, `paths` targets are relative to the declaring config
+    if paths is not None and base_url:
+        paths_base = base_url
+    return base_url, paths, paths_base
+
+
+class PathAliasTrie:
+    """
+    Prefix trie over compilerOptions.paths patterns. Each pattern is stored
+    under the text before its "*", so one walk along a specifier finds the
+    exact entry and the longest matching wildcard prefix, as tsc does.
+    """
+
+    _EXACT = 0
+    _WILDCARD = 1
+
+    def __init__(self, base_url=None, paths_base=None):
+        self.base_url = base_url
+        self.paths_base = paths_base
+        self.size = 0
+        self._root = {}
+
+    def add(self, pattern, targets):
+        prefix, star, suffix = pattern.partition("*")
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if star:
+            node.setdefault(self._WILDCARD, []).append((suffix, targets))
+        else:
+            node[self._EXACT] = targets
+        self.size += 1
+
+    def match(self, specifier):
+        """Substituted target paths for specifier, best pattern first."""
+        node = self._root
+        best = None
+        depth = 0
+        for char in specifier:
+            for suffix, targets in node.get(self._WILDCARD, ()):
+                if specifier.endswith(suffix) and depth + len(suffix) <= len(specifier):
+                    best = (depth, suffix, targets)
+            node = node.get(char)
+            if node is None:
+                break
+            depth += 1
+        else:
+            if self._EXACT in node:
+                return list(node[self._EXACT])
+            for suffix, targets in node.get(self._WILDCARD, ()):
+                if not suffix:
+                    best = (depth, suffix, targets)
+        if best is None:
+            return []
+        depth, suffix, targets = best
+        captured = specifier[depth: len(specifier) - len(suffix)]
+        return [target.replace("*", captured, 1) for target in targets]
+
+    def candidates(self, specifier):
+        """Absolute base paths to probe for a non-relative specifier."""
+        results = []
+        if self.size:
+            for target in self.match(specifier):
+                results.append(os.path.normpath(os.path.join(self.paths_base, target)))
+        if self.base_url:
+            results.append(os.path.normpath(os.path.join(self.base_url, specifier)))
+        return results
+
+
+def load_path_aliases(project_dir, config_files=None):
+    """
+    Build a PathAliasTrie from the first tsconfig/jsconfig at the project
+    root. An empty trie (no aliases, no baseUrl) is returned when none exist.
+    """
+    for name in config_files or ALIAS_CONFIG_FILES:
+        config_path = os.path.join(str(project_dir), name)
+        if not os.path.isfile(config_path):
+            continue
+        base_url, paths, paths_base = _read_compiler_options(config_path, set())
+        trie = PathAliasTrie(base_url, paths_base)
+        if paths:
+            for pattern, targets in paths.items():
+                if isinstance(targets, list):
+                    trie.add(pattern, [t for t in targets if isinstance(t, str)])
+        return trie
+    return PathAliasTrie()
+
+
+# ---------------------------------------------------------
+# MONOREPO WORKSPACES
+# ---------------------------------------------------------
+
+# package.json fields naming a package's entry module, most source-like first
+_PACKAGE_ENTRY_FIELDS = ["source", "module", "main", "types"]
+_PACKAGE_ENTRY_FALLBACKS = ["src/index", "index"]
+
+# Fallback Cargo.toml reader when tomllib is missing: sections, plus keys
+# holding a string or an array of strings (all a workspace needs)
+_TOML_SECTION = re.compile(r"^[ \t]*\[([^\[\]\n]+)\][ \t]*(?:#[^\n]*)?$", re.M)
+_TOML_KEY = re.compile(r'^[ \t]*([\w-]+)[ \t]*=[ \t]*("(?:[^"\\\n]|\\.)*"|\[[^\]]*\])', re.M)
+_TOML_STRING = re.compile(r'"((?:[^"\\\n]|\\.)*)"')
+
+
+def _read_toml(path):
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8", errors="ignore")
+    if tomllib is not None:
+        return tomllib.loads(text)
+    result = {}
+    headers = list(_TOML_SECTION.finditer(text))
+    starts = [0] + [m.end() for m in headers]
+    ends = [m.start() for m in headers] + [len(text)]
+    sections = [None] + [m.group(1).strip() for m in headers]
+    for section, start, end in zip(sections, starts, ends):
+        table = result.setdefault(section, {}) if section else result
+        for key, value in _TOML_KEY.findall(text, start, end):
+            strings = _TOML_STRING.findall(value)
+            table[key] = strings if value.startswith("[") else (strings[0] if strings else "")
+    return result
+
+
+def _expand_members(root, patterns, manifest):
+    """Directories (project-relative) matched by workspace globs that hold manifest."""
+    included, excluded = set(), set()
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            continue
+        target = excluded if pattern.startswith("!") else included
+        pattern = pattern.lstrip("!")
+        if pattern.startswith("./"):
+            pattern = pattern[2:]
+        pattern = pattern.strip("/")
+        if not pattern:
+            continue
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            if rel == "." or rel.startswith("../") or "node_modules" in rel.split("/"):
+                continue
+            if os.path.isfile(os.path.join(path, manifest)):
+                target.add(rel)
+    return sorted(included - excluded)
+
+
+class WorkspacePackage:
+    """One workspace member: its package (or crate) name and directory."""
+
+    __slots__ = ("name", "rel_dir", "kind", "entries")
+
+    def __init__(self, name, rel_dir, kind, entries=()):
+        self.name = name
+        self.rel_dir = rel_dir
+        # "npm" or "cargo"
+        self.kind = kind
+        # Paths (relative to rel_dir) to probe for an import of the bare name
+        self.entries = list(entries)
+
+    def to_dict(self):
+        return {"name": self.name, "path": self.rel_dir, "kind": self.kind}
+
+
+def _npm_workspaces(root):
+    try:
+        with open(os.path.join(root, "package.json"), "r", encoding="utf-8-sig") as f:
+            manifest = json.load(f)
+        patterns = manifest.get("workspaces")
+    except Exception:
+        return []
+    # Either a list of globs or {"packages": [...]} (yarn classic)
+    if isinstance(patterns, dict):
+        patterns = patterns.get("packages")
+    if not isinstance(patterns, list):
+        return []
+
+    packages = []
+    for rel_dir in _expand_members(root, patterns, "package.json"):
+        try:
+            with open(os.path.join(root, rel_dir, "package.json"), "r", encoding="utf-8-sig") as f:
+                member = json.load(f)
+        except Exception:
+            continue
+        name = member.get("name") if isinstance(member, dict) else None
+        if not isinstance(name, str) or not name:
+            continue
+        exports = member.get("exports")
+        if isinstance(exports, dict):
+            exports = exports.get(".")
+        entries = []
+        for value in [exports] + [member.get(field) for field in _PACKAGE_ENTRY_FIELDS]:
+            if isinstance(value, str) and value not in entries:
+                entries.append(os.path.normpath(value))
+        entries.extend(_PACKAGE_ENTRY_FALLBACKS)
+        packages.append(WorkspacePackage(name, rel_dir, "npm", entries))
+    return packages
+
+
+def _cargo_workspaces(root):
+    try:
+        workspace = _read_toml(os.path.join(root, "Cargo.toml")).get("workspace")
+    except Exception:
+        return []
+    if not isinstance(workspace, dict):
+        return []
+    patterns = list(workspace.get("members") or [])
+    patterns.extend("!" + p for p in workspace.get("exclude") or [] if isinstance(p, str))
+
+    packages = []
+    for rel_dir in _expand_members(root, patterns, "Cargo.toml"):
+        try:
+            package = _read_toml(os.path.join(root, rel_dir, "Cargo.toml")).get("package") or {}
+        except Exception:
+            continue
+        name = package.get("name")
+        if isinstance(name, str) and name:
+            # `use` paths spell crate names with underscores
+            packages.append(WorkspacePackage(name.replace("-", "_"), rel_dir, "cargo"))
+    return packages
+
+
+class WorkspaceIndex:
+    """Resolves imports of sibling workspace packages to their directories."""
+
+    def __init__(self, root=None, packages=()):
+        self.root = root
+        self.packages = sorted(packages, key=lambda p: p.rel_dir)
+        self._by_name = {p.name: p for p in self.packages}
+
+    def __len__(self):
+        return len(self.packages)
+
+    def candidates(self, specifier):
+        """Absolute base paths to probe for specifier, best first ([] if not a workspace import)."""
+        if not self._by_name:
+            return []
+        name, _, rest = specifier.partition("/")
+        if name.startswith("@") and rest:
+            scoped, _, rest = rest.partition("/")
+            name = f"{name}/{scoped}"
+        package = self._by_name.get(name)
+        if package is None and name.endswith(".rs"):
+            package = self._by_name.get(name[:-3])
+        if package is None:
+            return []
+        base = os.path.join(self.root, *package.rel_dir.split("/"))
+
+        if package.kind == "cargo":
+            src = os.path.join(base, "src")
+            results = []
+            parts = rest[:-3].split("/") if rest.endswith(".rs") else [p for p in rest.split("/") if p]
+            # The last segment of a use path is as often an item as a module
+            while parts:
+                results.append(os.path.join(src, *parts) + ".rs")
+                results.append(os.path.join(src, *parts, "mod.rs"))
+                parts.pop()
+            results.append(os.path.join(src, "lib.rs"))
+            results.append(os.path.join(src, "main.rs"))
+            return results
+
+        if rest:
+            return [os.path.join(base, rest), os.path.join(base, "src", rest)]
+        return [os.path.normpath(os.path.join(base, entry)) for entry in package.entries]
+
+
+def load_workspaces(project_dir):
+    """
+    Detect npm/yarn package.json `workspaces` and Cargo
+    `[workspace]` members at the project root. Returns a WorkspaceIndex,
+    empty when the project isn't a monorepo.
+    """
+    root = str(project_dir)
+    packages = _npm_workspaces(root) + _cargo_workspaces(root)
+    return WorkspaceIndex(root, packages)
+
+
+def _module_name(rel_path, root):
+    """Dotted module name of rel_path relative to source root ('' = project root)."""
+    if root:
+        rel_path = rel_path[len(root) + 1:]
+    stem = rel_path[:-3]
+    if stem == "__init__":
+        return ""
+    if stem.endswith("/__init__"):
+        stem = stem[: -len("/__init__")]
+    return stem.replace("/", ".")
+
+
+def _dirname(rel_path):
+    return rel_path.rpartition("/")[0]
+
+
+class PythonModuleIndex:
+    """
+    Maps dotted module names to project-relative .py paths.
+    Source roots are the project root, any `src` directory holding Python
+    files, and the parent of every top-level package (a directory with
+    __init__.py whose parent has none), so `app.models` resolves whether the
+    package sits at the root, under src/ or under e.g. backend/.
+    """
+
+    def __init__(self, rel_paths):
+        py_files = sorted(p for p in rel_paths if p.endswith(".py"))
+        self.known_files = set(py_files)
+        self.roots = self._detect_roots(py_files)
+        self.modules = {}
+        # rel_path -> package name used as the anchor for relative imports
+        self.packages = {}
+
+        for rel_path in py_files:
+            own_name = None
+            for root in self.roots:
+                if root and not rel_path.startswith(root + "/"):
+                    continue
+                name = _module_name(rel_path, root)
+                if name:
+                    self.modules.setdefault(name, rel_path)
+                # Roots are ordered shallow to deep; the deepest one wins
+                own_name = name
+            if own_name is None:
+                continue
+            if rel_path.endswith("__init__.py"):
+                self.packages[rel_path] = own_name
+            else:
+                self.packages[rel_path] = own_name.rpartition(".")[0]
+
+    @staticmethod
+    def _detect_roots(py_files):
+        package_dirs = {
+            _dirname(p) for p in py_files if p == "__init__.py" or p.endswith("/__init__.py")
+        }
+        roots = {""}
+        for pkg_dir in package_dirs:
+            if not pkg_dir:
+                continue
+            parent = _dirname(pkg_dir)
+            if parent not in package_dirs:
+                roots.add(parent)
+        for p in py_files:
+            parts = p.split("/")[:-1]
+            for i, part in enumerate(parts):
+                if part == "src":
+                    roots.add("/".join(parts[: i + 1]))
+        return sorted(roots, key=lambda r: (r.count("/") + bool(r), r))
+
+    def resolve(self, from_rel_path, ref):
+        """
+        Resolve a PythonImport made by from_rel_path to a project file, or None.
+        `from X import name` prefers the submodule X.name and falls back to
+        X's own module (package __init__.py for packages).
+        """
+        if ref.level:
+            package = self.packages.get(from_rel_path)
+            if package is None:
+                return None
+            parts = package.split(".") if package else []
+            up = ref.level - 1
+            if up > len(parts):
+                return None
+            base = parts[: len(parts) - up]
+            if ref.module:
+                base.append(ref.module)
+            base_name = ".".join(base)
+        else:
+            base_name = ref.module
+
+        target = None
+        if ref.name and ref.name != "*":
+            target = self.modules.get(f"{base_name}.{ref.name}" if base_name else ref.name)
+        if target is None and base_name:
+            target = self.modules.get(base_name)
+        if target is None and not ref.level and base_name:
+            # Scripts import siblings because their directory is on sys.path
+            target = self._sibling(from_rel_path, base_name, ref.name)
+        if target == from_rel_path:
+            return None
+        return target
+
+    def _sibling(self, from_rel_path, base_name, name):
+        rel_dir = _dirname(from_rel_path)
+        prefix = rel_dir + "/" if rel_dir else ""
+        base_path = prefix + base_name.replace(".", "/")
+        candidates = []
+        if name and name != "*":
+            candidates.append(f"{base_path}/{name}.py")
+        candidates.extend([base_path + ".py", base_path + "/__init__.py"])
+        for candidate in candidates:
+            if candidate in self.known_files:
+                return candidate
+        return None
@@ -0,0 +1,81 @@
+"""BOM-STRICT"""
+"""
+profiling.py
+============
+Counters behind the analyzer CLI's --profile flag. AnalyzerCore records
+every detector run, every file's import resolution and every connectivity
+scan into a StageProfiler, which becomes the report's `profile` section:
+calls, bytes scanned, time spent and the slowest files per stage. The
+cProfile dump written alongside it covers everything else.
+"""
+
+import cProfile
+import heapq
+import time
+
+DEFAULT_SLOWEST = 10
+
+
+class StageStats:
+    """Totals for one stage plus its slowest files (a bounded min-heap)."""
+
+    __slots__ = ("calls", "bytes", "seconds", "slowest")
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.slowest = []
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 6),
+            "slowestFiles": [
+                {"file": path, "seconds": round(seconds, 6), "bytes": nbytes}
+                for seconds, path, nbytes in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+class StageProfiler:
+    def __init__(self, slowest=DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def record(self, stage, path, nbytes, seconds, calls=1):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.calls += calls
+        stats.bytes += nbytes
+        stats.seconds += seconds
+        item = (seconds, path, nbytes)
+        if len(stats.slowest) < self.slowest:
+            heapq.heappush(stats.slowest, item)
+        elif seconds > stats.slowest[0][0]:
+            heapq.heapreplace(stats.slowest, item)
+
+    def to_dict(self):
+        return {
+            "wallSeconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                stage: self.stages[stage].to_dict()
+                for stage in sorted(self.stages, key=lambda s: -self.stages[s].seconds)
+            },
+        }
+
+
+def start_cprofile():
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def stop_cprofile(profile, dump_path):
+    """Stop profile and write its pstats dump; returns the path."""
+    profile.disable()
+    profile.dump_stats(str(dump_path))
+    return str(dump_path)
@@ -0,0 +1,290 @@
+"""BOM-STRICT"""
+"""
+regex_guard.py
+==============
+Guards for the user-written custom_regex_parsers patterns.
+
+lint_pattern() looks for the two shapes that backtrack catastrophically:
+an unbounded repeat around another unbounded repeat with nothing fixing
+where each pass ends ((a+)+, (x+y*)*), and an unbounded repeat of
+alternatives that can match the same text ((ab|.b)*, (a|a)*, (a|\w)*). codegnosis_config
+rejects flagged patterns when the config is loaded.
+
+time_budget() covers whatever the lint misses. The regex engine checks
+for signals while it matches, so a SIGALRM timer interrupts a runaway
+match with BudgetExceeded. Where no timer is available (Windows, worker
+threads) the block runs to the end and the overrun is raised afterwards,
+so the file is still skipped and reported.
+"""
+
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except Exception:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+NESTED_QUANTIFIER = "nested unbounded quantifier"
+OVERLAPPING_ALTERNATION = "repeated alternation with overlapping branches"
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_SINGLE_CHAR = (
+    sre_constants.LITERAL,
+    sre_constants.NOT_LITERAL,
+    sre_constants.ANY,
+    sre_constants.IN,
+    sre_constants.CATEGORY,
+)
+# Python 3.11+: atomic groups and possessive repeats never backtrack into
+# themselves, but a nested repeat inside one still can
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+_POSSESSIVE_REPEAT = getattr(sre_constants, "POSSESSIVE_REPEAT", None)
+
+_CATEGORY_CLASSES = {
+    "DIGIT": re.compile(r"\d"),
+    "NOT_DIGIT": re.compile(r"\D"),
+    "SPACE": re.compile(r"\s"),
+    "NOT_SPACE": re.compile(r"\S"),
+    "WORD": re.compile(r"\w"),
+    "NOT_WORD": re.compile(r"\W"),
+    "LINEBREAK": re.compile(r"\n"),
+    "NOT_LINEBREAK": re.compile(r"[^\n]"),
+}
+# Code points tried when deciding whether two character classes overlap
+_PROBE = range(128)
+
+_CAN_INTERRUPT = hasattr(signal, "setitimer")
+
+
+class BudgetExceeded(Exception):
+    """A custom parser ran past its per-file time budget."""
+
+
+# ---------------------------------------------------------
+# LINT
+# ---------------------------------------------------------
+
+def lint_pattern(pattern):
+    """The catastrophic shapes found in pattern; empty when it looks safe."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    found = []
+    _lint(parsed, found)
+    return found
+
+
+def _lint(seq, found):
+    for op, av in seq:
+        if op in _REPEATS:
+            body = av[2]
+            if av[1] == sre_constants.MAXREPEAT:
+                if NESTED_QUANTIFIER not in found and _ambiguous(body):
+                    found.append(NESTED_QUANTIFIER)
+                if OVERLAPPING_ALTERNATION not in found and _overlapping_alternation(body):
+                    found.append(OVERLAPPING_ALTERNATION)
+            _lint(body, found)
+        elif op == _POSSESSIVE_REPEAT:
+            _lint(av[2], found)
+        elif op == sre_constants.SUBPATTERN:
+            _lint(av[-1], found)
+        elif op == _ATOMIC_GROUP:
+            _lint(av, found)
+        elif op == sre_constants.BRANCH:
+            for branch in av[1]:
+                _lint(branch, found)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _lint(av[1], found)
+        elif op == sre_constants.GROUPREF_EXISTS:
+            for branch in av[1:]:
+                if branch is not None:
+                    _lint(branch, found)
+
+
+def _flatten(seq):
+    """seq's items with group wrappers opened up."""
+    for op, av in seq:
+        if op == sre_constants.SUBPATTERN:
+            yield from _flatten(av[-1])
+        else:
+            yield op, av
+
+
+def _ambiguous(body):
+    """
+    True when a repeated body holds an unbounded repeat and no literal the
+    repeats can't consume, i.e. one input splits into passes many ways.
+    """
+    items = list(_flatten(body))
+    for op, av in items:
+        if op == sre_constants.BRANCH and any(_ambiguous(branch) for branch in av[1]):
+            return True
+    repeated = [
+        _single(av[2]) for op, av in items
+        if op in _REPEATS and av[1] == sre_constants.MAXREPEAT
+    ]
+    if not repeated:
+        return False
+    for op, av in items:
+        if op == sre_constants.LITERAL and all(
+            item is not None and not _matches(item, av) for item in repeated
+        ):
+            return False
+    return True
+
+
+def _overlapping_alternation(body):
+    """
+    True when body holds alternatives that can match the same text.
+    sre_parse hoists a prefix shared by every branch out in front of the
+    BRANCH and collapses single-character alternatives into one IN set,
+    so the whole body is searched for either.
+    """
+    for op, av in body:
+        if op == sre_constants.BRANCH:
+            branches = av[1]
+            if any(
+                _branches_overlap(first, second)
+                for i, first in enumerate(branches)
+                for second in branches[i + 1:]
+            ):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            group = av[-1]
+            # (a|\w) arrives as a group holding one IN set
+            if len(group) == 1 and group[0][0] == sre_constants.IN:
+                if _set_overlaps(group[0][1]):
+                    return True
+            elif _overlapping_alternation(group):
+                return True
+    return False
+
+
+def _set_overlaps(members):
+    """Whether two members of a character set can match the same character."""
+    if any(op == sre_constants.NEGATE for op, av in members):
+        return False
+    items = [
+        (op, av) if op == sre_constants.LITERAL else (sre_constants.IN, [(op, av)])
+        for op, av in members
+    ]
+    return any(
+        _items_overlap(first, second)
+        for i, first in enumerate(items)
+        for second in items[i + 1:]
+    )
+
+
+def _branches_overlap(first, second):
+    """
+    Whether two branches can start on the same text. An empty branch, or
+    one that runs out while matching a prefix of the other, overlaps.
+    """
+    for token_a, token_b in zip(_flatten(first), _flatten(second)):
+        item_a, item_b = _token_item(*token_a), _token_item(*token_b)
+        if item_a is None or item_b is None:
+            return True
+        if not _items_overlap(item_a, item_b):
+            return False
+        if token_a[0] in _REPEATS or token_b[0] in _REPEATS:
+            return True
+    return True
+
+
+def _token_item(op, av):
+    """The one character class a token starts with, or None if unknown."""
+    if op in _REPEATS:
+        return _single(av[2]) if av[0] > 0 else None
+    return _single([(op, av)])
+
+
+def _single(seq):
+    if len(seq) != 1:
+        return None
+    op, av = seq[0]
+    if op == sre_constants.SUBPATTERN:
+        return _single(av[-1])
+    return (op, av) if op in _SINGLE_CHAR else None
+
+
+def _items_overlap(first, second):
+    if first[0] == sre_constants.LITERAL:
+        return _matches(second, first[1])
+    if second[0] == sre_constants.LITERAL:
+        return _matches(first, second[1])
+    return any(_matches(first, c) and _matches(second, c) for c in _PROBE)
+
+
+def _matches(item, c):
+    """Whether the single-character item can match code point c."""
+    op, av = item
+    if op == sre_constants.LITERAL:
+        return av == c
+    if op == sre_constants.NOT_LITERAL:
+        return av != c
+    if op == sre_constants.ANY:
+        return c != 10
+    if op == sre_constants.CATEGORY:
+        return _category_matches(av, c)
+    if op == sre_constants.IN:
+        negate = hit = False
+        for member_op, member_av in av:
+            if member_op == sre_constants.NEGATE:
+                negate = True
+            elif member_op == sre_constants.LITERAL:
+                hit = hit or member_av == c
+            elif member_op == sre_constants.RANGE:
+                hit = hit or member_av[0] <= c <= member_av[1]
+            elif member_op == sre_constants.CATEGORY:
+                hit = hit or _category_matches(member_av, c)
+            else:
+                return True
+        return hit != negate
+    return True
+
+
+def _category_matches(category, c):
+    name = getattr(category, "name", str(category))
+    for prefix in ("CATEGORY_", "UNI_", "LOC_"):
+        name = name.replace(prefix, "")
+    regex = _CATEGORY_CLASSES.get(name)
+    return regex is None or regex.match(chr(c)) is not None
+
+
+# ---------------------------------------------------------
+# TIME BUDGET
+# ---------------------------------------------------------
+
+def _on_alarm(signum, frame):
+    raise BudgetExceeded()
+
+
+@contextmanager
+def time_budget(seconds):
+    """
+    Raise BudgetExceeded when the block runs longer than seconds,
+    interrupting it where a SIGALRM timer can be used. 0 means no budget.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    interrupt = _CAN_INTERRUPT and threading.current_thread() is threading.main_thread()
+    started = time.perf_counter()
+    if interrupt:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        if interrupt:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    if time.perf_counter() - started > seconds:
+        raise BudgetExceeded()
@@ -0,0 +1,190 @@
+"""BOM-STRICT"""
+"""
+result_cache.py
+===============
+Reuse of a whole analysis when nothing it depends on has changed.
+
+A project fingerprint is a hash of the file listing (paths, sizes and
+mtimes from the same excluding walk discovery does), the top-level inputs
+of analyze_build_profile, the compiled config, the analyzer's own modules
+and the CLI options. analyze_project_cli stores each result under it in
+the analysis cache directory. A later run with the same fingerprint
+returns the stored result file without analysing anything, provided the
+artifacts it names (graph image, layout, SQLite store, AI bundle) are
+still the files that run wrote.
+
+Changes inside excluded directories (node_modules, build output) only
+register when they add or remove top-level entries there, so the build
+profile's folder sizes can lag behind. Pass --no-cache, or set
+analysisSettings.resultCache to false, to always re-analyse.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import file_discovery
+
+# Bump when the stored meta layout changes
+CACHE_FORMAT = 1
+
+# Directories and files analyze_build_profile reads outside the walk
+_BUILD_INPUTS = (
+    "node_modules",
+    "package.json",
+    "src",
+    "src-tauri/Cargo.toml",
+    "src-tauri/target",
+    "src-tauri/target/release",
+    "src-tauri/target/release/bundle/msi",
+    "src-tauri/target/release/bundle/nsis",
+)
+
+
+def code_fingerprint():
+    """The frozen executable, or size and mtime of every analyzer module."""
+    parts = [str(CACHE_FORMAT)]
+    if getattr(sys, "frozen", False):
+        paths = [sys.executable]
+    else:
+        here = Path(__file__).resolve().parent
+        paths = sorted(str(p) for p in here.glob("*.py")) + sorted(
+            str(p) for p in here.glob("exporters/*.py")
+        )
+    for path in paths:
+        try:
+            st = os.stat(path)
+            parts.append(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("?")
+    return "|".join(parts)
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+
+def project_fingerprint(analyzer, options, skip=()):
+    """
+    Hash of everything an analysis run's output depends on. Files whose
+    rel_path starts with one of skip are left out; the run itself writes
+    them into the tree (the AI bundles).
+    """
+    digest = hashlib.sha1()
+    settings = {
+        "config": analyzer.config.fingerprint,
+        "extensions": sorted(analyzer.extensions_to_find),
+        "excluded": sorted(analyzer.excluded_folders),
+        "customCategories": analyzer.custom_categories,
+        "options": options,
+        "code": code_fingerprint(),
+        "buildInputs": {
+            rel: _stat_key(os.path.join(analyzer.project_dir, *rel.split("/"))) for rel in _BUILD_INPUTS
+        },
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    listing = [
+        (entry.rel_path, entry.size, entry.mtime)
+        for entry in file_discovery.walk_files(
+            analyzer.project_dir, analyzer.exclusion_matcher, analyzer.walker_threads
+        )
+        if not entry.rel_path.startswith(skip)
+    ]
+    # The parallel walk yields in completion order
+    listing.sort()
+    for rel_path, size, mtime in listing:
+        digest.update(f"{rel_path}\0{size}\0{mtime!r}\n".encode("utf-8", "surrogatepass"))
+    return digest.hexdigest(), len(listing)
+
+
+class ResultCache:
+    """
+    The stored result for one project and set of CLI options. The run
+    writes its report to result_path and its graph image under graph_dir,
+    then store() records the fingerprint taken by lookup() before it began.
+    """
+
+    def __init__(self, analyzer, options, skip=()):
+        import workspace_shards
+
+        self.analyzer = analyzer
+        self.options = options
+        self.skip = tuple(skip)
+        directory = Path(analyzer.cache_dir or workspace_shards.default_cache_dir(analyzer.project_dir))
+        slot_key = json.dumps([os.path.abspath(str(analyzer.project_dir)), options], sort_keys=True)
+        slot = hashlib.sha1(slot_key.encode("utf-8")).hexdigest()[:16]
+        self.directory = directory
+        self.result_path = directory / f"result_{slot}.json"
+        self.meta_path = directory / f"result_{slot}.meta.json"
+        self.graph_dir = directory / f"graphs_{slot}"
+        self.fingerprint = None
+
+    def lookup(self):
+        """The stored result payload when the project is unchanged, else None."""
+        started = time.perf_counter()
+        self.fingerprint, file_count = project_fingerprint(self.analyzer, self.options, self.skip)
+        elapsed = time.perf_counter() - started
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            meta = None
+        if meta is None or meta.get("format") != CACHE_FORMAT or meta.get("fingerprint") != self.fingerprint:
+            self.analyzer.logger.info(
+                f"Result cache miss ({file_count} files fingerprinted in {elapsed:.3f}s)"
+            )
+            return None
+        for path, key in meta["artifacts"].items():
+            if _stat_key(path) != key:
+                self.analyzer.logger.info(f"Result cache miss: {path} changed since it was written")
+                return None
+        self.analyzer.logger.info(
+            f"Result cache hit: {file_count} files unchanged ({elapsed:.3f}s), reusing {self.result_path}"
+        )
+        payload = dict(meta["payload"])
+        payload["cachedResult"] = True
+        return payload
+
+    def invalidate(self):
+        """Drop the stored entry before a run overwrites its files."""
+        try:
+            os.remove(self.meta_path)
+        except OSError:
+            pass
+
+    def prepare(self):
+        self.invalidate()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.graph_dir.mkdir(parents=True, exist_ok=True)
+
+    def store(self, payload, artifacts):
+        """Record the finished run's payload; artifacts are the files it relies on."""
+        if self.fingerprint is None:
+            return
+        paths = [str(self.result_path)] + [str(path) for path in artifacts if path]
+        meta = {
+            "format": CACHE_FORMAT,
+            "fingerprint": self.fingerprint,
+            "payload": payload,
+            "artifacts": {path: _stat_key(path) for path in paths},
+        }
+        if None in meta["artifacts"].values():
+            return
+        tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self.meta_path)
+        except Exception as e:
+            self.analyzer.logger.warning(f"Could not store result cache entry: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
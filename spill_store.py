@@ -0,0 +1,278 @@
+"""BOM-STRICT"""
+"""
+spill_store.py
+==============
+Disk-backed state for AnalyzerCore's bounded-memory mode. Edges are
+written to a scratch SQLite database as they are linked, per-file report
+records are written as they are built, and the report's `files` and
+`dependencyGraph` sections are read-only Mapping views over that database,
+so consumers iterate them without the whole graph being held in memory.
+Reports are written to disk by streaming those sections.
+
+The analyzer's FileTable (one compact record per file) is kept in memory
+and its ids are the store's ids; it is the edge arrays, importer lists
+and per-file report records that exhaust memory on very large
+repositories.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from array import array
+
+from file_records import ReportView
+
+# Rough peak cost of one file in an in-memory run (record, edge arrays,
+# resolve cache, report dicts consumers build); a 500k-file repository
+# outgrows an 8 GB container. Used to decide when a ceiling calls for spilling.
+IN_MEMORY_BYTES_PER_FILE = 16 * 1024
+DEFAULT_MEMORY_LIMIT_MB = 1024
+
+# Shares of the ceiling given to SQLite's page cache and to row buffers
+_PAGE_CACHE_SHARE = 0.25
+_BUFFER_SHARE = 0.05
+# Approximate Python cost of a buffered row beyond its text
+_ROW_OVERHEAD = 72
+
+SCHEMA = """
+CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE edges (
+    source_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    PRIMARY KEY (source_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE records (id INTEGER PRIMARY KEY, info TEXT NOT NULL);
+"""
+
+
+class SpillStore:
+    """
+    Scratch database for one analysis run. Ids are the FileTable's, so
+    they follow registration order, the order the report lists files in.
+    """
+
+    def __init__(self, memory_limit_bytes, table, directory=None):
+        self.memory_limit_bytes = memory_limit_bytes
+        self.table = table
+        self.dir = tempfile.mkdtemp(prefix="codegnosis_spill_", dir=directory)
+        self.path = os.path.join(self.dir, "analysis.db")
+        self.conn = sqlite3.connect(self.path)
+        # Scratch data: a crash loses the run either way
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA temp_store = FILE")
+        cache_kb = max(2048, int(memory_limit_bytes * _PAGE_CACHE_SHARE) // 1024)
+        self.conn.execute(f"PRAGMA cache_size = -{cache_kb}")
+        self.conn.executescript(SCHEMA)
+
+        self.buffer_bytes = max(1024 * 1024, int(memory_limit_bytes * _BUFFER_SHARE))
+        # Bound on the analyzer's resolve cache while spilling
+        self.resolve_cache_limit = self.buffer_bytes // 256
+        self.edge_count = 0
+        self._files = []
+        self._edges = []
+        self._records = []
+        self._buffered = 0
+        self.sealed = False
+
+    def close(self):
+        try:
+            self.conn.close()
+        finally:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    # --- Writing ---
+
+    def add_file(self, file_id):
+        path = self.table.records[file_id].rel_path
+        self._files.append((file_id, path))
+        self._buffered += len(path) + _ROW_OVERHEAD
+        if self._buffered >= self.buffer_bytes:
+            self._flush()
+
+    def add_edges(self, source_id, targets):
+        self._edges.extend((source_id, seq, target) for seq, target in enumerate(targets))
+        self.edge_count += len(targets)
+        self._buffered += len(targets) * _ROW_OVERHEAD
+        if self._buffered >= self.buffer_bytes:
+            self._flush()
+
+    def add_record(self, file_id, info):
+        text = json.dumps(info)
+        self._records.append((file_id, text))
+        self._buffered += len(text) + _ROW_OVERHEAD
+        if self._buffered >= self.buffer_bytes:
+            self._flush()
+
+    def _flush(self):
+        with self.conn:
+            if self._files:
+                self.conn.executemany("INSERT INTO files (id, path) VALUES (?, ?)", self._files)
+            if self._edges:
+                self.conn.executemany(
+                    "INSERT INTO edges (source_id, seq, target_id) VALUES (?, ?, ?)", self._edges
+                )
+            if self._records:
+                self.conn.executemany("INSERT INTO records (id, info) VALUES (?, ?)", self._records)
+        self._files, self._edges, self._records = [], [], []
+        self._buffered = 0
+
+    def seal(self):
+        """Flush buffered edges and index them by target; linking is over."""
+        if self.sealed:
+            return
+        self._flush()
+        with self.conn:
+            self.conn.execute("CREATE INDEX idx_edges_target ON edges (target_id, source_id)")
+        self.sealed = True
+
+    def finish_records(self):
+        self._flush()
+
+    # --- Reading ---
+
+    def csr(self):
+        """The graph as (offsets, targets) arrays over ids."""
+        count = len(self.table)
+        offsets = array("q", bytes(8 * (count + 1)))
+        targets = array("q")
+        for source_id, target_id in self.conn.execute(
+            "SELECT source_id, target_id FROM edges ORDER BY source_id, seq"
+        ):
+            offsets[source_id + 1] += 1
+            targets.append(target_id)
+        for i in range(1, count + 1):
+            offsets[i] += offsets[i - 1]
+        return offsets, targets
+
+    def inbound_counts(self):
+        """Importer count per id."""
+        counts = array("q", bytes(8 * len(self.table)))
+        for target_id, count in self.conn.execute(
+            "SELECT target_id, COUNT(*) FROM edges GROUP BY target_id"
+        ):
+            counts[target_id] = count
+        return counts
+
+    def neighbour_lists(self):
+        """Yield (id, path, imports, importers) for every file in id order."""
+        outbound = self.conn.execute(
+            "SELECT e.source_id, t.path FROM edges e JOIN files t ON t.id = e.target_id"
+            " ORDER BY e.source_id, e.seq"
+        )
+        inbound = self.conn.execute(
+            "SELECT e.target_id, s.path FROM edges e JOIN files s ON s.id = e.source_id"
+            " ORDER BY e.target_id, e.source_id"
+        )
+        next_out = next(outbound, None)
+        next_in = next(inbound, None)
+        for file_id, path in self.conn.execute("SELECT id, path FROM files ORDER BY id"):
+            imports = []
+            while next_out is not None and next_out[0] == file_id:
+                imports.append(next_out[1])
+                next_out = next(outbound, None)
+            importers = []
+            while next_in is not None and next_in[0] == file_id:
+                importers.append(next_in[1])
+                next_in = next(inbound, None)
+            yield file_id, path, imports, importers
+
+    def graph_view(self):
+        return SpilledGraph(self)
+
+    def files_view(self):
+        return SpilledFiles(self)
+
+
+# ---------------------------------------------------------
+# READ-ONLY VIEWS
+# ---------------------------------------------------------
+
+class _SpilledView(ReportView):
+    def __init__(self, store):
+        self.store = store
+        self.conn = store.conn
+        self.ids = store.table.ids
+
+
+class SpilledGraph(_SpilledView):
+    """dependencyGraph: path -> [imported paths], every file as a key."""
+
+    def __len__(self):
+        return len(self.store.table)
+
+    def __iter__(self):
+        for (path,) in self.conn.execute("SELECT path FROM files ORDER BY id"):
+            yield path
+
+    def __contains__(self, path):
+        return path in self.ids
+
+    def __getitem__(self, path):
+        file_id = self.ids.get(path)
+        if file_id is None:
+            raise KeyError(path)
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT t.path FROM edges e JOIN files t ON t.id = e.target_id"
+                " WHERE e.source_id = ? ORDER BY e.seq",
+                (file_id,),
+            )
+        ]
+
+    def items(self):
+        for _, path, imports, _ in self.store.neighbour_lists():
+            yield path, imports
+
+    def values(self):
+        for _, imports in self.items():
+            yield imports
+
+    def _json_items(self):
+        for path, imports in self.items():
+            yield path, json.dumps(imports)
+
+
+class SpilledFiles(_SpilledView):
+    """files: path -> report record, decoded from the records table on access."""
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __iter__(self):
+        for (path,) in self.conn.execute(
+            "SELECT f.path FROM records r JOIN files f ON f.id = r.id ORDER BY r.id"
+        ):
+            yield path
+
+    def __contains__(self, path):
+        file_id = self.ids.get(path)
+        return file_id is not None and self.conn.execute(
+            "SELECT 1 FROM records WHERE id = ?", (file_id,)
+        ).fetchone() is not None
+
+    def __getitem__(self, path):
+        file_id = self.ids.get(path)
+        row = None
+        if file_id is not None:
+            row = self.conn.execute("SELECT info FROM records WHERE id = ?", (file_id,)).fetchone()
+        if row is None:
+            raise KeyError(path)
+        return json.loads(row[0])
+
+    def items(self):
+        for path, info in self._json_items():
+            yield path, json.loads(info)
+
+    def values(self):
+        for _, info in self.items():
+            yield info
+
+    def _json_items(self):
+        return self.conn.execute(
+            "SELECT f.path, r.info FROM records r JOIN files f ON f.id = r.id ORDER BY r.id"
+        )
@@ -0,0 +1,323 @@
+"""BOM-STRICT"""
+"""
+subgraphs.py
+============
+Bounded slices of the dependency graph, so the frontend can load a large
+project progressively instead of all at once:
+
+    top:K[:metric]              the K files ranking highest on a metric
+                                (pageRank by default)
+    hops:FILE[:K][:direction]   FILE plus everything within K imports of it
+                                (1 by default), following imports "out",
+                                importers "in", or "both" (the default)
+    dir:DIRECTORY               every file under DIRECTORY
+
+Each result lists the chosen nodes and the imports among them. A
+SubgraphIndex keeps the graph as forward and reverse CSR arrays, plus node
+ids sorted by path and, once a metric is first asked for, by that metric.
+A query then only touches the nodes it returns and their edges.
+
+AnalyzerCore.subgraph() answers queries after an analysis (the CLI's
+--subgraph). SubgraphIndex.from_result_file() loads a written result file,
+so queries can be served without re-running the analysis.
+
+Standalone: python subgraphs.py <codegnosis_result.json> <query> [--max-nodes N]
+"""
+
+import heapq
+import json
+import sys
+from array import array
+from bisect import bisect_left
+
+import file_records
+import graph_algorithms
+
+METRICS = ("pageRank", "betweenness", "inboundCount", "outboundCount", "chainDepth")
+# Metrics taken from the analysis; the degree counts come from the CSR arrays
+STORED_METRICS = ("pageRank", "betweenness", "chainDepth")
+DEFAULT_METRIC = "pageRank"
+DIRECTIONS = ("out", "in", "both")
+# Cap on the nodes any query returns. Past it, top keeps the first max_nodes,
+# hops the nearest nodes and dir the most central, and the result is marked
+# truncated
+DEFAULT_MAX_NODES = 2000
+
+
+def parse_query(query):
+    """Split a query string (see the module docstring) into its parts."""
+    kind, _, rest = query.partition(":")
+    if kind == "top":
+        count, _, metric = rest.partition(":")
+        if not count.isdigit():
+            raise ValueError(f"Expected top:K[:metric], got {query!r}")
+        return {"kind": "top", "k": int(count), "metric": metric or DEFAULT_METRIC}
+    if kind == "hops":
+        # Parse from the right; paths may themselves contain ':'
+        path, hops, direction = rest, 1, "both"
+        head, _, tail = path.rpartition(":")
+        if head and tail in DIRECTIONS:
+            path, direction = head, tail
+            head, _, tail = path.rpartition(":")
+        if head and tail.isdigit():
+            path, hops = head, int(tail)
+        if not path:
+            raise ValueError(f"Expected hops:FILE[:K][:direction], got {query!r}")
+        return {"kind": "hops", "file": path, "hops": hops, "direction": direction}
+    if kind == "dir":
+        return {"kind": "dir", "directory": rest.strip("/") or "."}
+    raise ValueError(f"Unknown subgraph query {query!r} (expected top:, hops: or dir:)")
+
+
+class SubgraphIndex:
+    """
+    Query indexes over one analysed graph. names, categories and
+    communities are per node id. offsets/targets are the import graph as
+    CSR, and metrics maps STORED_METRICS names to per-node values.
+    """
+
+    def __init__(self, names, categories, offsets, targets, metrics, communities=None):
+        self.names = names
+        self.categories = categories
+        self.communities = communities
+        self.offsets = offsets
+        self.targets = targets
+        self.in_offsets, self.sources = graph_algorithms.csr_reverse(offsets, targets)
+        count = len(names)
+        self.metrics = dict(metrics)
+        self.metrics["outboundCount"] = [offsets[i + 1] - offsets[i] for i in range(count)]
+        self.metrics["inboundCount"] = [
+            self.in_offsets[i + 1] - self.in_offsets[i] for i in range(count)
+        ]
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.by_path = sorted(range(count), key=names.__getitem__)
+        self.sorted_paths = [names[i] for i in self.by_path]
+        # metric -> node ids best first, and each node's position in it
+        self._orders = {}
+        self._ranks = {}
+
+    @classmethod
+    def from_result_file(cls, path):
+        """Build an index from a written result file, streaming its graph sections."""
+        import graph_diff
+
+        names, categories, communities = [], [], []
+        metrics = {name: [] for name in STORED_METRICS}
+        adjacency = []
+        ids = {}
+
+        def node(name):
+            node_id = ids.get(name)
+            if node_id is None:
+                node_id = ids[name] = len(names)
+                names.append(name)
+                categories.append("External" if name.startswith("ext:") else None)
+                communities.append(-1)
+                for values in metrics.values():
+                    values.append(0)
+                adjacency.append(())
+            return node_id
+
+        with open(path, "r", encoding="utf-8") as f:
+            stream = graph_diff._JsonStream(f)
+            for key in stream.members():
+                if key == "files":
+                    for rel_path in stream.members():
+                        info = stream.value()
+                        node_id = node(rel_path)
+                        categories[node_id] = info.get("category")
+                        communities[node_id] = info.get("community", -1)
+                        for name, values in metrics.items():
+                            values[node_id] = info.get(name, 0)
+                elif key == "dependencyGraph":
+                    for rel_path in stream.members():
+                        deps = stream.value()
+                        source = node(rel_path)
+                        adjacency[source] = [node(target) for target in deps]
+                else:
+                    stream.value()
+
+        offsets = array("q", [0])
+        targets = array("i")
+        for deps in adjacency:
+            targets.extend(deps)
+            offsets.append(len(targets))
+        return cls(names, categories, offsets, targets, metrics, communities)
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+
+    def query(self, query, max_nodes=DEFAULT_MAX_NODES):
+        """Answer a query string or parse_query() dict."""
+        if isinstance(query, str):
+            query = parse_query(query)
+        kind = query["kind"]
+        if kind == "top":
+            return self.top(query["k"], query.get("metric", DEFAULT_METRIC), max_nodes)
+        if kind == "hops":
+            return self.neighbourhood(
+                query["file"], query.get("hops", 1), query.get("direction", "both"), max_nodes
+            )
+        if kind == "dir":
+            return self.directory(query["directory"], max_nodes)
+        raise ValueError(f"Unknown subgraph query kind {kind!r}")
+
+    def top(self, k, metric=DEFAULT_METRIC, max_nodes=DEFAULT_MAX_NODES):
+        """
+        The k nodes ranking highest on metric and the imports among them.
+        k is capped at max_nodes.
+        """
+        order = self._order(metric)
+        nodes = order[:max(min(k, max_nodes), 0)]
+        return self._payload(
+            {"kind": "top", "k": k, "metric": metric}, nodes, len(order), len(nodes) < len(order)
+        )
+
+    def neighbourhood(self, file, hops=1, direction="both", max_nodes=DEFAULT_MAX_NODES):
+        """
+        file and every node within hops steps of it, nearest first. Stops
+        adding nodes at max_nodes.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction!r} (expected one of {DIRECTIONS})")
+        query = {"kind": "hops", "file": file, "hops": hops, "direction": direction}
+        start = self.ids.get(file)
+        if start is None:
+            return self._payload(query, [], 0, False, missing=True)
+        adjacency = []
+        if direction in ("out", "both"):
+            adjacency.append((self.offsets, self.targets))
+        if direction in ("in", "both"):
+            adjacency.append((self.in_offsets, self.sources))
+
+        distance = {start: 0}
+        nodes = [start]
+        frontier = [start]
+        truncated = False
+        for step in range(1, hops + 1):
+            following = []
+            for current in frontier:
+                for offsets, targets in adjacency:
+                    for pos in range(offsets[current], offsets[current + 1]):
+                        other = targets[pos]
+                        if other in distance:
+                            continue
+                        if len(nodes) >= max_nodes:
+                            truncated = True
+                            break
+                        distance[other] = step
+                        nodes.append(other)
+                        following.append(other)
+                    if truncated:
+                        break
+                if truncated:
+                    break
+            if truncated or not following:
+                break
+            frontier = following
+        return self._payload(query, nodes, len(nodes), truncated, distance=distance)
+
+    def directory(self, directory, max_nodes=DEFAULT_MAX_NODES):
+        """
+        The subgraph induced by every file under directory ("." for the
+        whole project). Above max_nodes the top PageRank nodes are kept.
+        """
+        directory = directory.strip("/") or "."
+        query = {"kind": "dir", "directory": directory}
+        if directory == ".":
+            members = [i for i in self.by_path if not self.names[i].startswith("ext:")]
+        else:
+            # '0' sorts right after '/', so this spans exactly "directory/..."
+            lo = bisect_left(self.sorted_paths, directory + "/")
+            hi = bisect_left(self.sorted_paths, directory + "0", lo)
+            members = self.by_path[lo:hi]
+        matched = len(members)
+        if matched > max_nodes:
+            rank = self._rank(DEFAULT_METRIC)
+            members = sorted(heapq.nsmallest(max_nodes, members, key=rank.__getitem__), key=rank.__getitem__)
+        return self._payload(query, members, matched, matched > len(members))
+
+    # ---------------------------------------------------------
+
+    def _order(self, metric):
+        order = self._orders.get(metric)
+        if order is None:
+            values = self.metrics.get(metric)
+            if values is None:
+                raise ValueError(f"Unknown metric {metric!r} (expected one of {METRICS})")
+            order = self._orders[metric] = sorted(range(len(values)), key=lambda i: (-values[i], i))
+        return order
+
+    def _rank(self, metric):
+        rank = self._ranks.get(metric)
+        if rank is None:
+            rank = self._ranks[metric] = [0] * len(self.names)
+            for position, node in enumerate(self._order(metric)):
+                rank[node] = position
+        return rank
+
+    def _payload(self, query, nodes, matched, truncated, distance=None, missing=False):
+        """
+        The result: node records, and edges as [source, target] positions
+        in the node list.
+        """
+        position = {node: i for i, node in enumerate(nodes)}
+        edges = []
+        for i, node in enumerate(nodes):
+            for pos in range(self.offsets[node], self.offsets[node + 1]):
+                target = position.get(self.targets[pos])
+                if target is not None:
+                    edges.append([i, target])
+        records = []
+        for node in nodes:
+            record = {
+                "file": self.names[node],
+                "category": self.categories[node],
+                "community": self.communities[node] if self.communities is not None else None,
+            }
+            for name in METRICS:
+                values = self.metrics.get(name)
+                if values is not None:
+                    value = values[node]
+                    record[name] = file_records.centrality(value) if isinstance(value, float) else value
+            if distance is not None:
+                record["distance"] = distance[node]
+            records.append(record)
+        result = {
+            "query": query,
+            "nodes": records,
+            "edges": edges,
+            "totalNodes": len(self.names),
+            "matchedNodes": matched,
+            "truncated": truncated,
+        }
+        if missing:
+            result["error"] = f"{query.get('file')} is not in the graph"
+        return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Query bounded subgraphs of a CodeGnosis result file")
+    parser.add_argument("result", help="Result JSON written by analyzer_core")
+    parser.add_argument("query", nargs="+", help="top:K[:metric], hops:FILE[:K][:direction] or dir:DIRECTORY")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = SubgraphIndex.from_result_file(args.result)
+    print(f"[subgraph] indexed {len(index.names)} nodes in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    results = []
+    for text in args.query:
+        started = time.perf_counter()
+        results.append(index.query(text, args.max_nodes))
+        print(
+            f"[subgraph] {text}: {len(results[-1]['nodes'])} nodes, {len(results[-1]['edges'])} edges "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms",
+            file=sys.stderr,
+        )
+    json.dump(results[0] if len(results) == 1 else results, sys.stdout)
+    sys.stdout.write("\n")
@@ -0,0 +1,238 @@
+"""BOM-STRICT"""
+"""
+workspace_shards.py
+===================
+Sharded analysis for monorepos. Every workspace member (package.json
+`workspaces`, Cargo.toml `[workspace]`) is one shard and the rest of the
+tree is the root shard. Shards are discovered, sniffed and parsed on their
+own pool workers, and each shard's detector output is cached on disk under
+a fingerprint of its file listing (paths, sizes, mtimes), the config and
+the analyzer code, so an unchanged workspace is not re-parsed next run.
+
+Resolution is not sharded: the merged files and raw imports are linked by
+one AnalyzerCore at the monorepo root, so cross-workspace imports
+(`@org/ui`, `use my_crate::x`) resolve exactly as in an unsharded run.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import analyzer_core
+import file_discovery
+import result_cache
+from import_resolution import PythonImport
+
+# Bump when the cache file layout changes
+CACHE_FORMAT = 2
+ROOT_SHARD = ""
+# analysisSettings keys left out of the cache key
+_SCHEDULING_SETTINGS = {"workspaceSharding", "shardWorkers", "cacheDir", "walkerThreads"}
+
+
+class Shard:
+    """One shard's discovery and detector output."""
+
+    __slots__ = ("rel_dir", "prune", "package", "files", "detected", "parser_skips", "cached")
+
+    def __init__(self, rel_dir, prune, package=None):
+        self.rel_dir = rel_dir
+        # Nested workspace directories, analysed by their own shards
+        self.prune = prune
+        self.package = package
+        self.files = []
+        # [(rel_path, raw deps)] for the shard's text files
+        self.detected = []
+        # Files the custom regex parsers skipped (over a budget)
+        self.parser_skips = []
+        self.cached = False
+
+    def to_dict(self):
+        info = self.package.to_dict() if self.package else {"name": None, "path": ".", "kind": "root"}
+        info["files"] = len(self.files)
+        info["cached"] = self.cached
+        return info
+
+
+def plan_shards(workspaces):
+    """The root shard plus one shard per workspace member directory."""
+    packages = {}
+    for package in workspaces.packages:
+        packages.setdefault(package.rel_dir, package)
+    dirs = [ROOT_SHARD] + sorted(packages)
+    shards = []
+    for rel_dir in dirs:
+        prefix = rel_dir + "/" if rel_dir else ""
+        prune = tuple(d for d in dirs if d != rel_dir and d.startswith(prefix))
+        shards.append(Shard(rel_dir, prune, packages.get(rel_dir)))
+    return shards
+
+
+# ---------------------------------------------------------
+# SHARD CACHE
+# ---------------------------------------------------------
+
+def default_cache_dir(project_dir):
+    digest = hashlib.sha1(os.path.abspath(str(project_dir)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), "codegnosis_cache", digest)
+
+
+def code_fingerprint():
+    """
+    The cache format plus the analyzer code (the frozen executable, or
+    every module), so code edits and new releases invalidate it.
+    """
+    return f"{CACHE_FORMAT}|{result_cache.code_fingerprint()}"
+
+
+def settings_key(analyzer):
+    """Everything besides file contents that changes what a shard detects."""
+    config = analyzer.config.to_dict()
+    # How shards are scheduled doesn't change what they contain
+    config["analysisSettings"] = {
+        k: v for k, v in (config.get("analysisSettings") or {}).items() if k not in _SCHEDULING_SETTINGS
+    }
+    settings = {
+        "config": config,
+        "extensions": sorted(analyzer.extensions_to_find),
+        "excluded": sorted(analyzer.excluded_folders),
+        "customCategories": analyzer.custom_categories,
+        "code": code_fingerprint(),
+    }
+    return json.dumps(settings, sort_keys=True, default=str)
+
+
+def shard_fingerprint(files, key):
+    digest = hashlib.sha1(key.encode("utf-8"))
+    for entry in files:
+        digest.update(
+            f"{entry.rel_path}\0{entry.size}\0{entry.mtime}\n".encode("utf-8", "surrogatepass")
+        )
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, rel_dir):
+    name = hashlib.sha1(rel_dir.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"shard_{name}.json")
+
+
+def _read_cache(cache_path, fingerprint):
+    """(kinds, detected, parser_skips) from a cache file written for fingerprint, else None."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except Exception:
+        return None
+    if cached.get("format") != CACHE_FORMAT or cached.get("fingerprint") != fingerprint:
+        return None
+    # PythonImport tuples are stored as [level, module, name]
+    detected = [
+        (rel_path, [PythonImport(*dep) if isinstance(dep, list) else dep for dep in deps])
+        for rel_path, deps in cached["detected"]
+    ]
+    return cached["kinds"], detected, cached["parserSkips"]
+
+
+def _write_cache(cache_path, fingerprint, files, detected, parser_skips):
+    payload = {
+        "format": CACHE_FORMAT,
+        "fingerprint": fingerprint,
+        "kinds": {entry.rel_path: entry.kind for entry in files},
+        "detected": [
+            [rel_path, [list(dep) if isinstance(dep, PythonImport) else dep for dep in deps]]
+            for rel_path, deps in detected
+        ],
+        "parserSkips": parser_skips,
+    }
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------
+# SHARD ANALYSIS
+# ---------------------------------------------------------
+
+def _shard_task(project_path, extensions, excluded, custom_categories, config,
+                rel_dir, prune, key, cache_path):
+    """Discover, sniff and parse one shard (pool task, so module level)."""
+    analyzer = analyzer_core.AnalyzerCore(
+        project_path, extensions, custom_categories, excluded, config=config
+    )
+    files = analyzer._find_files(rel_dir, prune)
+    fingerprint = shard_fingerprint(files, key)
+    cached = _read_cache(cache_path, fingerprint)
+    if cached is not None:
+        kinds, detected, parser_skips = cached
+        for entry in files:
+            entry.kind = kinds.get(entry.rel_path)
+        if all(entry.kind for entry in files):
+            return files, detected, parser_skips, True
+
+    file_discovery.sniff_entries(files, analyzer.max_file_size_bytes, analyzer.walker_threads)
+    detected = [
+        (entry.rel_path, analyzer._detect_dependencies(entry.path))
+        for entry in files
+        if entry.kind == file_discovery.KIND_TEXT
+    ]
+    _write_cache(cache_path, fingerprint, files, detected, analyzer.parser_skips)
+    return files, detected, analyzer.parser_skips, False
+
+
+def collect_shards(analyzer, workspaces, max_workers=None, cache_dir=None):
+    """
+    Run every shard of the monorepo at analyzer.project_dir, in parallel
+    when more than one worker is available. Returns the planned shards
+    with their files and detector output filled in.
+    """
+    shards = plan_shards(workspaces)
+    cache_dir = cache_dir or default_cache_dir(analyzer.project_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = settings_key(analyzer)
+    common = (
+        str(analyzer.project_dir),
+        sorted(analyzer.extensions_to_find),
+        sorted(analyzer.excluded_folders),
+        analyzer.custom_categories,
+        analyzer.config,
+    )
+
+    def task_args(shard):
+        return common + (shard.rel_dir, shard.prune, key, _cache_path(cache_dir, shard.rel_dir))
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(shards))
+    if max_workers <= 1:
+        for shard in shards:
+            shard.files, shard.detected, shard.parser_skips, shard.cached = _shard_task(
+                *task_args(shard)
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_shard_task, *task_args(shard)): shard for shard in shards}
+            for future in as_completed(futures):
+                shard = futures[future]
+                shard.files, shard.detected, shard.parser_skips, shard.cached = future.result()
+
+    cached = sum(1 for shard in shards if shard.cached)
+    analyzer.logger.info(
+        f"Workspace shards: {len(shards)} ({cached} from cache, {max_workers} workers)"
+    )
+    return shards
+
+
+def merge_shards(shards):
+    """All shards' (files, detected), in the path order of an unsharded run."""
+    files = [entry for shard in shards for entry in shard.files]
+    files.sort(key=lambda entry: entry.rel_path)
+    detected = [item for shard in shards for item in shard.detected]
+    detected.sort(key=lambda item: item[0])
+    return files, detected